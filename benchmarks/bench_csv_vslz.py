@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+anlz-csv（csv_vslz）のベンチマーク
+
+合成したCSVファイルに対して、読み込み・分類・統計量・描画の各段階の時間とピークメモリを計測し、
+結果をJSONに保存する。基準となる結果（baseline）と比べて遅くなった段階があれば終了コード1を返す
+
+使用例:
+  python benchmarks/bench_csv_vslz.py --save-baseline      # 基準を保存
+  python benchmarks/bench_csv_vslz.py --baseline benchmarks/results/baseline.json
+  python benchmarks/bench_csv_vslz.py --suite full --repeat 5
+  python benchmarks/bench_csv_vslz.py --variants           # vslz_1〜5 と anlz-csv の設定どうしを比較
+"""
+
+import argparse
+import importlib
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from zm12 import csv_vslz
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# 行数・数値列数・カテゴリの種類数・分類列数（組み合わせ数は 種類数^分類列数 まで）
+SUITES = {
+    "quick": [
+        {"rows": 10_000, "numeric": 4, "cardinality": 5, "category_columns": 1},
+        {"rows": 10_000, "numeric": 4, "cardinality": 5, "category_columns": 2},
+        {"rows": 100_000, "numeric": 8, "cardinality": 20, "category_columns": 1},
+    ],
+    "full": [
+        {"rows": 10_000, "numeric": 4, "cardinality": 5, "category_columns": 1},
+        {"rows": 100_000, "numeric": 8, "cardinality": 20, "category_columns": 1},
+        {"rows": 100_000, "numeric": 8, "cardinality": 10, "category_columns": 2},
+        {"rows": 1_000_000, "numeric": 8, "cardinality": 50, "category_columns": 1},
+        {"rows": 1_000_000, "numeric": 32, "cardinality": 10, "category_columns": 2},
+        {"rows": 1_000_000, "numeric": 4, "cardinality": 10, "category_columns": 3},
+    ],
+}
+
+STAGES = ["load", "partition", "stats", "render"]
+
+# 設定どうしを比べるケースと、各設定（モジュール名 → analyze() に渡す分類列）
+VARIANT_CASE = {"rows": 20_000, "numeric": 2, "cardinality": 3, "category_columns": 2}
+VARIANTS = {
+    "vslz_1": None,
+    "vslz_2": None,
+    "vslz_3": ["cat0"],
+    "vslz_4": ["cat0", "cat1"],
+    "vslz_5": ["cat0", "cat1"],
+    "csv_vslz": ["cat0", "cat1"],
+}
+
+def case_name(params):
+    return f"r{params['rows']}_n{params['numeric']}_c{params['cardinality']}x{params['category_columns']}"
+
+def make_csv(params, data_dir, seed=0):
+    """合成CSVファイルを作成（同じ条件のファイルがあれば再利用）"""
+    path = data_dir / f"{case_name(params)}_s{seed}.csv"
+    if path.exists():
+        return path
+
+    rng = np.random.default_rng(seed)
+    rows = params["rows"]
+    data = {}
+    for j in range(params["category_columns"]):
+        labels = np.array([f"c{j}_{k}" for k in range(params["cardinality"])])
+        data[f"cat{j}"] = labels[rng.integers(0, params["cardinality"], rows)]
+
+    # 分布の形が異なる列を交互に作り、1%を欠損値にする
+    generators = [
+        lambda: rng.normal(50, 10, rows),
+        lambda: rng.lognormal(3, 1, rows),
+        lambda: rng.integers(0, 1000, rows).astype(float),
+        lambda: rng.exponential(5, rows),
+    ]
+    for i in range(params["numeric"]):
+        values = generators[i % len(generators)]()
+        values[rng.random(rows) < 0.01] = np.nan
+        data[f"x{i}"] = values
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(data).to_csv(path, index=False)
+    return path
+
+def run_stages(path, params, render_limit):
+    """各段階を1回ずつ実行し、段階ごとの経過時間と件数を返す"""
+    timings = {}
+    category_columns = [f"cat{j}" for j in range(params["category_columns"])]
+    numeric_columns = [f"x{i}" for i in range(params["numeric"])]
+
+    start = time.perf_counter()
+    df = csv_vslz.load_csv(path)
+    timings["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    groups = list(csv_vslz.iter_category_groups(df, category_columns)) if category_columns else [("全体", df)]
+    timings["partition"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    targets = []
+    for category_name, subset in groups:
+        for column in numeric_columns:
+            data = subset[column].dropna()
+            if len(data):
+                targets.append((category_name, column, data, csv_vslz.column_stats(data)))
+    timings["stats"] = time.perf_counter() - start
+
+    # 描画は先頭の render_limit 枚だけ行い、1枚あたりの時間から全体を見積もる
+    start = time.perf_counter()
+    rendered = 0
+    for category_name, column, data, stats in targets[:render_limit]:
+        fig = csv_vslz.render_column(data, column, category_name, "cat", stats, (12, 4), ["hist", "box", "violin"])
+        with io.BytesIO() as buf:
+            fig.savefig(buf, dpi=300, bbox_inches="tight")
+        plt.close(fig)
+        rendered += 1
+    render_time = time.perf_counter() - start
+    timings["render"] = render_time / rendered * len(targets) if rendered else 0.0
+
+    counts = {"groups": len(groups), "figures": len(targets), "rendered": rendered}
+    return timings, counts
+
+def measure_peak_memory(path, params, render_limit):
+    """各段階のピークメモリ（MB、Pythonとnumpyの確保分）"""
+    peaks = {}
+    # 段階 → 計測する関数名
+    functions = {
+        "load": "load_csv",
+        "partition": "iter_category_groups",
+        "stats": "column_stats",
+        "render": "render_column",
+    }
+    original = {stage: getattr(csv_vslz, name) for stage, name in functions.items()}
+
+    def tracked(stage, func):
+        def wrapper(*args, **kwargs):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            result = func(*args, **kwargs)
+            if stage == "partition":
+                result = list(result)
+            peak = (tracemalloc.get_traced_memory()[1] - base) / 2**20
+            peaks[stage] = max(peaks.get(stage, 0.0), peak)
+            return result
+        return wrapper
+
+    tracemalloc.start()
+    try:
+        for stage, name in functions.items():
+            setattr(csv_vslz, name, tracked(stage, original[stage]))
+        run_stages(path, params, render_limit)
+    finally:
+        tracemalloc.stop()
+        for stage, name in functions.items():
+            setattr(csv_vslz, name, original[stage])
+    return peaks
+
+def run_suite(args):
+    data_dir = Path(args.data_dir)
+    cases = {}
+    for params in SUITES[args.suite]:
+        name = case_name(params)
+        print(f"=== {name} ===", flush=True)
+        path = make_csv(params, data_dir)
+
+        runs = []
+        for _ in range(args.repeat):
+            timings, counts = run_stages(path, params, args.render_limit)
+            runs.append(timings)
+
+        peaks = measure_peak_memory(path, params, args.render_limit) if args.memory else {}
+
+        stages = {}
+        for stage in STAGES:
+            values = [run[stage] for run in runs]
+            stages[stage] = {
+                "min_s": min(values),
+                "median_s": statistics.median(values),
+                "peak_mb": peaks.get(stage),
+            }
+            print(f"  {stage:<10} 中央値 {stages[stage]['median_s'] * 1000:10.1f} ms"
+                  + (f"  ピーク {peaks[stage]:8.1f} MB" if stage in peaks else ""))
+        print(f"  カテゴリ数: {counts['groups']}  図の数: {counts['figures']}（描画して計測: {counts['rendered']}枚）")
+
+        cases[name] = {"params": params, "stages": stages, **counts}
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "suite": args.suite,
+            "repeat": args.repeat,
+            "render_limit": args.render_limit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__,
+        },
+        "cases": cases,
+    }
+
+def run_variants(data_dir, repeat):
+    """
+    vslz_1〜5 と anlz-csv（csv_vslz）の設定（Engine と引数）で同じファイルを処理し、段階ごとの時間を比べる
+    図は一時ディレクトリに保存して、保存の時間も含める
+    """
+    path = make_csv(VARIANT_CASE, data_dir)
+    print(f"=== 設定の比較: {case_name(VARIANT_CASE)} ===", flush=True)
+    variants = {}
+    for name, category_columns in VARIANTS.items():
+        module = importlib.import_module(f"zm12.{name}")
+        engine = getattr(module, "ENGINE", None)
+        options = {key: value for key, value in getattr(module, "OPTIONS", {}).items() if key != "initialize_dir"}
+        runs = []
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as output_dir:
+                report = csv_vslz.RunReport()
+                result = csv_vslz.analyze(path, output_dir, category_columns=category_columns, report=report,
+                                          progress=False, engine=engine, **options)
+                report.finish()
+            runs.append(report)
+        stages = {stage: statistics.median(run.stages.get(stage, {}).get("seconds", 0.0) for run in runs)
+                  for stage in STAGES + ["save"]}
+        total = statistics.median(run.elapsed for run in runs)
+        print(f"  {name:<10} 合計 {total:8.2f} s  図: {len(result.figures):3d}枚  "
+              + "  ".join(f"{stage} {seconds * 1000:8.1f} ms" for stage, seconds in stages.items()), flush=True)
+        variants[name] = {"total_s": total, "figures": len(result.figures), "stages": stages}
+    return variants
+
+def compare(result, baseline, threshold, min_delta):
+    """基準との比較。遅くなった (ケース, 段階) のリストを返す"""
+    regressions = []
+    print(f"\n=== 基準との比較（{baseline['meta']['timestamp']}） ===")
+    for name, case in result["cases"].items():
+        base_case = baseline["cases"].get(name)
+        if base_case is None:
+            print(f"{name}: 基準に無いケースです")
+            continue
+        for stage in STAGES:
+            current = case["stages"][stage]["median_s"]
+            base = base_case["stages"][stage]["median_s"]
+            ratio = current / base if base else float("inf")
+            regressed = ratio > threshold and current - base > min_delta
+            mark = "  ← 低下" if regressed else ""
+            print(f"{name:<28}{stage:<10}{base * 1000:10.1f} ms → {current * 1000:10.1f} ms  (x{ratio:.2f}){mark}")
+            if regressed:
+                regressions.append((name, stage))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='anlz-csv の各段階の処理時間を計測するベンチマーク')
+    parser.add_argument('--suite', choices=list(SUITES), default='quick', help='計測するケースの組 (デフォルト: quick)')
+    parser.add_argument('--repeat', '-r', type=int, default=3, help='繰り返し回数 (デフォルト: 3)')
+    parser.add_argument('--render-limit', type=int, default=4, help='実際に描画して計測する図の枚数 (デフォルト: 4)')
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='ピークメモリを計測しない')
+    parser.add_argument('--data-dir', default=str(Path(tempfile.gettempdir()) / "zm12-bench-data"),
+                        help='合成CSVファイルの保存先')
+    parser.add_argument('--output', '-o', help='結果の保存先 (デフォルト: benchmarks/results/<日時>.json)')
+    parser.add_argument('--baseline', '-b', help='比較する基準の結果ファイル')
+    parser.add_argument('--save-baseline', action='store_true', help='結果を benchmarks/results/baseline.json にも保存')
+    parser.add_argument('--threshold', type=float, default=1.25, help='低下とみなす時間の比率 (デフォルト: 1.25)')
+    parser.add_argument('--min-delta', type=float, default=0.005, help='低下とみなす最小の差（秒） (デフォルト: 0.005)')
+    parser.add_argument('--variants', action='store_true', help='vslz_1〜5 と anlz-csv の設定どうしの処理時間も計測')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    result = run_suite(args)
+    if args.variants:
+        result["variants"] = run_variants(Path(args.data_dir), args.repeat)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n結果を '{output}' に保存しました。")
+    if args.save_baseline:
+        (RESULTS_DIR / "baseline.json").write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"基準として '{RESULTS_DIR / 'baseline.json'}' に保存しました。")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(result, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"\n処理時間が低下した段階が {len(regressions)} 件あります。")
+            return 1
+        print("\n処理時間の低下はありません。")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,16 @@
-from shiny import App, reactive, render, ui
+from shiny import App, reactive, render, req, ui
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
+import io
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from matplotlib.figure import Figure
+
+import datastore
+import shared
 
 # 市町村データ
 municipalities_data = [
@@ -10,35 +19,262 @@ municipalities_data = [
     # ... (他のデータ)
 ]
 
-municipalities_df = pd.DataFrame(municipalities_data)
+# 全ワーカープロセスで同じものをメモリマップして共有する
+municipalities_df = datastore.load_shared_frame(
+    "municipalities",
+    tuple(tuple(record.items()) for record in municipalities_data),
+    lambda: pd.DataFrame(municipalities_data),
+)
 
-def generate_sample_data(start_year, end_year):
-    """サンプル統計データを生成"""
-    years = list(range(start_year, end_year + 1))
-    np.random.seed(42)
+# 頭文字（行）ごとのひらがな
+HIRAGANA_RANGES = {
+    "あ": ["あ", "い", "う", "え", "お"],
+    "か": ["か", "き", "く", "け", "こ", "が", "ぎ", "ぐ", "げ", "ご"],
+    "さ": ["さ", "し", "す", "せ", "そ", "ざ", "じ", "ず", "ぜ", "ぞ"],
+    "た": ["た", "ち", "つ", "て", "と", "だ", "ぢ", "づ", "で", "ど"],
+    "な": ["な", "に", "ぬ", "ね", "の"],
+    "は": ["は", "ひ", "ふ", "へ", "ほ", "ば", "び", "ぶ", "べ", "ぼ", "ぱ", "ぴ", "ぷ", "ぺ", "ぽ"],
+    "ま": ["ま", "み", "む", "め", "も"],
+    "や": ["や", "ゆ", "よ"],
+}
+
+def build_municipality_index(df):
+    """
+    市町村の絞り込み用インデックスを作成
+    読み順に並べた行番号を、行・種別・名前の文字（1文字と2文字のn-gram）ごとにまとめておく
+    """
+    sorted_df = df.sort_values("reading").reset_index(drop=True)
+    gyo_of = {char: gyo for gyo, chars in HIRAGANA_RANGES.items() for char in chars}
     
-    data = {
-        'year': years,
-        'turnout_rate': [45 + np.random.normal(0, 5) for _ in years],
-        'total_voters': [80000 + i * 2000 + np.random.normal(0, 3000) for i in range(len(years))],
-        'male_voters': [38000 + i * 1000 + np.random.normal(0, 1500) for i in range(len(years))],
-        'female_voters': [42000 + i * 1000 + np.random.normal(0, 1500) for i in range(len(years))],
-        'candidate_count': [25 + np.random.randint(-3, 4) for _ in years],
-        'fixed_seats': [20 + np.random.randint(-1, 2) for _ in years]
+    gyo_positions = {}
+    type_positions = {}
+    ngram_positions = {}
+    for pos, (name, reading, mtype) in enumerate(zip(sorted_df["name"], sorted_df["reading"], sorted_df["type"])):
+        gyo = gyo_of.get(reading[:1])
+        if gyo is not None:
+            gyo_positions.setdefault(gyo, set()).add(pos)
+        type_positions.setdefault(mtype, set()).add(pos)
+        for n in (1, 2):
+            for i in range(len(name) - n + 1):
+                ngram_positions.setdefault(name[i:i + n], set()).add(pos)
+    
+    # 並び替え用の順序も事前に計算しておく（同順位は読み順）
+    order = {
+        "reading": np.arange(len(sorted_df)),
+        "name": np.argsort(sorted_df["name"].astype(str).to_numpy(), kind="stable"),
+        "type": np.argsort(sorted_df["type"].astype(str).to_numpy(), kind="stable"),
     }
     
-    data['candidate_ratio'] = [data['fixed_seats'][i] / data['candidate_count'][i] for i in range(len(years))]
+    return {
+        "df": sorted_df,
+        "all": frozenset(range(len(sorted_df))),
+        "order": order,
+        "gyo": {key: frozenset(value) for key, value in gyo_positions.items()},
+        "type": {key: frozenset(value) for key, value in type_positions.items()},
+        "ngram": {key: frozenset(value) for key, value in ngram_positions.items()},
+    }
+
+def filter_municipalities(index, initial_letter="", municipality_type="", name_filter="", sort_by="reading", descending=False):
+    """
+    インデックスの集合演算で市町村を絞り込み、行番号の配列を返す
+    並び順は事前に計算した順序から絞り込み結果を取り出すだけなので、ソートはしない
+    """
+    positions = index["all"]
+    empty = frozenset()
     
-    for key in ['turnout_rate', 'total_voters', 'male_voters', 'female_voters']:
-        if key == 'turnout_rate':
-            data[key] = [max(0, min(100, val)) for val in data[key]]
-        else:
-            data[key] = [max(0, int(val)) for val in data[key]]
+    if initial_letter:
+        positions = positions & index["gyo"].get(initial_letter, empty)
     
-    data['candidate_count'] = [max(1, val) for val in data['candidate_count']]
-    data['fixed_seats'] = [max(1, min(val, data['candidate_count'][i])) for i, val in enumerate(data['fixed_seats'])]
+    if municipality_type:
+        positions = positions & index["type"].get(municipality_type, empty)
     
-    return pd.DataFrame(data)
+    if name_filter:
+        ngrams = [name_filter] if len(name_filter) == 1 else [name_filter[i:i + 2] for i in range(len(name_filter) - 1)]
+        for ngram in ngrams:
+            positions = positions & index["ngram"].get(ngram, empty)
+            if not positions:
+                break
+        # 2文字のn-gramがすべて含まれていても部分一致とは限らないので確認する
+        if len(name_filter) > 2:
+            names = index["df"]["name"]
+            positions = [pos for pos in positions if name_filter in names.iat[pos]]
+    
+    selected = np.zeros(len(index["df"]), dtype=bool)
+    selected[list(positions)] = True
+    order = index["order"][sort_by]
+    if descending:
+        order = order[::-1]
+    return order[selected[order]]
+
+municipality_index = build_municipality_index(municipalities_df)
+
+# 市町村一覧の1ページあたりの件数の選択肢
+PAGE_SIZES = ["25", "50", "100"]
+
+# 市町村一覧の表の列（表示名）と、その列の見出しをクリックしたときの並び順（sort_by の値）
+TABLE_COLUMNS = {"name": "市町村名", "type": "種別", "reading": "読み方"}
+
+# 統計データの年度範囲（スライダーの上下限）
+YEAR_MIN = 2000
+YEAR_MAX = 2020
+
+@lru_cache(maxsize=None)
+def _generate_all_years(seed=42):
+    """全年度分のサンプル統計データを一括生成（系列ごとに乱数を1回だけ生成）"""
+    years = np.arange(YEAR_MIN, YEAR_MAX + 1)
+    n = len(years)
+    trend = np.arange(n)
+    rng = np.random.default_rng(seed)
+    
+    candidate_count = np.maximum(1, 25 + rng.integers(-3, 4, n))
+    fixed_seats = np.clip(20 + rng.integers(-1, 2, n), 1, candidate_count)
+    
+    data = pd.DataFrame({
+        'year': years,
+        'turnout_rate': np.clip(45 + rng.normal(0, 5, n), 0, 100),
+        'total_voters': np.maximum(0, 80000 + trend * 2000 + rng.normal(0, 3000, n)).astype(int),
+        'male_voters': np.maximum(0, 38000 + trend * 1000 + rng.normal(0, 1500, n)).astype(int),
+        'female_voters': np.maximum(0, 42000 + trend * 1000 + rng.normal(0, 1500, n)).astype(int),
+        'candidate_count': candidate_count,
+        'fixed_seats': fixed_seats,
+    })
+    data['candidate_ratio'] = data['fixed_seats'] / data['candidate_count']
+    
+    return data
+
+@lru_cache(maxsize=256)
+def generate_sample_data(start_year, end_year):
+    """
+    サンプル統計データを生成
+    全年度分を一度だけ生成して切り出すので、範囲を変えても同じ年度の値は変わらない
+    （年度範囲ごとにキャッシュするため、返り値のデータフレームは変更しないこと）
+    """
+    data = _generate_all_years()
+    mask = (data['year'] >= start_year) & (data['year'] <= end_year)
+    return data[mask].reset_index(drop=True)
+
+# 統計項目の表示名
+METRIC_LABELS = {
+    "turnout_rate": "投票率 (%)",
+    "total_voters": "有権者数 (人)",
+    "candidate_ratio": "定数比候補者数",
+    "male_voters": "有権者数（男性）",
+    "female_voters": "有権者数（女性）"
+}
+
+# スライダー操作などが落ち着くまで再描画を待つ秒数
+DEBOUNCE_SECONDS = 0.5
+
+# 描画済みのPNGを入力・表示サイズごとに保持する数（全セッションで共有）
+PLOT_CACHE_SIZE = 64
+_plot_cache = OrderedDict()
+plot_metrics = {"builds": 0, "cache_hits": 0, "build_seconds": 0.0}
+
+def debounce(delay_secs):
+    """入力の変化が delay_secs 秒間止まってから下流の処理を実行させるデコレータ"""
+    def wrapper(f):
+        when = reactive.value(None)
+        trigger = reactive.value(0)
+        
+        @reactive.calc
+        def cached():
+            return f()
+        
+        # 値が変わるたびに期限を延ばす
+        @reactive.effect(priority=102)
+        def primer():
+            try:
+                cached()
+            except Exception:
+                pass
+            finally:
+                when.set(time.time() + delay_secs)
+        
+        # 期限を過ぎたら下流に通知する
+        @reactive.effect(priority=101)
+        def timer():
+            deadline = when()
+            if deadline is None:
+                return
+            time_left = deadline - time.time()
+            if time_left <= 0:
+                with reactive.isolate():
+                    when.set(None)
+                    trigger.set(trigger() + 1)
+            else:
+                reactive.invalidate_later(time_left)
+        
+        @reactive.calc
+        @reactive.event(trigger, ignore_none=False)
+        def debounced():
+            return cached()
+        
+        return debounced
+    return wrapper
+
+# 選挙データは全セッションで共有し、ファイルの変更を検知したときだけ読み込み直す
+ELECTION_POLL_SECONDS = 5
+
+@reactive.poll(shared.election_signature, ELECTION_POLL_SECONDS)
+def election_data():
+    return shared.load_election_data()
+
+def build_statistics_figure(data, selected_metrics):
+    """統計データ推移グラフを作成（pyplotを経由しないのでキャッシュしても溜まらない）"""
+    if not selected_metrics:
+        fig = Figure(figsize=(12, 8))
+        ax = fig.subplots()
+        ax.text(0.5, 0.5, '表示項目を選択してください', 
+               ha='center', va='center', transform=ax.transAxes, fontsize=16)
+        ax.set_xlim(0, 1)
+        ax.set_ylim(0, 1)
+        ax.axis('off')
+        return fig
+    
+    fig = Figure(figsize=(12, 3 * len(selected_metrics) + 2))
+    axes = fig.subplots(len(selected_metrics), 1, sharex=True, squeeze=False)[:, 0]
+    for ax, metric in zip(axes, selected_metrics):
+        ax.plot(data['year'], data[metric], marker='o', linewidth=2)
+        ax.set_ylabel(METRIC_LABELS.get(metric, metric))
+        ax.grid(True, alpha=0.3)
+    axes[-1].set_xlabel('年度')
+    axes[-1].xaxis.get_major_locator().set_params(integer=True)
+    
+    return fig
+
+def render_statistics_png(data, selected_metrics, width, height, pixelratio):
+    """図を表示サイズ（ピクセル）に合わせてPNGに描画（render.plot と同じ大きさ・解像度）"""
+    fig = build_statistics_figure(data, selected_metrics)
+    dpi = fig.get_dpi()
+    fig.set_size_inches(width / dpi, height / dpi)
+    fig.set_layout_engine("tight")
+    with io.BytesIO() as buf:
+        fig.savefig(buf, format="png", dpi=dpi * pixelratio)
+        return buf.getvalue()
+
+def get_statistics_png(data, data_key, start_year, end_year, selected_metrics, width, height, pixelratio):
+    """
+    入力・表示サイズごとに描画済みのPNGをキャッシュ（最近使われていないものから破棄）
+    data_key はデータの出どころ（ファイルの更新状況や区）を表すキーで、データが変われば別の図になる
+    Figure ではなくバイト列を保持するので、ヒットしたときはラスタライズを省け、セッション間で共有しても書き換わらない
+    """
+    key = (data_key, start_year, end_year, tuple(selected_metrics), width, height, pixelratio)
+    png = _plot_cache.get(key)
+    if png is not None:
+        _plot_cache.move_to_end(key)
+        plot_metrics["cache_hits"] += 1
+        return png, True
+    
+    start = time.perf_counter()
+    mask = (data['year'] >= start_year) & (data['year'] <= end_year)
+    png = render_statistics_png(data[mask], selected_metrics, width, height, pixelratio)
+    plot_metrics["builds"] += 1
+    plot_metrics["build_seconds"] += time.perf_counter() - start
+    
+    _plot_cache[key] = png
+    if len(_plot_cache) > PLOT_CACHE_SIZE:
+        _plot_cache.popitem(last=False)
+    return png, False
 
 # 統合されたUI
 app_ui = ui.page_fluid(
@@ -85,10 +321,33 @@ app_ui = ui.page_fluid(
                     value="",
                     placeholder="区市町村名の一部を入力"
                 ),
+                ui.input_select(
+                    "sort_by",
+                    "並び順:",
+                    choices={
+                        "reading": "読み方",
+                        "name": "市町村名",
+                        "type": "種別",
+                    },
+                    selected="reading"
+                ),
+                ui.input_checkbox("sort_desc", "降順", value=False),
+                ui.input_select(
+                    "page_size",
+                    "1ページの件数:",
+                    choices=PAGE_SIZES,
+                    selected=PAGE_SIZES[0]
+                ),
                 ui.br(),
                 ui.p(f"総登録数: {len(municipalities_df)}件")
             ),
-            ui.output_data_frame("municipalities_table")
+            ui.output_data_frame("municipalities_table"),
+            ui.div(
+                ui.input_action_button("prev_page", "前へ"),
+                ui.output_text("page_info", inline=True),
+                ui.input_action_button("next_page", "次へ"),
+                style="display: flex; gap: 1em; align-items: center;"
+            )
         )
     ),
     
@@ -103,29 +362,30 @@ app_ui = ui.page_fluid(
                 ui.input_slider(
                     "year_range",
                     "表示年度範囲:",
-                    min=2000,
-                    max=2020,
+                    min=YEAR_MIN,
+                    max=YEAR_MAX,
                     value=[2010, 2020],
                     step=1,
                     sep=""
                 ),
+                ui.input_select(
+                    "ward",
+                    "区:",
+                    choices={"": "全体"},
+                    selected=""
+                ),
                 ui.br(),
                 ui.input_checkbox_group(
                     "selected_metrics",
                     "表示する統計項目を選択してください:",
-                    choices={
-                        "turnout_rate": "投票率 (%)",
-                        "total_voters": "有権者数 (人)",
-                        "candidate_ratio": "定数比候補者数",
-                        "male_voters": "有権者数（男性）",
-                        "female_voters": "有権者数（女性）"
-                    },
+                    choices=METRIC_LABELS,
                     selected=["turnout_rate"]
                 ),
                 ui.br(),
-                ui.p("※ データはサンプルデータです。")
+                ui.output_text("data_source"),
+                ui.output_text("render_time")
             ),
-            ui.output_plot("statistics_plot")
+            ui.output_image("statistics_plot", height="400px")
         )
     )
 )
@@ -134,68 +394,126 @@ def server(input, output, session):
     # 市町村検索機能
     @reactive.calc
     def filtered_municipalities():
-        df = municipalities_df.copy()
-        
-        if input.initial_letter():
-            hiragana_ranges = {
-                "あ": ["あ", "い", "う", "え", "お"],
-                "か": ["か", "き", "く", "け", "こ", "が", "ぎ", "ぐ", "げ", "ご"],
-                "さ": ["さ", "し", "す", "せ", "そ", "ざ", "じ", "ず", "ぜ", "ぞ"],
-                "た": ["た", "ち", "つ", "て", "と", "だ", "ぢ", "づ", "で", "ど"],
-                "な": ["な", "に", "ぬ", "ね", "の"],
-                "は": ["は", "ひ", "ふ", "へ", "ほ", "ば", "び", "ぶ", "べ", "ぼ", "ぱ", "ぴ", "ぷ", "ぺ", "ぽ"],
-                "ま": ["ま", "み", "む", "め", "も"],
-                "や": ["や", "ゆ", "よ"],
-            }
-            
-            target_chars = hiragana_ranges.get(input.initial_letter(), [])
-            df = df[df["reading"].str[0].isin(target_chars)]
-        
-        if input.municipality_type():
-            df = df[df["type"] == input.municipality_type()]
-        
-        if input.name_filter():
-            df = df[df["name"].str.contains(input.name_filter(), na=False)]
-        
-        return df.sort_values("reading").reset_index(drop=True)
+        """絞り込み・並び替え後の行番号（データ自体はページ表示時に必要な分だけ取り出す）"""
+        return filter_municipalities(
+            municipality_index,
+            input.initial_letter(),
+            input.municipality_type(),
+            input.name_filter(),
+            input.sort_by(),
+            input.sort_desc(),
+        )
+    
+    page = reactive.value(0)
+    
+    @reactive.calc
+    def page_count():
+        return max(1, -(-len(filtered_municipalities()) // int(input.page_size())))
+    
+    # 条件が変わったら最初のページに戻る
+    @reactive.effect
+    @reactive.event(filtered_municipalities, input.page_size)
+    def reset_page():
+        page.set(0)
+    
+    @reactive.effect
+    @reactive.event(input.prev_page)
+    def go_prev_page():
+        page.set(max(0, page() - 1))
+    
+    @reactive.effect
+    @reactive.event(input.next_page)
+    def go_next_page():
+        page.set(min(page_count() - 1, page() + 1))
     
     @render.data_frame
     def municipalities_table():
-        df = filtered_municipalities()
-        display_df = df[["name", "type", "reading"]].copy()
-        display_df.columns = ["市町村名", "種別", "読み方"]
+        positions = filtered_municipalities()
+        page_size = int(input.page_size())
+        start = min(page(), page_count() - 1) * page_size
+        
+        # 表示するページの行だけを送る
+        df = municipality_index["df"].iloc[positions[start:start + page_size]]
+        display_df = df[list(TABLE_COLUMNS)].reset_index(drop=True)
+        display_df.columns = list(TABLE_COLUMNS.values())
         
         return render.DataTable(
             display_df,
             height="400px",
-            summary=f"検索結果: {len(display_df)}件",
+            summary=f"検索結果: {len(positions)}件",
             selection_mode="row"
         )
     
+    # 表の見出しでの並び替えは表示中のページの中だけになるので、全件の並び順（sort_by）に置き換える
+    @reactive.effect
+    @reactive.event(municipalities_table.sort)
+    def sort_by_table_header():
+        column_sort = municipalities_table.sort()
+        if not column_sort:
+            return
+        sort_by = list(TABLE_COLUMNS)[column_sort[0]["col"]]
+        ui.update_select("sort_by", selected=sort_by)
+        ui.update_checkbox("sort_desc", value=column_sort[0]["desc"])
+    
+    @render.text
+    def page_info():
+        return f"{min(page(), page_count() - 1) + 1} / {page_count()} ページ"
+    
     # 統計グラフ機能
+    @reactive.effect
+    def update_ward_choices():
+        data = election_data()
+        wards = sorted(data.index.unique("ward")) if not data.empty else []
+        with reactive.isolate():
+            selected = input.ward() if input.ward() in wards else ""
+        ui.update_select("ward", choices={"": "全体", **{ward: ward for ward in wards}}, selected=selected)
+    
+    @reactive.calc
+    def statistics_source():
+        """グラフ用の年度別データと、そのキャッシュ用キー（選挙データが無ければサンプルデータ）"""
+        data = election_data()
+        if data.empty:
+            return generate_sample_data(YEAR_MIN, YEAR_MAX), "sample"
+        ward = input.ward()
+        return shared.election_summary(data, ward), (data.attrs["signature"], ward)
+    
+    @debounce(DEBOUNCE_SECONDS)
     @reactive.calc
-    def filtered_data():
+    def plot_inputs():
         year_range = input.year_range()
-        start_year, end_year = year_range[0], year_range[1]
-        return generate_sample_data(start_year, end_year)
+        return int(year_range[0]), int(year_range[1]), tuple(input.selected_metrics())
     
-    @render.plot
+    last_render = reactive.value(None)
+    
+    @render.image(delete_file=True)
     def statistics_plot():
-        selected_metrics = input.selected_metrics()
-        data = filtered_data()
-        
-        if not selected_metrics:
-            fig, ax = plt.subplots(figsize=(12, 8))
-            ax.text(0.5, 0.5, '表示項目を選択してください', 
-                   ha='center', va='center', transform=ax.transAxes, fontsize=16)
-            ax.set_xlim(0, 1)
-            ax.set_ylim(0, 1)
-            ax.axis('off')
-            return fig
+        width = session.clientdata.output_width("statistics_plot")
+        height = session.clientdata.output_height("statistics_plot")
+        req(width, height)
+        width, height = int(width), int(height)
+        pixelratio = session.clientdata.pixelratio()
         
-        # (グラフ描画コードは元のまま)
-        # ...省略...
-        
-        return fig
+        # PNGの描画（キャッシュに無い場合）から一時ファイルへの書き出しまでを計る
+        start = time.perf_counter()
+        png, cache_hit = get_statistics_png(*statistics_source(), *plot_inputs(), width, height, pixelratio)
+        fd, path = tempfile.mkstemp(suffix=".png")
+        with os.fdopen(fd, "wb") as f:
+            f.write(png)
+        last_render.set((time.perf_counter() - start, cache_hit))
+        return {"src": path, "width": "100%", "height": f"{height}px", "alt": "統計データ推移グラフ"}
+    
+    @render.text
+    def data_source():
+        if election_data().empty:
+            return "※ データはサンプルデータです。"
+        years = sorted(election_data().index.unique("year"))
+        return f"※ 取得済みの選挙データ（{', '.join(map(str, years))}年）を表示しています。"
+    
+    @render.text
+    def render_time():
+        if last_render() is None:
+            return ""
+        seconds, cache_hit = last_render()
+        return f"図の描画時間: {seconds * 1000:.1f} ms" + ("（キャッシュ）" if cache_hit else "")
 
 app = App(app_ui, server)
\ No newline at end of file
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 列ごとの .npy ファイルを置く場所（同じマシンの全ワーカープロセスで共有）
+STORE_DIR = Path(os.environ.get("ZM12_STORE_DIR", Path(tempfile.gettempdir()) / "zm12-dashboard-store"))
+
+# マスク付き配列（Int64 など）の値の型 → 配列クラス
+_MASKED_ARRAY_TYPES = {
+    "b": pd.arrays.BooleanArray,
+    "f": pd.arrays.FloatingArray,
+}
+_MASKED_ARRAY_CLASSES = (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)
+
+def file_signature(*paths):
+    """ファイルの名前・サイズ・更新時刻（保存済みデータが古くなったかの判定用）"""
+    return tuple((str(p), p.stat().st_size, p.stat().st_mtime_ns) for p in paths)
+
+def _signature_hash(signature):
+    return hashlib.sha1(repr(signature).encode("utf-8")).hexdigest()[:16]
+
+def _write_frame(df, path):
+    """データフレームを列ごとの .npy ファイルと manifest.json に書き出す"""
+    index_names = [name for name in df.index.names if name is not None]
+    if index_names:
+        df = df.reset_index()
+
+    columns = []
+    for i, (name, series) in enumerate(df.items()):
+        column = {"name": name, "file": f"{i}.npy"}
+        dtype = series.dtype
+
+        if isinstance(dtype, pd.CategoricalDtype) or not (
+            pd.api.types.is_numeric_dtype(dtype)
+            or pd.api.types.is_bool_dtype(dtype)
+            or pd.api.types.is_datetime64_dtype(dtype)
+        ):
+            # 文字列などはカテゴリ型にして、コードだけを配列として保存する
+            categorical = pd.Categorical(series)
+            column["kind"] = "category"
+            column["categories"] = categorical.categories.tolist()
+            np.save(path / column["file"], categorical.codes)
+        elif isinstance(series.array, _MASKED_ARRAY_CLASSES):
+            # Int64 などの欠損値を持てる型は値とマスクを別々に保存する
+            column["kind"] = "masked"
+            column["mask_file"] = f"{i}_mask.npy"
+            np.save(path / column["file"], series.to_numpy(dtype=dtype.numpy_dtype, na_value=0))
+            np.save(path / column["mask_file"], series.isna().to_numpy())
+        else:
+            column["kind"] = "array"
+            np.save(path / column["file"], series.to_numpy())
+        columns.append(column)
+
+    manifest = {"columns": columns, "index": index_names}
+    (path / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+
+def _map_frame(path):
+    """保存済みの列を読み取り専用でメモリマップし、コピーせずにデータフレームを組み立てる"""
+    manifest = json.loads((path / "manifest.json").read_text(encoding="utf-8"))
+
+    data = {}
+    for column in manifest["columns"]:
+        values = np.load(path / column["file"], mmap_mode="r")
+        if column["kind"] == "category":
+            dtype = pd.CategoricalDtype(column["categories"])
+            data[column["name"]] = pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+        elif column["kind"] == "masked":
+            mask = np.load(path / column["mask_file"], mmap_mode="r")
+            array_type = _MASKED_ARRAY_TYPES.get(values.dtype.kind, pd.arrays.IntegerArray)
+            data[column["name"]] = array_type(values, mask, copy=False)
+        else:
+            data[column["name"]] = values
+
+    df = pd.DataFrame(data, copy=False)
+    if manifest["index"]:
+        df = df.set_index(manifest["index"])
+    return df
+
+def load_shared_frame(name, signature, build, store_dir=STORE_DIR):
+    """
+    共有データフレームを読み込む
+    signature が同じ保存済みデータがあれば、それを読み取り専用でメモリマップする（別プロセスで作られたものでも可）
+    無ければ build() で作成して保存する。返り値は変更しないこと
+    """
+    base = store_dir / name
+    path = base / _signature_hash(signature)
+
+    if not (path / "manifest.json").exists():
+        base.mkdir(parents=True, exist_ok=True)
+        # 一時ディレクトリに書き出してから名前を変えるので、途中の状態が他のプロセスから見えることはない
+        tmp_path = Path(tempfile.mkdtemp(prefix=f"{path.name}.tmp-", dir=base))
+        try:
+            _write_frame(build(), tmp_path)
+            os.rename(tmp_path, path)
+        except OSError:
+            # 他のワーカーが先に同じデータを保存した
+            if not (path / "manifest.json").exists():
+                raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+        # 自分が作ったものより古い版を削除（マップ中のプロセスがあってもLinuxでは読み続けられる）
+        created = path.stat().st_mtime
+        for old in base.iterdir():
+            try:
+                if old != path and ".tmp-" not in old.name and old.stat().st_mtime < created:
+                    shutil.rmtree(old, ignore_errors=True)
+            except FileNotFoundError:
+                pass
+
+    df = _map_frame(path)
+    df.attrs["signature"] = signature
+    return df
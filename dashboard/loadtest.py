@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+ダッシュボード（app.py）の負荷試験
+
+アプリを起動し、複数のセッションをWebSocketで同時に接続して入力を変更し、
+入力から出力が届くまでの時間（p50/p95）、出力ごとの描画時間、セッションあたりのメモリ使用量を計測する
+
+使用例:
+  python dashboard/loadtest.py
+  python dashboard/loadtest.py --sessions 50 --steps 30 --workers 2 --json loadtest.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import websockets
+
+app_dir = Path(__file__).parent
+
+# 入力 → その変更で更新される出力
+WATCHED_OUTPUTS = {
+    "initial_letter": "municipalities_table",
+    "name_filter": "municipalities_table",
+    "year_range": "statistics_plot",
+    "selected_metrics": "statistics_plot",
+}
+
+OUTPUT_IDS = ["municipalities_table", "page_info", "statistics_plot", "render_time", "data_source"]
+
+INITIAL_LETTERS = ["", "あ", "か", "さ", "た", "な", "は", "ま", "や"]
+NAME_FILTERS = ["", "島", "区", "市", "大阪", "都島"]
+METRICS = ["turnout_rate", "total_voters", "candidate_ratio", "male_voters", "female_voters"]
+
+def initial_inputs():
+    """セッション開始時にブラウザが送る入力値"""
+    inputs = {
+        "initial_letter": "",
+        "municipality_type": "",
+        "name_filter": "",
+        "sort_by": "reading",
+        "sort_desc": False,
+        "page_size": "25",
+        "prev_page": 0,
+        "next_page": 0,
+        "ward": "",
+        "year_range": [2010, 2020],
+        "selected_metrics": ["turnout_rate"],
+        ".clientdata_pixelratio": 1,
+        ".clientdata_output_statistics_plot_width": 800,
+        ".clientdata_output_statistics_plot_height": 400,
+    }
+    for output_id in OUTPUT_IDS:
+        inputs[f".clientdata_output_{output_id}_hidden"] = False
+    return inputs
+
+def random_change(rng, current):
+    """現在と異なる値になるよう、入力を1つ選んで変更する"""
+    name = rng.choice(list(WATCHED_OUTPUTS))
+    while True:
+        if name == "initial_letter":
+            value = rng.choice(INITIAL_LETTERS)
+        elif name == "name_filter":
+            value = rng.choice(NAME_FILTERS)
+        elif name == "year_range":
+            start = rng.randint(2000, 2019)
+            value = [start, rng.randint(start + 1, 2020)]
+        else:
+            value = sorted(rng.sample(METRICS, rng.randint(1, len(METRICS))), key=METRICS.index)
+        if value != current[name]:
+            return name, value
+
+def percentile(values, q):
+    """q パーセンタイル（最近傍法）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+def process_rss(pid):
+    """プロセス（子プロセスを含む）の常駐メモリ（バイト）。/proc が無い環境ではNone"""
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return None
+
+    total = 0
+    pids = [pid]
+    while pids:
+        current = pids.pop()
+        try:
+            for line in (proc / str(current) / "status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1]) * 1024
+            for task in (proc / str(current) / "task").iterdir():
+                children = (task / "children").read_text().split()
+                pids.extend(int(child) for child in children)
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+    return total
+
+class Session:
+    def __init__(self, url, rng, steps, think_time, timeout, release):
+        self.url = url
+        self.rng = rng
+        self.steps = steps
+        self.think_time = think_time
+        self.timeout = timeout
+        self.inputs = initial_inputs()
+        self.latencies = {name: [] for name in WATCHED_OUTPUTS}
+        self.render_times = {}
+        self.timeouts = 0
+        self.errors = []
+        self._recalculating = {}
+        self.ready = asyncio.Event()
+        self.finished = asyncio.Event()
+        self.release = release
+
+    def _handle(self, message):
+        """受信したメッセージから描画時間を記録し、更新された出力名を返す"""
+        now = time.perf_counter()
+        data = json.loads(message)
+
+        status = data.get("recalculating")
+        if status:
+            if status["status"] == "recalculating":
+                self._recalculating[status["name"]] = now
+            elif status["name"] in self._recalculating:
+                elapsed = now - self._recalculating.pop(status["name"])
+                self.render_times.setdefault(status["name"], []).append(elapsed)
+
+        if data.get("errors"):
+            self.errors.extend(f"{name}: {error}" for name, error in data["errors"].items())
+
+        return set(data.get("values") or {})
+
+    async def _wait_for(self, ws, output_id):
+        """指定した出力が届くまで待ち、経過時間を返す（時間切れならNone）"""
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return None
+            try:
+                message = await asyncio.wait_for(ws.recv(), remaining)
+            except asyncio.TimeoutError:
+                return None
+            if output_id in self._handle(message):
+                return time.perf_counter() - start
+
+    async def run(self):
+        async with websockets.connect(self.url, max_size=None) as ws:
+            await ws.send(json.dumps({"method": "init", "data": self.inputs}))
+            await self._wait_for(ws, "statistics_plot")
+            self.ready.set()
+
+            for _ in range(self.steps):
+                await asyncio.sleep(self.rng.expovariate(1 / self.think_time) if self.think_time else 0)
+                name, value = random_change(self.rng, self.inputs)
+                self.inputs[name] = value
+                await ws.send(json.dumps({"method": "update", "data": {name: value}}))
+                elapsed = await self._wait_for(ws, WATCHED_OUTPUTS[name])
+                if elapsed is None:
+                    self.timeouts += 1
+                else:
+                    self.latencies[name].append(elapsed)
+
+            # 全セッションの操作が終わるまで接続を保つ（メモリ計測のため）
+            self.finished.set()
+            await self.release.wait()
+
+def start_app(port, workers):
+    """uvicornでアプリを起動し、応答するまで待つ"""
+    command = [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"]
+    if workers > 1:
+        command += ["--workers", str(workers)]
+    server = subprocess.Popen(command, cwd=app_dir)
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("アプリの起動に失敗しました")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("アプリが時間内に起動しませんでした")
+
+async def run_load_test(args):
+    server = start_app(args.port, args.workers)
+    try:
+        baseline_rss = process_rss(server.pid)
+        url = f"ws://127.0.0.1:{args.port}/websocket/"
+        release = asyncio.Event()
+        sessions = [
+            Session(url, random.Random(args.seed + i), args.steps, args.think_time, args.timeout, release)
+            for i in range(args.sessions)
+        ]
+
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(session.run()) for session in sessions]
+        await asyncio.gather(*(session.ready.wait() for session in sessions))
+        connected_rss = process_rss(server.pid)
+        await asyncio.gather(*(session.finished.wait() for session in sessions))
+        duration = time.perf_counter() - started
+        final_rss = process_rss(server.pid)
+        release.set()
+        await asyncio.gather(*tasks)
+    finally:
+        server.terminate()
+        server.wait()
+
+    return summarize(args, sessions, duration, baseline_rss, connected_rss, final_rss)
+
+def summarize(args, sessions, duration, baseline_rss, connected_rss, final_rss):
+    """計測結果を集計する"""
+    def stats(values):
+        return {
+            "count": len(values),
+            "p50_ms": None if not values else percentile(values, 50) * 1000,
+            "p95_ms": None if not values else percentile(values, 95) * 1000,
+            "max_ms": None if not values else max(values) * 1000,
+        }
+
+    latencies = {name: [v for s in sessions for v in s.latencies[name]] for name in WATCHED_OUTPUTS}
+    render_times = {}
+    for session in sessions:
+        for name, values in session.render_times.items():
+            render_times.setdefault(name, []).extend(values)
+
+    memory = None
+    if baseline_rss is not None:
+        memory = {
+            "baseline_mb": baseline_rss / 2**20,
+            "connected_mb": connected_rss / 2**20,
+            "final_mb": final_rss / 2**20,
+            "per_session_kb": (final_rss - baseline_rss) / len(sessions) / 1024,
+        }
+
+    return {
+        "sessions": args.sessions,
+        "steps": args.steps,
+        "workers": args.workers,
+        "duration_s": duration,
+        "latency": {"all": stats([v for values in latencies.values() for v in values]),
+                    **{name: stats(values) for name, values in latencies.items()}},
+        "render_time": {name: stats(values) for name, values in sorted(render_times.items())},
+        "memory": memory,
+        "timeouts": sum(s.timeouts for s in sessions),
+        "errors": [error for s in sessions for error in s.errors][:20],
+    }
+
+def print_report(report):
+    def fmt(value):
+        return "-" if value is None else f"{value:8.1f}"
+
+    print(f"\n=== 負荷試験結果: {report['sessions']}セッション × {report['steps']}操作"
+          f"（ワーカー数: {report['workers']}、所要時間: {report['duration_s']:.1f}秒） ===")
+
+    print("\n入力 → 出力までの時間 (ms)")
+    print(f"{'入力':<20}{'件数':>6}{'p50':>10}{'p95':>10}{'最大':>10}")
+    for name, s in report["latency"].items():
+        print(f"{name:<20}{s['count']:>6}{fmt(s['p50_ms']):>10}{fmt(s['p95_ms']):>10}{fmt(s['max_ms']):>10}")
+
+    print("\n出力ごとの描画時間 (ms)")
+    print(f"{'出力':<24}{'件数':>6}{'p50':>10}{'p95':>10}{'最大':>10}")
+    for name, s in report["render_time"].items():
+        print(f"{name:<24}{s['count']:>6}{fmt(s['p50_ms']):>10}{fmt(s['p95_ms']):>10}{fmt(s['max_ms']):>10}")
+
+    memory = report["memory"]
+    if memory:
+        print(f"\nメモリ: 起動直後 {memory['baseline_mb']:.1f} MB → 全セッション接続後 {memory['connected_mb']:.1f} MB"
+              f" → 終了時 {memory['final_mb']:.1f} MB（1セッションあたり {memory['per_session_kb']:.0f} KB）")
+    else:
+        print("\nメモリ: この環境では計測できません（/proc がありません）")
+
+    if report["timeouts"]:
+        print(f"\n警告: 時間内に出力が届かなかった操作: {report['timeouts']}件")
+    for error in report["errors"]:
+        print(f"エラー: {error}")
+
+def main():
+    parser = argparse.ArgumentParser(description='ダッシュボードの負荷試験を行うプログラム')
+    parser.add_argument('--sessions', '-n', type=int, default=10, help='同時セッション数 (デフォルト: 10)')
+    parser.add_argument('--steps', '-s', type=int, default=20, help='1セッションあたりの入力変更回数 (デフォルト: 20)')
+    parser.add_argument('--think-time', type=float, default=0.2, help='入力変更の平均間隔（秒） (デフォルト: 0.2)')
+    parser.add_argument('--timeout', type=float, default=10, help='出力を待つ最大秒数 (デフォルト: 10)')
+    parser.add_argument('--workers', '-w', type=int, default=1, help='uvicornのワーカー数 (デフォルト: 1)')
+    parser.add_argument('--port', '-p', type=int, default=8765, help='アプリを起動するポート (デフォルト: 8765)')
+    parser.add_argument('--seed', type=int, default=0, help='操作を決める乱数のシード (デフォルト: 0)')
+    parser.add_argument('--json', help='結果をJSONファイルにも保存 (ファイル名を指定)')
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load_test(args))
+    print_report(report)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n結果を '{args.json}' に保存しました。")
+
+    return 1 if report["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
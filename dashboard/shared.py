@@ -1,10 +1,137 @@
+import os
+import re
 from pathlib import Path
 
 import pandas as pd
 
+import datastore
+
 app_dir = Path(__file__).parent
-df = pd.read_csv(app_dir / "penguins.csv")
+df = datastore.load_shared_frame(
+    "penguins",
+    datastore.file_signature(app_dir / "penguins.csv"),
+    lambda: pd.read_csv(app_dir / "penguins.csv"),
+)
+
+# 選挙データ（zm12 get-table で取得した表）の置き場所
+DATA_DIR = Path(os.environ.get("ZM12_DATA_DIR", app_dir.parent / "gotten_data"))
+
+# 元号の元年の前年（h23 → 1988 + 23 = 2011年）
+ERA_OFFSETS = {"m": 1867, "t": 1911, "s": 1925, "h": 1988, "r": 2018}
+
+# 表の見出し → 列名
+TURNOUT_MEASURES = {
+    "当日有権者数(人)": "electorate",
+    "投票者数(人)": "voters",
+    "投票率(%)": "turnout",
+}
 
 def m_to_h(minutes:int):
     hour = minutes / 60
-    return hour
\ No newline at end of file
+    return hour
+
+def year_from_name(name):
+    """ファイル名から西暦年を求める（h23, r5 などの和暦か4桁の西暦）"""
+    stem = Path(name).stem.lower()
+    match = re.fullmatch(r"([mtshr])(\d{1,2})", stem)
+    if match:
+        return ERA_OFFSETS[match.group(1)] + int(match.group(2))
+    match = re.search(r"(?<!\d)(19|20)\d{2}(?!\d)", stem)
+    if match:
+        return int(match.group(0))
+    return None
+
+def election_files(data_dir=DATA_DIR):
+    """年度が分かる選挙データファイルの一覧"""
+    if not data_dir.is_dir():
+        return []
+    return sorted(p for p in data_dir.iterdir() if p.is_file() and year_from_name(p.name) is not None)
+
+def election_signature(data_dir=DATA_DIR):
+    """データファイルの名前と更新時刻（変更の検知用）"""
+    return tuple((p.name, p.stat().st_mtime_ns) for p in election_files(data_dir))
+
+def read_turnout_table(path, year):
+    """
+    区ごとの投票率の表（見出し2行: 項目 / 男・女・計）を縦長の形に変換
+    「無投票」の区は数値を欠損値にして uncontested 列で区別する
+    """
+    raw = pd.read_csv(path, header=[0, 1])
+    ward_column = raw.columns[0]
+    raw = raw.set_index(ward_column)
+    raw.index.name = "ward"
+
+    # 「大阪市計」などの合計行は集計時に計算し直すので除く
+    raw = raw[~raw.index.str.endswith("計")]
+
+    raw = raw.loc[:, raw.columns.get_level_values(0).isin(TURNOUT_MEASURES)]
+    raw.columns = pd.MultiIndex.from_arrays(
+        [raw.columns.get_level_values(0).map(TURNOUT_MEASURES), raw.columns.get_level_values(1)],
+        names=[None, "sex"],
+    )
+
+    table = raw.stack(level="sex", future_stack=True)
+    table = table.apply(pd.to_numeric, errors="coerce")
+    table["uncontested"] = table["electorate"].isna()
+    table["year"] = year
+    return table.reset_index()
+
+def load_election_data(data_dir=DATA_DIR):
+    """
+    選挙データをすべて読み込み、(区, 年度, 性別) を索引とした1つのデータフレームにする
+    ファイルが変わっていなければ、どのワーカープロセスでも保存済みのものをメモリマップして使う
+    全セッションで共有するので、呼び出し側では変更しないこと
+    """
+    signature = election_signature(data_dir)
+    return datastore.load_shared_frame(
+        "election",
+        (str(data_dir), signature),
+        lambda: _read_election_data(data_dir, signature),
+    )
+
+def _read_election_data(data_dir, signature):
+    tables = [read_turnout_table(data_dir / name, year_from_name(name)) for name, _ in signature]
+
+    if tables:
+        data = pd.concat(tables, ignore_index=True)
+    else:
+        data = pd.DataFrame(columns=["ward", "sex", *TURNOUT_MEASURES.values(), "uncontested", "year"])
+
+    data = data.astype({
+        "ward": "category",
+        "sex": "category",
+        "year": "int16",
+        "electorate": "Int64",
+        "voters": "Int64",
+        "turnout": "float64",
+        "uncontested": "bool",
+    })
+    return data.set_index(["ward", "year", "sex"]).sort_index()
+
+def election_summary(data, ward=""):
+    """
+    年度ごとの集計（区を指定しない場合は全区の合計）
+    列名はダッシュボードの統計項目に合わせる
+    """
+    columns = ["year", "turnout_rate", "total_voters", "male_voters", "female_voters", "candidate_ratio"]
+    if data.empty:
+        return pd.DataFrame(columns=columns)
+
+    if ward:
+        subset = data.xs(ward, level="ward")[["electorate", "voters"]]
+    else:
+        subset = data[["electorate", "voters"]].groupby(level=["year", "sex"], observed=True).sum(min_count=1)
+
+    wide = subset.unstack("sex")
+    electorate = wide["electorate"]
+    voters = wide["voters"]
+
+    summary = pd.DataFrame({
+        "year": wide.index.astype(int),
+        "turnout_rate": (voters["計"] / electorate["計"] * 100).astype("float64").to_numpy(),
+        "total_voters": electorate["計"].to_numpy(),
+        "male_voters": electorate["男"].to_numpy(),
+        "female_voters": electorate["女"].to_numpy(),
+        "candidate_ratio": float("nan"),
+    }, columns=columns)
+    return summary
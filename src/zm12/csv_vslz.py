@@ -4,6 +4,125 @@ import seaborn as sns
 import numpy as np
 from pathlib import Path
 import warnings
+import cProfile
+import glob
+import math
+import json
+import logging
+import os
+import sys
+import time
+import heapq
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from zm12.sketches import ColumnAccumulator, PairwiseMoments
+from zm12.html_report import write_html_report
+from zm12.timeseries import (detect_time_column, to_timestamps, duration_ns, choose_frequency, frequency_label,
+                             resample, rolling_mean, calendar_layout, calendar)
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+batch_logger = logging.getLogger(__name__ + ".batch")
+
+
+class JsonEventFormatter(logging.Formatter):
+    """ログを1行1件のJSON（JSON Lines）にする。_event() で渡した event 名と項目を含む"""
+    def format(self, record):
+        event = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "event": getattr(record, "event", "log"),
+            "message": record.getMessage().strip(),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            event["traceback"] = self.formatException(record.exc_info)
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+# setup_logging() で設定した画面表示（ワーカープロセスに引き継ぐ）
+_console_settings = (logging.WARNING, True)
+
+
+class _DetailFilter(logging.Filter):
+    """ファイルごとの詳細なログ（csv_vslz の警告未満）を通さない"""
+    def filter(self, record):
+        return record.name != __name__ or record.levelno >= logging.WARNING
+
+
+def setup_logging(level=logging.INFO, events_file=None, details=True):
+    """
+    zm12 のログ出力を設定（何度呼んでもよい）
+    
+    Parameters:
+    -----------
+    level : int
+        画面に表示するログのレベル（logging.WARNING にすると警告とエラーのみ）
+    events_file : str or None
+        指定した場合は、レベルにかかわらず全てのイベントをJSON Lines形式で保存
+    details : bool
+        Falseの場合は、ファイルごとの処理状況を画面に表示しない（バッチ処理用）
+    """
+    root = logging.getLogger("zm12")
+    for handler in [h for h in root.handlers if getattr(h, "_zm12", False)]:
+        root.removeHandler(handler)
+        handler.close()
+    
+    console = logging.StreamHandler(sys.stdout)
+    console.setLevel(level)
+    console.setFormatter(logging.Formatter("%(message)s"))
+    if not details:
+        console.addFilter(_DetailFilter())
+    handlers = [console]
+    
+    if events_file:
+        events = logging.FileHandler(events_file, mode="w", encoding="utf-8")
+        events.setLevel(logging.DEBUG)
+        events.setFormatter(JsonEventFormatter())
+        handlers.append(events)
+    
+    global _console_settings
+    _console_settings = (level, details)
+    for handler in handlers:
+        handler._zm12 = True
+        root.addHandler(handler)
+    root.setLevel(min(handler.level for handler in handlers))
+    root.propagate = False
+
+
+def _event(level, event, message, exc_info=False, **fields):
+    """イベント名と項目付きのログ（JSONの出力先では項目がそのまま残る）"""
+    if logger.isEnabledFor(level):
+        logger.log(level, message, exc_info=exc_info, extra={"event": event, "fields": fields})
+
+
+class ProgressBar:
+    """
+    端末に1行の進捗バーを表示（標準エラー出力が端末でない場合や、INFOのログが無効な場合は何もしない）
+    """
+    def __init__(self, total, stream=None, width=30, interval=0.1):
+        self.total = total
+        self.done = 0
+        self.stream = stream or sys.stderr
+        self.width = width
+        self.interval = interval
+        self.enabled = total > 0 and self.stream.isatty() and logger.isEnabledFor(logging.INFO) \
+            and not logger.isEnabledFor(logging.DEBUG)
+        self._last = 0.0
+    
+    def update(self, n=1):
+        self.done += n
+        if self.enabled and (time.perf_counter() - self._last >= self.interval or self.done >= self.total):
+            self._last = time.perf_counter()
+            filled = int(self.width * self.done / self.total)
+            self.stream.write(f"\r[{'#' * filled}{'.' * (self.width - filled)}] {self.done}/{self.total} 図")
+            self.stream.flush()
+    
+    def close(self):
+        if self.enabled:
+            self.stream.write("\n")
+            self.stream.flush()
+
 
 # 日本語フォント設定
 def setup_japanese_font():
@@ -26,7 +145,7 @@ def setup_japanese_font():
     for font in japanese_fonts:
         if font in available_fonts:
             plt.rcParams['font.family'] = font
-            print(f"日本語フォントを設定しました: {font}")
+            logger.info(f"日本語フォントを設定しました: {font}")
             return
     
     # フォールバック: matplotlibのデフォルト日本語対応
@@ -35,22 +154,493 @@ def setup_japanese_font():
     
     # 負の値の表示も修正
     plt.rcParams['axes.unicode_minus'] = False
-    print("デフォルトフォント設定を使用します")
+    logger.info("デフォルトフォント設定を使用します")
+
+_warmed_up = False
+
+
+def warm_up(backend="Agg"):
+    """
+    描画の準備（バックエンドとフォントの設定）をプロセスごとに1度だけ行う
+    バッチ処理で、ファイルごとにフォントを探し直さないようにする
+    """
+    global _warmed_up
+    if _warmed_up:
+        return
+    plt.switch_backend(backend)
+    setup_japanese_font()
+    warnings.filterwarnings('ignore', message='Glyph .* missing from font')
+    _warmed_up = True
 
 # フォント設定を実行
 if __name__ == '__main__':
+    setup_logging()
     setup_japanese_font()
     warnings.filterwarnings('ignore')
 
-def visualize_csv_data(csv_file_path, output_dir="plots", figsize=(12, 4), show_only=False, category_columns=None, plot_types="all", exclude_columns=None, initialize_dir=False):
+# 実行レポート・プロファイルのファイル名（出力ディレクトリに保存）
+REPORT_FILENAME = "run_report.json"
+PROFILE_FILENAME = "profile.pstats"
+BATCH_REPORT_FILENAME = "batch_report.json"
+HTML_REPORT_FILENAME = "report.html"
+
+# quantile_error を指定した場合に、四分位数と外れ値の数を近似するデータ数の下限
+APPROX_MIN_ROWS = 100_000
+
+# データ数がこれ以上の列は、集計済みのビンと抽出した値で描く（統計量は全ての値から求める）
+DOWNSAMPLE_THRESHOLD = 100_000
+# バイオリンプロットと外れ値の点に使う値の数
+SAMPLE_SIZE = 10_000
+
+# 組ごとの分析（pairwise=True）で保存する相関係数の表
+CORRELATION_FILENAME = "correlation.csv"
+# カテゴリごとに六角形ビンの図を描く組の数（相関係数の絶対値の大きい順）
+PAIRWISE_MAX_PAIRS = 12
+# 六角形ビンの図に使う2次元のビンの数（各軸）
+PAIR_BINS = 40
+
+# 時系列（timeseries=True）の移動平均の区間数（window を指定しない場合）
+TIMESERIES_WINDOW = 7
+# 時系列の集計の区間数の上限（間隔が短すぎる指定を防ぐ）
+TIMESERIES_MAX_BINS = 1_000_000
+# 時系列の場合に追加する、エポックからのナノ秒（int64）の列
+_TIME_KEY = "__timestamp__"
+
+
+class RunReport:
+    """
+    実行時の段階ごとの処理時間と件数を記録する
+    
+    段階: load（読み込み）, partition（分類）, stats（統計量）, render（描画）, save（保存）, show（表示）
+    件数: rows_loaded, groups, rows_processed, figures, skipped, bytes_written
+    """
+    def __init__(self):
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._end = None
+        self.stages = {}
+        self.counters = {}
+    
+    @contextmanager
+    def stage(self, name):
+        """with文の中の処理時間を段階 name に加算"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+    
+    def add_time(self, name, seconds):
+        stage = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+        stage["seconds"] += seconds
+        stage["calls"] += 1
+    
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+    
+    def timed_iter(self, name, iterable):
+        """イテレータから要素を取り出す時間を段階 name に加算しながら順に返す"""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(name, time.perf_counter() - start)
+                return
+            self.add_time(name, time.perf_counter() - start)
+            yield item
+    
+    def finish(self):
+        """経過時間の計測を終える（以降の to_dict() などは終了時点の経過時間を使う）"""
+        if self._end is None:
+            self._end = time.perf_counter()
+    
+    @property
+    def elapsed(self):
+        """開始からの経過時間（秒）"""
+        return (self._end or time.perf_counter()) - self._start
+    
+    def merge(self, other):
+        """別の RunReport の処理時間と件数を加算（バッチ処理の集計用）"""
+        for name, stage in other.stages.items():
+            merged = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+            merged["seconds"] += stage["seconds"]
+            merged["calls"] += stage["calls"]
+        for name, value in other.counters.items():
+            self.count(name, value)
+    
+    def write(self, path, **extra):
+        """JSONファイルに保存"""
+        Path(path).write_text(json.dumps(self.to_dict(**extra), ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+    
+    def to_dict(self, **extra):
+        return {
+            **extra,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "total_seconds": self.elapsed,
+            "stages": self.stages,
+            "counters": self.counters,
+        }
+    
+    def summary(self):
+        """表示用の文字列"""
+        # 割合は段階の合計に対するもの（並列処理では段階の合計が経過時間を超える）
+        measured = sum(stage["seconds"] for stage in self.stages.values())
+        lines = [f"合計: {self.elapsed:.2f}秒"]
+        for name, stage in self.stages.items():
+            share = stage["seconds"] / measured * 100 if measured else 0
+            lines.append(f"  {name:<10}{stage['seconds']:8.2f}秒 ({share:5.1f}%)  {stage['calls']}回")
+        if self.counters:
+            lines.append("  " + ", ".join(f"{name}: {value}" for name, value in self.counters.items()))
+        return "\n".join(lines)
+
+
+class AnalysisResult:
+    """
+    analyze() の結果
+    
+    Attributes:
+    -----------
+    source : str
+        入力（CSVファイルのパス、またはデータの種類）
+    output_dir : Path or None
+        図の保存先（保存しない場合はNone）
+    numeric_columns, category_columns : list
+        処理した数値列と分類列
+    figures : list of dict
+        作成した図 {"column", "category", "rows", "path"（保存しない場合はNone）}
+    stats : dict
+        {(カテゴリ名, 列名): column_stats() の結果}
+    errors : list of dict
+        処理できなかった列 {"column", "category", "error"}
+    summary : pd.DataFrame or None
+        データ全体の describe()
+    report : RunReport
+        段階ごとの処理時間と件数
+    accumulators : dict
+        {(カテゴリ名, 列名): sketches.ColumnAccumulator}（accumulate() の場合のみ）
+    histograms : dict
+        {(カテゴリ名, 列名): {"counts": 共通のビンの度数, "whislo", "whishi"}}（histograms=True の場合のみ）
+    bin_edges : dict
+        {列名: 全てのカテゴリで共通のビンの境界}（histograms=True の場合のみ）
+    correlations : dict
+        {カテゴリ名: 相関係数の行列（pd.DataFrame）}（pairwise=True の場合のみ）
+    pair_counts : dict
+        {カテゴリ名: 組ごとの両方が欠損でない行の数の行列（pd.DataFrame）}（pairwise=True の場合のみ）
+    timeseries : dict
+        {(カテゴリ名, 列名): 区間ごとの count, mean, min, max, rolling（pd.DataFrame、区間の開始時刻が索引）}
+        （timeseries=True の場合のみ）
+    """
+    def __init__(self, source, output_dir=None, report=None):
+        self.source = source
+        self.output_dir = output_dir
+        self.numeric_columns = []
+        self.category_columns = []
+        self.figures = []
+        self.stats = {}
+        self.errors = []
+        self.summary = None
+        self.report = report or RunReport()
+        self.accumulators = {}
+        self.histograms = {}
+        self.bin_edges = {}
+        self.correlations = {}
+        self.pair_counts = {}
+        self.timeseries = {}
+    
+    @property
+    def ok(self):
+        """全ての列を処理できたかどうか"""
+        return not self.errors
+    
+    def stats_frame(self):
+        """統計量を (カテゴリ, 列) を索引とするデータフレームにする"""
+        index = pd.MultiIndex.from_tuples(list(self.stats), names=["category", "column"])
+        return pd.DataFrame(list(self.stats.values()), index=index)
+    
+    def correlation_frame(self):
+        """組ごとの相関係数を (カテゴリ, 列x, 列y) の行の表にする（列x が列y より前の組のみ）"""
+        frames = []
+        for category, corr in self.correlations.items():
+            i, j = np.triu_indices(len(corr.columns), k=1)
+            frames.append(pd.DataFrame({
+                "category": category,
+                "x": corr.columns[i],
+                "y": corr.columns[j],
+                "count": self.pair_counts[category].to_numpy()[i, j],
+                "r": corr.to_numpy()[i, j],
+            }))
+        if not frames:
+            return pd.DataFrame(columns=["category", "x", "y", "count", "r"])
+        return pd.concat(frames, ignore_index=True)
+    
+    def to_dict(self):
+        """JSONに変換できる辞書"""
+        return {
+            "source": self.source,
+            "output_dir": None if self.output_dir is None else str(self.output_dir),
+            "numeric_columns": self.numeric_columns,
+            "category_columns": self.category_columns,
+            "figures": self.figures,
+            "stats": [{"category": category, "column": column, **{k: float(v) for k, v in stats.items()}}
+                      for (category, column), stats in self.stats.items()],
+            "errors": self.errors,
+            "report": self.report.to_dict(),
+        }
+    
+    def __repr__(self):
+        return (f"<AnalysisResult source={self.source!r} figures={len(self.figures)} "
+                f"stats={len(self.stats)} errors={len(self.errors)}>")
+
+
+def analyze(source, output_dir="plots", figsize=(12, 4), show_only=False, category_columns=None, plot_types="all", exclude_columns=None, initialize_dir=False, render=True, report=None, progress=True, quantile_error=None, downsample_threshold=DOWNSAMPLE_THRESHOLD, grid=False, histograms=False, engine=None, render_workers=1, pairwise=False, max_pairs=PAIRWISE_MAX_PAIRS, timeseries=False, time_column=None, frequency=None, window=None):
+    """
+    数値変数の統計量を求めて図を作成し、結果を返す（visualize_csv_data の本体）
+    
+    visualize_csv_data と異なり、読み込みの失敗などの例外はそのまま送出する
+    列ごとの失敗は処理を続け、AnalysisResult.errors に記録する
+    
+    Parameters:
+    -----------
+    source : str, Path, pd.DataFrame, pyarrow.Table or np.ndarray
+        CSVファイルのパス、またはメモリ上のデータ（to_dataframe() を参照、変更はしない）
+    render : bool
+        Falseの場合は統計量のみ求め、図は作成しない（デフォルト: True）
+    report : RunReport or None
+        処理時間と件数の記録先（Noneの場合は新しく作成）
+    progress : bool
+        Falseの場合は進捗バーを表示しない（デフォルト: True）
+    quantile_error : float or None
+        指定した場合は、データ数が APPROX_MIN_ROWS 以上の列の四分位数と外れ値の数を
+        この正規化順位の誤差のスケッチで近似する（全ての値を並べ替えない、デフォルト: None）
+    downsample_threshold : int or None
+        データ数がこれ以上の列は、ヒストグラムを集計済みのビンから、バイオリンプロットと外れ値の点を
+        SAMPLE_SIZE 個の抽出した値から描く（Noneの場合は常に全ての値を描く、デフォルト: DOWNSAMPLE_THRESHOLD）
+    grid : bool
+        Trueの場合はカテゴリごとの図を作らず、列ごとに全てのカテゴリを並べた1枚の図を作成する
+        （箱ひげ図・バイオリンプロットは横に並べ、ヒストグラムは共通のビンで重ねる、デフォルト: False）
+    histograms : bool
+        Trueの場合は (カテゴリ, 列) ごとの共通のビンの度数と箱ひげ図のひげの位置を
+        AnalysisResult.histograms に記録する（HTMLレポート用、デフォルト: False）
+    engine : Engine or None
+        読み込み・分類・統計量・描画・保存の各段階の関数（Noneの場合は Engine() の既定の関数）
+    render_workers : int
+        2以上の場合は、(カテゴリ, 列) ごとに統計量をこのプロセスで求め、図の作成と保存をこの数のプロセスで並列に行う
+        （待っている図のうち見積もった重さ（plot_cost）の大きいものから割り当てる。RenderQueue を参照。
+        表示のみ・グリッドの場合は使わない、デフォルト: 1）
+    pairwise : bool
+        Trueの場合は列ごとの図の代わりに、カテゴリごとに数値列の全ての組の相関係数を求め、
+        相関係数の図と、相関の強い max_pairs 組の六角形ビンの図を作成する。
+        相関係数は AnalysisResult.correlations に記録し、保存する場合は correlation.csv にも保存する（デフォルト: False）
+    max_pairs : int
+        六角形ビンの図を描く組の数（デフォルト: PAIRWISE_MAX_PAIRS）
+    timeseries : bool
+        Trueの場合は列ごとの分布の図の代わりに、日時の列の順に並べた値を一定の間隔で集計し、
+        推移（平均・最小〜最大・移動平均）とカレンダーの図を (カテゴリ, 列) ごとに作成する。
+        集計した値は AnalysisResult.timeseries に記録する（デフォルト: False）
+    time_column : str or None
+        日時の列（Noneの場合は自動で検出、detect_time_column() を参照）
+    frequency : str or None
+        集計の間隔（"1h"、"1D" など。Noneの場合は全体の期間が2000区間以下になる間隔）
+    window : str or None
+        移動平均の期間（"7D" など。Noneの場合は TIMESERIES_WINDOW 区間）
+    その他の引数は visualize_csv_data と同じ
+    
+    Returns:
+    --------
+    AnalysisResult
+    """
+    report = report or RunReport()
+    engine = engine or Engine()
+    save = render and not show_only
+    
+    # データを読み込み（メモリ上のデータはできるだけコピーせずにデータフレームにする）
+    with report.stage("load"):
+        df = engine.loader(source)
+    result = AnalysisResult(source_name(source), report=report)
+    report.count("rows_loaded", len(df))
+    _event(logging.INFO, "data_loaded", f"データを読み込みました: {result.source}", path=result.source, rows=df.shape[0], columns=df.shape[1])
+    logger.info(f"データ形状: {df.shape}")
+    
+    # 出力ディレクトリの処理（保存する場合のみ）
+    output_path = prepare_output_dir(output_dir, initialize_dir) if save else None
+    result.output_dir = output_path
+    
+    # 時系列の場合は時刻の順に並べ、日時の列は分類・数値の列から除く
+    timeline = None
+    if timeseries:
+        with report.stage("load"):
+            df, timeline = prepare_timeline(df, time_column, frequency, window)
+        _event(logging.INFO, "timeline", f"日時の列: {timeline['column']}（{frequency_label(timeline['frequency'])}ごと、{timeline['bins']}区間）",
+               column=timeline["column"], frequency_ns=timeline["frequency"], bins=timeline["bins"])
+    
+    # 処理対象の数値列と分類列を決定
+    numeric_columns, selected_category_columns = select_columns(
+        df if timeline is None else df.drop(columns=[timeline["column"], _TIME_KEY]), category_columns, exclude_columns)
+    if not numeric_columns:
+        return result
+    if engine.partitioner is None:
+        selected_category_columns = []
+    logger.info(f"プロット種類: {plot_types}")
+    
+    result.numeric_columns = numeric_columns
+    result.category_columns = selected_category_columns
+    plot_functions = resolve_plot_functions(plot_types)
+    column_types = column_plot_types(plot_functions)
+    # ファイル名にはその図に描く種類を使う（不正な名前やカテゴリごとの種類は含めない）
+    column_label = plot_types_label(plot_types, column_types)
+    # 相関・時系列の場合は列ごとの分布の図を作らない
+    distributions = not grid and not pairwise and not timeseries
+    group_types = group_plot_types(plot_functions) if render and distributions else []
+    # 並列に描く場合は描画のタスクを順にワーカープロセスへ渡す（図は最後にまとめて result に加える）
+    tasks = RenderQueue(render_workers, result) if render_workers > 1 and save and distributions else None
+    
+    # 分類処理
+    if selected_category_columns:
+        # 各分類列の組み合わせを作成
+        with report.stage("partition"):
+            combinations = category_combinations(df, selected_category_columns)
+        
+        logger.info(f"分類基準: {selected_category_columns}")
+        logger.info(f"カテゴリ組み合わせ数: {len(combinations)}")
+        groups = report.timed_iter("partition", engine.partitioner(df, selected_category_columns, combinations))
+        category_column = "_".join(selected_category_columns)
+        total = len(combinations) * len(numeric_columns)
+    else:
+        # 分類列がない場合は全体を処理
+        groups = [("全体", df)]
+        category_column = None
+        total = len(numeric_columns)
+    progress = ProgressBar(total if progress else 0)
+    
+    # グリッドの場合は列ごとに共通のビンで集計した値を集め、最後に1枚ずつ描く
+    grid_entries = {column: [] for column in numeric_columns} if grid else None
+    if (grid and render) or histograms:
+        with report.stage("stats"):
+            edges = {column: _common_edges(df[column]) for column in numeric_columns}
+        if histograms:
+            result.bin_edges = {column: e for column, e in edges.items() if e is not None}
+    if pairwise:
+        # 六角形ビンの範囲は全てのカテゴリで共通にする
+        with report.stage("stats"):
+            pair_ranges = {column: (low, high) for column, low, high in
+                           zip(numeric_columns, df[numeric_columns].min(), df[numeric_columns].max())}
+    
+    # 各組み合わせごとに処理
+    for category_name, subset_df in groups:
+        report.count("groups")
+        _event(logging.DEBUG, "group_started", f"\n=== カテゴリ '{category_name}' の処理 ===\nデータ数: {len(subset_df)}",
+               category=category_name, rows=len(subset_df))
+        
+        if len(subset_df) == 0:
+            logger.debug(f"カテゴリ '{category_name}' にデータがありません。")
+            progress.update(len(numeric_columns))
+            continue
+        if timeline is not None:
+            subset_df, stamps = _sorted_by_time(subset_df)
+        
+        # カテゴリごとの数値列を処理
+        for column in numeric_columns:
+            try:
+                render_now = render and distributions and tasks is None and bool(column_types)
+                processed = _process_column(subset_df, column, category_name, category_column, output_path,
+                                            figsize, show_only, column_types, column_label, report, render_now,
+                                            quantile_error, downsample_threshold, engine)
+                if processed is not None and tasks is not None and column_types:
+                    data = subset_df[column].dropna()
+                    args = (data, column, category_name, category_column, processed[0], output_path, figsize,
+                            column_types, column_label, downsample_threshold, engine)
+                    tasks.add(plot_cost(column_types, len(data), downsample_threshold), _render_column_task, args)
+                if processed is not None and ((grid and render) or histograms):
+                    with report.stage("stats"):
+                        data = subset_df[column].dropna()
+                        if grid and render:
+                            grid_entries[column].append(_grid_entry(data, category_name, processed[0], edges[column]))
+                        if histograms:
+                            result.histograms[(category_name, column)] = _histogram_entry(data, processed[0], edges[column])
+                if processed is not None and timeline is not None:
+                    figure = _process_timeseries(subset_df, column, stamps, category_name, category_column, output_path,
+                                                 figsize, show_only, timeline, result, render, engine)
+                    if figure is not None:
+                        result.figures.append(figure)
+            except Exception as e:
+                result.errors.append({"column": column, "category": category_name, "error": str(e)})
+                _event(logging.ERROR, "error", f"エラーが発生しました: {str(e)}", column=column, category=category_name,
+                       exc_info=logger.isEnabledFor(logging.DEBUG))
+            else:
+                if processed is not None:
+                    stats, figure = processed
+                    result.stats[(category_name, column)] = stats
+                    if figure is not None:
+                        result.figures.append(figure)
+            progress.update()
+        
+        if pairwise:
+            try:
+                result.figures.extend(_process_pairwise(subset_df, numeric_columns, category_name, category_column, output_path,
+                                                        figsize, show_only, max_pairs, pair_ranges, result, render, engine))
+            except Exception as e:
+                result.errors.append({"column": None, "category": category_name, "error": str(e)})
+                _event(logging.ERROR, "error", f"エラーが発生しました: {str(e)}", category=category_name,
+                       exc_info=logger.isEnabledFor(logging.DEBUG))
+        
+        # カテゴリごとに1枚ずつ描く種類（散布図行列など）
+        for name in group_types:
+            if tasks is not None:
+                args = (subset_df, numeric_columns, category_name, category_column, output_path, figsize, name, engine)
+                tasks.add(plot_cost([name], len(subset_df), downsample_threshold), _render_group_task, args)
+                continue
+            try:
+                result.figures.append(_process_group(subset_df, numeric_columns, category_name, category_column, output_path,
+                                                     figsize, show_only, name, report, engine))
+            except Exception as e:
+                result.errors.append({"column": None, "category": category_name, "error": str(e)})
+                _event(logging.ERROR, "error", f"エラーが発生しました: {str(e)}", category=category_name,
+                       exc_info=logger.isEnabledFor(logging.DEBUG))
+    progress.close()
+    
+    if tasks is not None:
+        tasks.close()
+    
+    if pairwise and output_path is not None:
+        correlation_file = output_path / CORRELATION_FILENAME
+        with report.stage("save"):
+            result.correlation_frame().to_csv(correlation_file, index=False, encoding="utf-8-sig")
+        report.count("bytes_written", correlation_file.stat().st_size)
+        _event(logging.INFO, "report_saved", f"相関係数を保存しました: {correlation_file}", path=str(correlation_file))
+    
+    if grid and render:
+        for column, entries in grid_entries.items():
+            if not entries:
+                continue
+            try:
+                result.figures.append(_process_grid(column, entries, edges[column], category_column, output_path,
+                                                    figsize, show_only, plot_functions,
+                                                    plot_types_label(plot_types, basic_plot_types(plot_functions)), report))
+            except Exception as e:
+                result.errors.append({"column": column, "category": None, "error": str(e)})
+                _event(logging.ERROR, "error", f"エラーが発生しました: {str(e)}", column=column,
+                       exc_info=logger.isEnabledFor(logging.DEBUG))
+    
+    # データの概要を出力
+    result.summary = df.describe() if timeline is None else df.drop(columns=_TIME_KEY).describe()
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(f"\n=== データ概要 ===\n{result.summary}")
+    
+    logger.info(f"\n全ての可視化が完了しました。" + ("" if output_path is None else f" 出力先: {output_path}"))
+    return result
+
+
+def visualize_csv_data(csv_file_path, output_dir="plots", figsize=(12, 4), show_only=False, category_columns=None, plot_types="all", exclude_columns=None, initialize_dir=False, profile=False, quantile_error=None, downsample_threshold=DOWNSAMPLE_THRESHOLD, grid=False, html=False, engine=None, render_workers=1, pairwise=False, max_pairs=PAIRWISE_MAX_PAIRS, timeseries=False, time_column=None, frequency=None, window=None):
     """
     CSVファイルの数値変数をヒストグラム、箱ひげ図、バイオリンプロットで可視化
     文字列列がある場合は、その値ごとに分類して別々に可視化
     
     Parameters:
     -----------
-    csv_file_path : str
-        CSVファイルのパス
+    csv_file_path : str, pd.DataFrame, pyarrow.Table or np.ndarray
+        CSVファイルのパス（メモリ上のデータも可、to_dataframe() を参照）
     output_dir : str
         出力ディレクトリ（デフォルト: "plots"）
     figsize : tuple
@@ -60,297 +650,1894 @@ def visualize_csv_data(csv_file_path, output_dir="plots", figsize=(12, 4), show_
     category_columns : str, list or None
         分類に使用する列名を指定（文字列の場合はカンマ区切り、Noneの場合は最初の文字列列を使用）
     plot_types : str
-        出力するプロットの種類（"all", "hist", "box", "violin"）
+        出力するプロットの種類（"all" または PLOT_TYPES の名前、カンマ区切りで複数可。
+        "all" はヒストグラム・箱ひげ図・バイオリンプロット）
     exclude_columns : str or None
         除外する列名（カンマ区切りで複数指定可能）
     initialize_dir : bool
         Trueの場合は出力ディレクトリを事前に初期化（デフォルト: False）
+    profile : bool
+        Trueの場合はcProfileで計測し、結果を profile.pstats に保存（デフォルト: False）
+    quantile_error : float or None
+        大きな列の四分位数と外れ値の数を近似する場合の誤差（analyze() を参照、デフォルト: None）
+    downsample_threshold : int or None
+        集計済みのビンと抽出した値で描くデータ数（analyze() を参照、デフォルト: DOWNSAMPLE_THRESHOLD）
+    grid : bool
+        Trueの場合は列ごとに全てのカテゴリを並べた1枚の図を作成（analyze() を参照、デフォルト: False）
+    html : bool
+        Trueの場合は図の画像を作らず、統計量とヒストグラムの度数からブラウザでグラフを描く
+        report.html を出力ディレクトリに保存する（デフォルト: False）
+    engine : Engine or None
+        各段階の関数（analyze() を参照、デフォルト: None）
+    render_workers : int
+        図の作成と保存を並列に行うプロセスの数（analyze() を参照、デフォルト: 1）
+    pairwise : bool
+        Trueの場合は列ごとの図の代わりに、カテゴリごとの相関係数の図と相関の強い組の六角形ビンの図を作成し、
+        correlation.csv を保存する（analyze() を参照、デフォルト: False）
+    max_pairs : int
+        六角形ビンの図を描く組の数（デフォルト: PAIRWISE_MAX_PAIRS）
+    timeseries : bool
+        Trueの場合は列ごとの分布の図の代わりに、日時の列で集計した推移とカレンダーの図を作成
+        （analyze() を参照、デフォルト: False）
+    time_column, frequency, window : str or None
+        日時の列・集計の間隔・移動平均の期間（analyze() を参照、デフォルト: 自動）
+    
+    保存する場合は、段階ごとの処理時間と件数を出力ディレクトリの run_report.json に保存する
+    
+    Returns:
+    --------
+    AnalysisResult or None
+        結果（読み込みに失敗した場合などはエラーを表示してNone）
     """
+    report = RunReport()
+    profiler = cProfile.Profile() if profile else None
+    result = None
+    source = source_name(csv_file_path)
     
+    if profiler:
+        profiler.enable()
     try:
-        # CSVファイルを読み込み
-        df = pd.read_csv(csv_file_path)
-        print(f"データを読み込みました: {csv_file_path}")
-        print(f"データ形状: {df.shape}")
-        
-        # 出力ディレクトリの処理（保存する場合のみ）
-        if not show_only:
-            output_path = Path(output_dir)
-            
-            if initialize_dir:
-                # 初期化オプションが指定された場合：既存ディレクトリを削除して新規作成
-                if output_path.exists():
-                    import shutil
-                    shutil.rmtree(output_path)
-                    print(f"既存のディレクトリを削除しました: {output_path}")
-                output_path.mkdir(exist_ok=True)
-                print(f"出力ディレクトリを新規作成しました: {output_path}")
-            else:
-                # 通常の場合：ディレクトリが存在しない場合のみ作成
-                if not output_path.exists():
-                    output_path.mkdir(parents=True, exist_ok=True)
-                    print(f"出力ディレクトリを作成しました: {output_path}")
-                else:
-                    print(f"既存の出力ディレクトリを使用します: {output_path}")
-        
-        # 数値列と文字列列を抽出
-        numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
-        string_columns = df.select_dtypes(include=['object', 'string']).columns.tolist()
-        
-        # 除外列の処理
-        if exclude_columns:
-            if isinstance(exclude_columns, str):
-                exclude_list = [col.strip() for col in exclude_columns.split(',')]
-            else:
-                exclude_list = exclude_columns
-            
-            # 数値列から除外
-            original_numeric_count = len(numeric_columns)
-            numeric_columns = [col for col in numeric_columns if col not in exclude_list]
-            excluded_count = original_numeric_count - len(numeric_columns)
-            
-            if excluded_count > 0:
-                print(f"除外された数値列: {excluded_count}個")
-                for col in exclude_list:
-                    if col in df.select_dtypes(include=[np.number]).columns:
-                        print(f"  - {col}")
-        
-        if not numeric_columns:
-            print("処理対象の数値列が見つかりませんでした。")
-            return
-            
-        print(f"処理対象の数値列: {numeric_columns}")
-        print(f"文字列列: {string_columns}")
-        print(f"プロット種類: {plot_types}")
-        
-        # 分類列を決定
-        selected_category_columns = []
-        if category_columns:
-            # 文字列の場合はカンマ区切りで分割
-            if isinstance(category_columns, str):
-                column_list = [col.strip() for col in category_columns.split(',')]
-            else:
-                column_list = category_columns
-            
-            # 指定された列が存在するかチェック
-            for col in column_list:
-                if col in df.columns:
-                    selected_category_columns.append(col)
-                    print(f"分類列として追加: {col}")
-                else:
-                    print(f"警告: 指定された列 '{col}' が見つかりません。")
-            
-            if not selected_category_columns:
-                print(f"指定された列がすべて見つかりませんでした。利用可能な列: {list(df.columns)}")
-                if string_columns:
-                    selected_category_columns = [string_columns[0]]
-                    print(f"代わりに最初の文字列列を使用: {selected_category_columns[0]}")
-        elif string_columns:
-            # 最初の文字列列を使用
-            selected_category_columns = [string_columns[0]]
-            print(f"最初の文字列列を分類基準として使用: {selected_category_columns[0]}")
-        
-        # 分類処理
-        if selected_category_columns:
-            # 複数列の組み合わせでカテゴリを作成
-            df_copy = df.copy()
-            
-            # 各分類列の組み合わせを作成
-            category_combinations = df_copy[selected_category_columns].drop_duplicates().dropna()
-            
-            print(f"分類基準: {selected_category_columns}")
-            print(f"カテゴリ組み合わせ数: {len(category_combinations)}")
-            
-            # 各組み合わせごとに処理
-            for idx, row in category_combinations.iterrows():
-                # 条件を作成
-                mask = pd.Series([True] * len(df_copy))
-                category_name_parts = []
-                
-                for col in selected_category_columns:
-                    mask = mask & (df_copy[col] == row[col])
-                    category_name_parts.append(f"{col}={row[col]}")
-                
-                category_name = "_".join(category_name_parts)
-                subset_df = df_copy[mask]
-                
-                print(f"\n=== カテゴリ '{category_name}' の処理 ===")
-                print(f"データ数: {len(subset_df)}")
-                
-                if len(subset_df) == 0:
-                    print(f"カテゴリ '{category_name}' にデータがありません。")
-                    continue
-                
-                # カテゴリごとの数値列を処理
-                for column in numeric_columns:
-                    process_single_column(subset_df, column, category_name, "_".join(selected_category_columns), 
-                                        output_path if not show_only else None, 
-                                        figsize, show_only, plot_types)
-        else:
-            # 分類列がない場合は全体を処理
-            print(f"\n=== 全データの処理 ===")
-            for column in numeric_columns:
-                process_single_column(df, column, "全体", None, 
-                                    output_path if not show_only else None, 
-                                    figsize, show_only, plot_types)
-        # データの概要を出力
-        print("\n=== データ概要 ===")
-        print(df.describe())
-        
-        print(f"\n全ての可視化が完了しました。" + ("" if show_only else f" 出力先: {output_path}"))
-        
+        result = analyze(csv_file_path, output_dir, figsize, show_only, category_columns, plot_types, exclude_columns, initialize_dir,
+                         render=not html, report=report, quantile_error=quantile_error,
+                         downsample_threshold=downsample_threshold, grid=grid, histograms=html,
+                         engine=engine, render_workers=render_workers, pairwise=pairwise, max_pairs=max_pairs,
+                         timeseries=timeseries, time_column=time_column, frequency=frequency, window=window)
+        if html and not show_only:
+            with report.stage("save"):
+                html_file = write_html_report(result, prepare_output_dir(output_dir, initialize_dir) / HTML_REPORT_FILENAME)
+            report.count("bytes_written", html_file.stat().st_size)
+            _event(logging.INFO, "report_saved", f"HTMLレポートを保存しました: {html_file}", path=str(html_file))
     except FileNotFoundError:
-        print(f"エラー: ファイル '{csv_file_path}' が見つかりません。")
+        _event(logging.ERROR, "error", f"エラー: ファイル '{source}' が見つかりません。", path=source)
     except pd.errors.EmptyDataError:
-        print(f"エラー: ファイル '{csv_file_path}' が空です。")
+        _event(logging.ERROR, "error", f"エラー: ファイル '{source}' が空です。", path=source)
     except Exception as e:
-        print(f"エラーが発生しました: {str(e)}")
+        _event(logging.ERROR, "error", f"エラーが発生しました: {str(e)}", exc_info=logger.isEnabledFor(logging.DEBUG))
+    finally:
+        if profiler:
+            profiler.disable()
+        report.finish()
+    
+    output_path = Path(output_dir) if not show_only and Path(output_dir).is_dir() else None
+    
+    if report.stages:
+        logger.info("\n=== 処理時間 ===\n" + report.summary())
+        _event(logging.DEBUG, "run_finished", "実行を終了しました", report=report.to_dict())
+    
+    if output_path:
+        parameters = {
+            "csv_file": source,
+            "output_dir": str(output_dir),
+            "figsize": list(figsize),
+            "category_columns": category_columns,
+            "plot_types": plot_types,
+            "exclude_columns": exclude_columns,
+            "quantile_error": quantile_error,
+            "downsample_threshold": downsample_threshold,
+            "grid": grid,
+            "html": html,
+            "render_workers": render_workers,
+            "pairwise": pairwise,
+            "max_pairs": max_pairs,
+            "timeseries": timeseries,
+            "time_column": time_column,
+            "frequency": frequency,
+            "window": window,
+            "errors": [] if result is None else result.errors,
+        }
+        report_file = output_path / REPORT_FILENAME
+        report.write(report_file, **parameters)
+        logger.info(f"実行レポートを保存しました: {report_file}")
+    
+    if profiler:
+        # snakeviz や gprof2dot で可視化できる形式
+        profile_file = (output_path or Path(".")) / PROFILE_FILENAME
+        profiler.dump_stats(profile_file)
+        logger.info(f"プロファイルを保存しました: {profile_file}")
+    
+    return result
 
 
-def process_single_column(df, column, category_name, category_column, output_path, figsize, show_only, plot_types="all"):
+class BatchResult:
     """
-    単一の数値列に対してプロットを作成
+    analyze_batch() の結果
     
-    Parameters:
+    Attributes:
     -----------
-    df : pd.DataFrame
-        処理対象のデータフレーム
-    column : str
-        数値列名
-    category_name : str
-        カテゴリ名（ファイル名や表示用）
-    category_column : str or None
-        カテゴリ列名
-    output_path : Path or None
-        出力パス（Noneの場合は保存しない）
-    figsize : tuple
-        図のサイズ
-    show_only : bool
-        表示のみかどうか
-    plot_types : str
-        プロットの種類（"all", "hist", "box", "violin"）
+    results : dict
+        {CSVファイルのパス: AnalysisResult}（入力の順）
+    failures : dict
+        {CSVファイルのパス: エラーメッセージ}（読み込みに失敗したファイル）
+    output_dirs : dict
+        {CSVファイルのパス: 出力ディレクトリ}
+    report : RunReport
+        全ファイルの処理時間と件数の合計（total_seconds は全体の経過時間）
+    combined : AnalysisResult or None
+        全ファイルを結合した統計量と図（combine=True の場合のみ）
     """
-    try:
-        # 欠損値を除去
-        data = df[column].dropna()
+    def __init__(self, report=None):
+        self.results = {}
+        self.failures = {}
+        self.output_dirs = {}
+        self.report = report or RunReport()
+        self.combined = None
+    
+    @property
+    def ok(self):
+        """全てのファイルの全ての列を処理できたかどうか"""
+        return (not self.failures and all(result.ok for result in self.results.values())
+                and (self.combined is None or self.combined.ok))
+    
+    def to_dict(self):
+        files = []
+        for path, output_dir in self.output_dirs.items():
+            entry = {"path": path, "output_dir": output_dir}
+            if path in self.failures:
+                entry["error"] = self.failures[path]
+            else:
+                result = self.results[path]
+                entry.update({
+                    "figures": len(result.figures),
+                    "errors": result.errors,
+                    "seconds": result.report.elapsed,
+                })
+            files.append(entry)
+        return {
+            "files_total": len(self.output_dirs),
+            "files_succeeded": len(self.results),
+            "files_failed": len(self.failures),
+            **self.report.to_dict(),
+            "files": files,
+            "combined": None if self.combined is None else {
+                key: value for key, value in self.combined.to_dict().items() if key != "report"
+            },
+        }
+
+
+def find_csv_files(inputs):
+    """
+    ファイル・ディレクトリ・globパターンからCSVファイルを探す
+    
+    Returns:
+    --------
+    list of tuple
+        (CSVファイルのパス, 出力ディレクトリ名に使う相対パス) のリスト（重複は除く）
+    """
+    if isinstance(inputs, (str, Path)):
+        inputs = [inputs]
+    
+    found = []
+    seen = set()
+    used_names = set()
+    for pattern in inputs:
+        path = Path(pattern)
+        if path.is_dir():
+            # ディレクトリの場合は配下のCSVファイルすべて（ディレクトリからの相対パス）
+            matches = [(p, p.relative_to(path)) for p in sorted(path.rglob("*.csv"))]
+        elif path.is_file():
+            matches = [(path, Path(path.name))]
+        else:
+            # globパターンの場合は、一致したファイルの共通の親ディレクトリからの相対パス
+            paths = [Path(p) for p in sorted(glob.glob(str(pattern), recursive=True)) if Path(p).is_file()]
+            if not paths:
+                logger.warning(f"警告: '{pattern}' に一致するファイルがありません。")
+                continue
+            base = Path(os.path.commonpath([str(p.parent) for p in paths]))
+            matches = [(p, p.relative_to(base)) for p in paths]
         
-        if len(data) == 0:
-            print(f"列 '{column}' (カテゴリ: {category_name}) にはデータがありません。スキップします。")
-            return
+        for p, rel in matches:
+            key = p.resolve()
+            if key in seen:
+                continue
+            seen.add(key)
             
-        print(f"列 '{column}' (カテゴリ: {category_name}) を処理中... データ数: {len(data)}")
-        
-        # プロットの種類を決定
-        plot_functions = []
-        if plot_types == "all":
-            plot_functions = ["hist", "box", "violin"]
-        elif plot_types == "hist":
-            plot_functions = ["hist"]
-        elif plot_types == "box":
-            plot_functions = ["box"]
-        elif plot_types == "violin":
-            plot_functions = ["violin"]
+            # 別の入力から同じ名前になる場合は番号を付ける
+            name = rel.with_suffix("")
+            i = 2
+            while name in used_names:
+                name = rel.with_suffix("").with_name(f"{rel.stem}_{i}")
+                i += 1
+            used_names.add(name)
+            found.append((p, name))
+    
+    return found
+
+
+def _init_worker(level, details):
+    """ワーカープロセスの準備（ログの設定と描画の準備を1度だけ行う）"""
+    setup_logging(level, details=details)
+    warm_up()
+
+
+def _init_render_worker(level, details, rc):
+    """図を並列に描くワーカープロセスの準備（フォントの設定は呼び出し元のプロセスと同じにする）"""
+    setup_logging(level, details=details)
+    plt.switch_backend("Agg")
+    plt.rcParams.update(rc)
+    warnings.filterwarnings('ignore', message='Glyph .* missing from font')
+
+
+def _analyze_file(path, output_dir, options):
+    """1ファイルを処理して (パス, AnalysisResult or None, エラーメッセージ or None) を返す"""
+    try:
+        result = analyze(path, output_dir, progress=False, **options)
+    except Exception as e:
+        _event(logging.ERROR, "error", f"エラー: '{path}' を処理できませんでした: {e}", path=str(path))
+        return str(path), None, f"{type(e).__name__}: {e}"
+    
+    result.report.finish()
+    if result.output_dir is not None:
+        result.report.write(result.output_dir / REPORT_FILENAME, csv_file=str(path), errors=result.errors)
+    result.summary = None  # プロセス間で受け渡す量を減らす
+    return str(path), result, None
+
+
+def _accumulate_file(path, output_dir, options):
+    """1ファイルの要約を作成して (パス, AnalysisResult or None, エラーメッセージ or None) を返す"""
+    try:
+        result = accumulate(path, **options)
+    except Exception as e:
+        _event(logging.ERROR, "error", f"エラー: '{path}' を処理できませんでした: {e}", path=str(path))
+        return str(path), None, f"{type(e).__name__}: {e}"
+    result.report.finish()
+    return str(path), result, None
+
+
+def analyze_batch(inputs, output_dir="plots", workers=1, initialize_dir=False, combine=False, quantile_error=None, **options):
+    """
+    複数のCSVファイルをまとめて処理する（1つのプロセス、またはワーカープロセスのプール）
+    
+    各ファイルの図は output_dir/<ファイルの相対パス（拡張子なし）>/ に保存し、
+    全体の集計を output_dir/batch_report.json に保存する
+    
+    Parameters:
+    -----------
+    inputs : str, Path or list
+        CSVファイル・ディレクトリ・globパターン（複数可、find_csv_files() を参照）
+    output_dir : str
+        出力ディレクトリ（デフォルト: "plots"）
+    workers : int
+        ワーカープロセスの数（1の場合はこのプロセスで順に処理、デフォルト: 1）
+    initialize_dir : bool
+        Trueの場合は出力ディレクトリを事前に初期化（デフォルト: False）
+    combine : bool
+        Trueの場合はファイルごとの図を作らず、全ファイルを結合した (カテゴリ, 列) ごとの図を
+        output_dir に保存する（各ファイルの要約を結合するので、全データを同時にメモリに置かない）
+    quantile_error : float or None
+        四分位数を近似する場合の正規化順位の誤差（analyze() を参照、combine=True の場合は常に近似し、
+        Noneの場合は0.01）
+    options :
+        analyze() に渡す引数（figsize, category_columns, plot_types, exclude_columns, render）
+    
+    Returns:
+    --------
+    BatchResult
+        CSVファイルが見つからない場合は何もせず、空の結果を返す
+    """
+    files = find_csv_files(inputs)
+    batch = BatchResult()
+    root = Path(output_dir)
+    if not files:
+        return batch
+    
+    if initialize_dir and root.exists():
+        import shutil
+        shutil.rmtree(root)
+        logger.info(f"既存のディレクトリを削除しました: {root}")
+    root.mkdir(parents=True, exist_ok=True)
+    
+    tasks = []
+    for path, name in files:
+        batch.output_dirs[str(path)] = None if combine else str(root / name)
+        tasks.append((path, root / name))
+    
+    # 結合する場合は、各ファイルでは要約だけを作り、描画はこのプロセスで最後に行う
+    if combine:
+        process_file = _accumulate_file
+        file_options = {"category_columns": options.get("category_columns"),
+                        "exclude_columns": options.get("exclude_columns"), "error": quantile_error or 0.01}
+    else:
+        process_file = _analyze_file
+        file_options = {**options, "quantile_error": quantile_error}
+    
+    batch_logger.info(f"{len(tasks)}個のファイルを処理します（ワーカー数: {workers}）")
+    progress = ProgressBar(len(tasks))
+    finished = {}
+    
+    def collect(path, result, error):
+        finished[path] = (result, error)
+        if error is None:
+            batch.report.merge(result.report)
+            _event(logging.DEBUG, "file_finished", f"完了: {path}（図: {len(result.figures)}、エラー: {len(result.errors)}）",
+                   path=path, figures=len(result.figures), errors=len(result.errors))
+        progress.update()
+    
+    if workers > 1:
+        # ワーカーの画面表示はこのプロセスと同じ設定にする（イベントはこのプロセスで記録する分のみ）
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=_console_settings) as pool:
+            futures = [pool.submit(process_file, path, out, file_options) for path, out in tasks]
+            for future in as_completed(futures):
+                collect(*future.result())
+    else:
+        warm_up()
+        for path, out in tasks:
+            collect(*process_file(path, out, file_options))
+    progress.close()
+    
+    # 入力の順に並べる
+    for path, _ in tasks:
+        result, error = finished[str(path)]
+        if error is None:
+            batch.results[str(path)] = result
         else:
-            print(f"警告: 不正なプロット種類 '{plot_types}'。'all'を使用します。")
-            plot_functions = ["hist", "box", "violin"]
+            batch.failures[str(path)] = error
+    
+    if combine:
+        batch.combined = _combine_results(batch.results.values(), root, batch.report, options)
+    
+    batch.report.finish()
+    report_file = root / BATCH_REPORT_FILENAME
+    report_file.write_text(json.dumps(batch.to_dict(), ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+    
+    batch_logger.info(f"\n=== 処理時間 ===\n" + batch.report.summary())
+    batch_logger.info(f"成功: {len(batch.results)}ファイル、失敗: {len(batch.failures)}ファイル")
+    batch_logger.info(f"集計レポートを保存しました: {report_file}")
+    _event(logging.DEBUG, "batch_finished", "バッチ処理を終了しました", report=batch.to_dict())
+    return batch
+
+
+def _combine_results(results, output_path, report, options):
+    """ファイルごとの要約を入力の順に結合し、(カテゴリ, 列) ごとの図を保存"""
+    accumulators = {}
+    category_columns = []
+    for result in results:
+        if result.category_columns and not category_columns:
+            category_columns = result.category_columns
+        elif result.category_columns and result.category_columns != category_columns:
+            logger.warning(f"警告: 分類列がファイルによって異なります: {category_columns} / {result.category_columns}")
+        with report.stage("merge"):
+            for key, accumulator in result.accumulators.items():
+                if key in accumulators:
+                    accumulators[key].merge(accumulator)
+                else:
+                    accumulators[key] = accumulator
+        result.accumulators = {}
+    
+    combined = render_accumulators(accumulators, "_".join(category_columns) or None, output_path,
+                                   options.get("figsize", (12, 4)), options.get("plot_types", "all"),
+                                   report, render=options.get("render", True))
+    combined.category_columns = category_columns
+    batch_logger.info(f"結合した図: {len(combined.figures)}枚（{len(accumulators)}個のカテゴリ・列）")
+    return combined
+
+
+def accumulate(source, category_columns=None, exclude_columns=None, error=0.01, max_bins=64, report=None):
+    """
+    (カテゴリ, 列) ごとに結合可能な要約（sketches.ColumnAccumulator）を作成する
+    ファイルごとに作った要約は render_accumulators() の前に merge() でまとめられる
+    
+    Parameters:
+    -----------
+    source : str, Path, pd.DataFrame, pyarrow.Table or np.ndarray
+        analyze() と同じ
+    error : float
+        四分位数の正規化順位の誤差（デフォルト: 0.01）
+    max_bins : int
+        ヒストグラムのビンの最大数（デフォルト: 64）
+    
+    Returns:
+    --------
+    AnalysisResult
+        accumulators に要約を持つ（図と統計量は空）
+    """
+    report = report or RunReport()
+    with report.stage("load"):
+        df = to_dataframe(source)
+    result = AnalysisResult(source_name(source), report=report)
+    report.count("rows_loaded", len(df))
+    
+    numeric_columns, selected_category_columns = select_columns(df, category_columns, exclude_columns)
+    result.numeric_columns = numeric_columns
+    result.category_columns = selected_category_columns
+    
+    if selected_category_columns:
+        groups = report.timed_iter("partition", iter_category_groups(df, selected_category_columns))
+    else:
+        groups = [("全体", df)]
+    
+    for category_name, subset_df in groups:
+        report.count("groups")
+        for column in numeric_columns:
+            with report.stage("stats"):
+                accumulator = ColumnAccumulator(error, max_bins).update(subset_df[column])
+            report.count("rows_processed", accumulator.count)
+            result.accumulators[(category_name, column)] = accumulator
+    
+    return result
+
+
+def render_accumulators(accumulators, category_column, output_path, figsize=(12, 4), plot_types="all", report=None, render=True):
+    """
+    要約から統計量を求め、(カテゴリ, 列) ごとの図を output_path に保存する
+    
+    Returns:
+    --------
+    AnalysisResult
+        source は "<combined>"
+    """
+    report = report or RunReport()
+    result = AnalysisResult("<combined>", Path(output_path) if render else None, report)
+    result.numeric_columns = list(dict.fromkeys(column for _, column in accumulators))
+    plot_functions = resolve_plot_functions(plot_types)
+    
+    for (category_name, column), accumulator in accumulators.items():
+        if accumulator.count == 0:
+            report.count("skipped")
+            continue
+        with report.stage("stats"):
+            stats = accumulator.stats()
+        result.stats[(category_name, column)] = stats
+        if not render:
+            continue
         
-        # 図のサイズを調整（プロット数に応じて）
-        plot_count = len(plot_functions)
-        if plot_count == 1:
-            adjusted_figsize = (figsize[0] // 3, figsize[1])
+        try:
+            with report.stage("render"):
+                fig = render_accumulated(accumulator, column, category_name, category_column, figsize, plot_functions, stats)
+            report.count("figures")
+            filepath = Path(output_path) / figure_filename(column, category_name, category_column,
+                                                           plot_types_label(plot_types, basic_plot_types(plot_functions)))
+            try:
+                with report.stage("save"):
+                    fig.savefig(filepath, dpi=300, bbox_inches='tight')
+            finally:
+                plt.close(fig)
+            report.count("bytes_written", filepath.stat().st_size)
+            result.figures.append({"column": column, "category": category_name, "rows": stats["count"], "path": str(filepath)})
+            _event(logging.DEBUG, "figure_saved", f"保存しました: {filepath}",
+                   column=column, category=category_name, rows=stats["count"], path=str(filepath))
+        except Exception as e:
+            result.errors.append({"column": column, "category": category_name, "error": str(e)})
+            _event(logging.ERROR, "error", f"エラーが発生しました: {str(e)}", column=column, category=category_name,
+                   exc_info=logger.isEnabledFor(logging.DEBUG))
+    
+    return result
+
+
+def prepare_output_dir(output_dir, initialize_dir=False):
+    """出力ディレクトリを作成して Path を返す（initialize_dir=True の場合は既存のディレクトリを削除してから作成）"""
+    output_path = Path(output_dir)
+    
+    if initialize_dir:
+        # 初期化オプションが指定された場合：既存ディレクトリを削除して新規作成
+        if output_path.exists():
+            import shutil
+            shutil.rmtree(output_path)
+            logger.info(f"既存のディレクトリを削除しました: {output_path}")
+        output_path.mkdir(exist_ok=True)
+        logger.info(f"出力ディレクトリを新規作成しました: {output_path}")
+    else:
+        # 通常の場合：ディレクトリが存在しない場合のみ作成
+        if not output_path.exists():
+            output_path.mkdir(parents=True, exist_ok=True)
+            logger.info(f"出力ディレクトリを作成しました: {output_path}")
         else:
-            adjusted_figsize = figsize
-        
-        # 図を作成
-        fig, axes = plt.subplots(1, plot_count, figsize=adjusted_figsize)
-        if plot_count == 1:
-            axes = [axes]  # 単一プロットの場合もリストとして扱う
-        
-        title = f'変数: {column}' + (f' (カテゴリ: {category_name})' if category_column else '')
-        fig.suptitle(title, fontsize=16, fontweight='bold')
-        
-        plot_idx = 0
-        
-        # 1. ヒストグラム
-        if "hist" in plot_functions:
-            axes[plot_idx].hist(data, bins=30, alpha=0.7, color='skyblue', edgecolor='black', linewidth=0.5)
-            axes[plot_idx].set_title('ヒストグラム', fontsize=12)
-            axes[plot_idx].set_xlabel(column, fontsize=10)
-            axes[plot_idx].set_ylabel('頻度', fontsize=10)
-            axes[plot_idx].grid(True, alpha=0.3)
-            
-            # 統計情報を追加
-            mean_val = data.mean()
-            std_val = data.std()
-            axes[plot_idx].axvline(mean_val, color='red', linestyle='--', linewidth=2, label=f'平均: {mean_val:.2f}')
-            axes[plot_idx].axvline(mean_val + std_val, color='orange', linestyle='--', alpha=0.7, label=f'±1σ')
-            axes[plot_idx].axvline(mean_val - std_val, color='orange', linestyle='--', alpha=0.7)
-            axes[plot_idx].legend(prop={'size': 9})
-            plot_idx += 1
+            logger.info(f"既存の出力ディレクトリを使用します: {output_path}")
+    return output_path
+
+
+def load_csv(csv_file_path):
+    """CSVファイルを読み込む"""
+    return pd.read_csv(csv_file_path)
+
+
+def _is_arrow(source):
+    """pyarrow の Table / RecordBatch かどうか（pyarrow は必要な場合のみ使うので読み込まない）"""
+    return type(source).__module__.startswith("pyarrow") and hasattr(source, "to_pandas")
+
+
+def source_name(source):
+    """入力の表示用の名前（ファイルはパス、メモリ上のデータは種類）"""
+    if isinstance(source, pd.DataFrame):
+        return "<DataFrame>"
+    if _is_arrow(source):
+        return f"<{type(source).__name__}>"
+    if isinstance(source, np.ndarray):
+        return "<ndarray>"
+    return str(source)
+
+
+def to_dataframe(source):
+    """
+    入力をデータフレームにする
+    
+    - pd.DataFrame: そのまま（コピーしない）
+    - pyarrow.Table / RecordBatch: 列ごとのブロックに変換（欠損値の無い数値列はコピーしない）
+    - NumPy の構造化配列・レコード配列: 数値のフィールドはビューのまま列にする
+    - それ以外: CSVファイルのパスとして読み込む
+    """
+    if isinstance(source, pd.DataFrame):
+        return source
+    
+    if _is_arrow(source):
+        return source.to_pandas(split_blocks=True)
+    
+    if isinstance(source, np.ndarray):
+        if source.dtype.names is None:
+            raise ValueError("列名のある構造化配列（レコード配列）を指定してください")
+        columns = {}
+        for name in source.dtype.names:
+            values = source[name]
+            if values.dtype.kind in ("S", "U"):
+                # 固定長の文字列は文字列型にする（この列はコピーになる）
+                values = pd.array(values.astype(str), dtype="str")
+            columns[name] = values
+        return pd.DataFrame(columns, copy=False)
+    
+    return load_csv(source)
+
+
+def select_columns(df, category_columns=None, exclude_columns=None):
+    """
+    処理対象の数値列と分類列を決定
+    
+    Returns:
+    --------
+    tuple
+        (数値列のリスト, 分類列のリスト)。数値列が無い場合は両方とも空
+    """
+    # 数値列と文字列列を抽出
+    numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    string_columns = df.select_dtypes(include=['object', 'string']).columns.tolist()
+    
+    # 除外列の処理
+    if exclude_columns:
+        exclude_list = parse_column_list(exclude_columns)
         
-        # 2. 箱ひげ図
-        if "box" in plot_functions:
-            box_plot = axes[plot_idx].boxplot(data, patch_artist=True)
-            box_plot['boxes'][0].set_facecolor('lightgreen')
-            box_plot['boxes'][0].set_alpha(0.7)
-            axes[plot_idx].set_title('箱ひげ図', fontsize=12)
-            axes[plot_idx].set_ylabel(column, fontsize=10)
-            axes[plot_idx].grid(True, alpha=0.3)
-            
-            # 外れ値の数を表示
-            Q1 = data.quantile(0.25)
-            Q3 = data.quantile(0.75)
-            IQR = Q3 - Q1
-            outliers = data[(data < Q1 - 1.5 * IQR) | (data > Q3 + 1.5 * IQR)]
-            axes[plot_idx].text(0.5, 0.95, f'外れ値: {len(outliers)}個', 
-                        transform=axes[plot_idx].transAxes, ha='center', va='top', fontsize=9,
-                        bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
-            plot_idx += 1
+        # 数値列から除外
+        original_numeric_count = len(numeric_columns)
+        numeric_columns = [col for col in numeric_columns if col not in exclude_list]
+        excluded_count = original_numeric_count - len(numeric_columns)
         
-        # 3. バイオリンプロット
-        if "violin" in plot_functions:
-            violin_parts = axes[plot_idx].violinplot(data, positions=[1], showmeans=True, showmedians=True)
-            for pc in violin_parts['bodies']:
-                pc.set_facecolor('lightcoral')
-                pc.set_alpha(0.7)
-            axes[plot_idx].set_title('バイオリンプロット', fontsize=12)
-            axes[plot_idx].set_ylabel(column, fontsize=10)
-            axes[plot_idx].set_xticks([1])
-            axes[plot_idx].set_xticklabels([column], fontsize=9)
-            axes[plot_idx].grid(True, alpha=0.3)
-            
-            # 統計情報をテキストで追加
-            stats_text = f'平均: {data.mean():.2f}\n中央値: {data.median():.2f}\n標準偏差: {data.std():.2f}\nデータ数: {len(data)}'
-            axes[plot_idx].text(0.02, 0.98, stats_text, transform=axes[plot_idx].transAxes, 
-                        va='top', ha='left', fontsize=8,
-                        bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+        if excluded_count > 0:
+            logger.info(f"除外された数値列: {excluded_count}個")
+            for col in exclude_list:
+                if col in df.select_dtypes(include=[np.number]).columns:
+                    logger.info(f"  - {col}")
+    
+    if not numeric_columns:
+        logger.warning("処理対象の数値列が見つかりませんでした。")
+        return [], []
+    
+    logger.info(f"処理対象の数値列: {numeric_columns}")
+    logger.info(f"文字列列: {string_columns}")
+    
+    # 分類列を決定
+    selected_category_columns = []
+    if category_columns:
+        # 文字列の場合はカンマ区切りで分割
+        column_list = parse_column_list(category_columns)
         
-        # レイアウトを調整
-        plt.tight_layout()
+        # 指定された列が存在するかチェック
+        for col in column_list:
+            if col in df.columns:
+                selected_category_columns.append(col)
+                logger.info(f"分類列として追加: {col}")
+            else:
+                logger.warning(f"警告: 指定された列 '{col}' が見つかりません。")
         
-        if show_only:
-            # 表示のみ
-            plt.show()
-        else:
-            # ファイルを保存
-            safe_column_name = "".join(c for c in column if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            safe_category_name = "".join(c for c in str(category_name) if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            
-            if category_column:
-                filename = f"{safe_column_name}_{safe_category_name}_{plot_types}_visualization.png"
+        if not selected_category_columns:
+            logger.warning(f"指定された列がすべて見つかりませんでした。利用可能な列: {list(df.columns)}")
+            if string_columns:
+                selected_category_columns = [string_columns[0]]
+                logger.warning(f"代わりに最初の文字列列を使用: {selected_category_columns[0]}")
+    elif string_columns:
+        # 最初の文字列列を使用
+        selected_category_columns = [string_columns[0]]
+        logger.info(f"最初の文字列列を分類基準として使用: {selected_category_columns[0]}")
+    
+    return numeric_columns, selected_category_columns
+
+
+def parse_column_list(columns):
+    """カンマ区切りの文字列またはリストを列名のリストにする"""
+    if isinstance(columns, str):
+        return [col.strip() for col in columns.split(',')]
+    return list(columns)
+
+
+def category_combinations(df, category_columns):
+    """分類列の値の組み合わせ（欠損値を含む組み合わせは除く）"""
+    return df[category_columns].drop_duplicates().dropna()
+
+
+def iter_category_groups(df, category_columns, combinations=None):
+    """
+    分類列の値の組み合わせごとに (カテゴリ名, 部分データ) を順に返す
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        元のデータフレーム
+    category_columns : list
+        分類列名のリスト
+    combinations : pd.DataFrame or None
+        category_combinations() の結果（以前の版との互換のための引数で、分割には使わない）
+    """
+    for key, subset in _iter_groups(df, category_columns):
+        yield "_".join(f"{col}={value}" for col, value in zip(category_columns, key)), subset
+
+
+def iter_category_values(df, category_columns, combinations=None):
+    """iter_category_groups() と同じだが、カテゴリ名は値のみ（"値1_値2"、vslz_2・vslz_3 の形式）"""
+    for key, subset in _iter_groups(df, category_columns):
+        yield "_".join(str(value) for value in key), subset
+
+
+def _iter_groups(df, category_columns):
+    """
+    分類列の値の組み合わせ（最初に現れた順、欠損値を含む組み合わせは除く）ごとに (値のタプル, 部分データ) を返す
+    組み合わせごとに全ての行を比較せず、groupby で1度に各組み合わせの行番号を求める
+    """
+    indices = df.groupby(category_columns, sort=False, dropna=True).indices
+    # 複数の列の場合、groupby(sort=False) の順は組み合わせの出現順と異なるので、各組み合わせの最初の行の順に並べる
+    for key, positions in sorted(indices.items(), key=lambda item: item[1][0]):
+        yield (key if isinstance(key, tuple) else (key,)), df.take(positions)
+
+
+def resolve_plot_functions(plot_types):
+    """
+    プロットの種類の指定（"all" または PLOT_TYPES の名前、カンマ区切りで複数可）から、描画するプロットのリストを決定
+    """
+    if plot_types == "all":
+        return list(DEFAULT_PLOT_TYPES)
+    names = []
+    for name in parse_column_list(plot_types or ""):
+        if name == "all":
+            names.extend(DEFAULT_PLOT_TYPES)
+        elif name in PLOT_TYPES:
+            names.append(name)
+        elif name:
+            logger.warning(f"警告: 不正なプロット種類 '{name}'（{'/'.join(['all', *PLOT_TYPES])}）")
+    names = list(dict.fromkeys(names))
+    if not names:
+        logger.warning(f"警告: 不正なプロット種類 '{plot_types}'。'all'を使用します。")
+        return list(DEFAULT_PLOT_TYPES)
+    return names
+
+
+def column_stats(data):
+    """
+    数値データの統計量
+    
+    Returns:
+    --------
+    dict
+        count, mean, std, median, q1, q3, outliers（箱ひげ図の外れ値の数）
+    """
+    Q1 = data.quantile(0.25)
+    Q3 = data.quantile(0.75)
+    IQR = Q3 - Q1
+    outliers = data[(data < Q1 - 1.5 * IQR) | (data > Q3 + 1.5 * IQR)]
+    return {
+        "count": len(data),
+        "mean": data.mean(),
+        "std": data.std(),
+        "median": data.median(),
+        "q1": Q1,
+        "q3": Q3,
+        "outliers": len(outliers),
+    }
+
+
+def approximate_stats(data, error=0.01):
+    """
+    四分位数と外れ値の数をスケッチで近似した統計量（平均と標準偏差は正確）
+    
+    Returns:
+    --------
+    dict
+        column_stats() の項目に加えて min, max, whislo, whishi（箱ひげ図のひげの位置）、
+        quantile_error（四分位数の正規化順位の誤差の目安、近似が不要だった場合は0）
+    """
+    return ColumnAccumulator(error).update(data).stats()
+
+
+def _box_stats(stats):
+    """近似した統計量から Axes.bxp() に渡す箱ひげ図の値を作る"""
+    return {"med": stats["median"], "q1": stats["q1"], "q3": stats["q3"],
+            "whislo": stats["whislo"], "whishi": stats["whishi"], "fliers": []}
+
+
+def _box_stats_from_data(data, sample, stats):
+    """全ての値の統計量とひげの位置、抽出した値の外れ値から Axes.bxp() に渡す箱ひげ図の値を作る"""
+    iqr = stats["q3"] - stats["q1"]
+    low, high = stats["q1"] - 1.5 * iqr, stats["q3"] + 1.5 * iqr
+    values = data.to_numpy()
+    inside = values[(values >= low) & (values <= high)]
+    # 最小値と最大値は抽出した値に含まれていなくても描く
+    candidates = np.concatenate([np.asarray(sample), [values.min(), values.max()]])
+    return {"med": stats["median"], "q1": stats["q1"], "q3": stats["q3"],
+            "whislo": inside.min() if inside.size else low, "whishi": inside.max() if inside.size else high,
+            "fliers": candidates[(candidates < low) | (candidates > high)]}
+
+
+def sample_values(data, size, seed=0):
+    """重複なしで size 個の値を無作為に抽出（同じデータからは常に同じ値を抽出）"""
+    if len(data) <= size:
+        return data
+    rng = np.random.default_rng(seed)
+    return data.iloc[np.sort(rng.choice(len(data), size, replace=False))]
+
+
+def grid_filename(column, plot_types):
+    """グリッドの図のファイル名"""
+    safe_column_name = "".join(c for c in column if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    plot_types = str(plot_types).replace(",", "-").replace(" ", "")
+    return f"{safe_column_name}_grid_{plot_types}_visualization.png"
+
+
+def group_filename(plot_type, category_name, category_column):
+    """カテゴリごとに1枚描く種類（散布図行列など）の図のファイル名"""
+    safe_category_name = "".join(c for c in str(category_name) if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    if category_column:
+        return f"{plot_type}_{safe_category_name}_visualization.png"
+    return f"{plot_type}_visualization.png"
+
+
+def figure_filename(column, category_name, category_column, plot_types):
+    """保存するファイル名"""
+    safe_column_name = "".join(c for c in column if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    safe_category_name = "".join(c for c in str(category_name) if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    
+    plot_types = str(plot_types).replace(",", "-").replace(" ", "")
+    
+    if category_column:
+        return f"{safe_column_name}_{safe_category_name}_{plot_types}_visualization.png"
+    return f"{safe_column_name}_{plot_types}_visualization.png"
+
+
+def render_column(data, column, category_name, category_column, stats, figsize, plot_functions, downsample_threshold=None):
+    """
+    単一の数値列の図を作成して返す（保存・表示はしない）
+    
+    各プロットは PLOT_TYPES に登録した描画関数で描き、描画に使う値（PlotContext）は
+    描く種類の needs をまとめて描く前に1度だけ求める（指定していない種類の値は求めない）
+    
+    データ数が downsample_threshold 以上の場合は、ヒストグラムを np.histogram で集計したビンから、
+    箱ひげ図を統計量から、バイオリンプロット・外れ値の点・ECDF・Q-Qプロットを抽出した SAMPLE_SIZE 個の値から描く
+    （数百万点を渡しても見た目は変わらず、時間がかかるだけなので）。統計量の表示は全ての値のもの
+    
+    Parameters:
+    -----------
+    data : pd.Series
+        欠損値を除いた数値データ
+    stats : dict
+        column_stats() または approximate_stats() の結果
+    plot_functions : list
+        描画するプロットの種類のリスト（列ごとでない種類は無視する）
+    downsample_threshold : int or None
+        集計済みのビンと抽出した値で描くデータ数（Noneの場合は常に全ての値を描く）
+    """
+    plot_functions = column_plot_types(plot_functions)
+    fig, axes = _new_figure(column, category_name, category_column, figsize, plot_functions)
+    context = PlotContext(data, stats, downsample_threshold, plot_needs(plot_functions))
+    
+    for name, ax in zip(plot_functions, axes):
+        PLOT_TYPES[name].draw(ax, column, context)
+    
+    # レイアウトを調整
+    fig.tight_layout()
+    return fig
+
+
+class PlotContext:
+    """
+    1つの (カテゴリ, 列) の描画に使う値
+    data（欠損値を除いた値）、stats（統計量）、large（抽出した値で描くかどうか）の他に、
+    描く種類の needs（PLOT_NEEDS のキー）の値を作成時に1度だけ求めておき、get() で返す
+    """
+    def __init__(self, data, stats, downsample_threshold=None, needs=()):
+        self.data = data
+        self.stats = stats
+        self.large = downsample_threshold is not None and len(data) >= downsample_threshold
+        self._values = {}
+        # PLOT_NEEDS の順に求める（後の値は前の値を get() で使える）
+        for name in PLOT_NEEDS:
+            if name in needs:
+                self._values[name] = PLOT_NEEDS[name](self)
+    
+    def get(self, name):
+        """求めておいた値（needs に含めていない値はエラー。登録した needs と描画関数の食い違いを見つけるため）"""
+        if name not in self._values:
+            raise KeyError(f"値 '{name}' は描く種類の needs に含まれていません")
+        return self._values[name]
+
+
+def _need_sample(context):
+    """バイオリンプロット・外れ値の点・KDEに使う値（データが多い場合は SAMPLE_SIZE 個を抽出）"""
+    return sample_values(context.data, SAMPLE_SIZE) if context.large else context.data
+
+
+def _need_histogram(context):
+    """30個のビンの (度数, 境界)"""
+    return np.histogram(context.data, bins=30)
+
+
+def _need_sorted(context):
+    """昇順に並べた値（ECDF・Q-Qプロット用。データが多い場合は全ての値を並べ替えず、抽出した値を並べる）"""
+    return np.sort(np.asarray(context.get("sample"), dtype=float))
+
+
+def _need_kde(context, points=200):
+    """抽出した値（sample）のガウスカーネル密度推定（Silvermanの目安のバンド幅）を points 点で評価した (x, 密度)"""
+    values = np.asarray(context.get("sample"), dtype=float)
+    n = values.size
+    bandwidth = 1.06 * values.std() * n ** (-1 / 5) if n > 1 else 0.0
+    if bandwidth <= 0:
+        bandwidth = 1e-3 * (abs(values.mean()) or 1.0) if n else 1.0
+    x = np.linspace(values.min() - 3 * bandwidth, values.max() + 3 * bandwidth, points)
+    density = np.zeros(points)
+    # (評価点 × 値) の行列が大きくなりすぎないように分けて加算する
+    for start in range(0, n, 2000):
+        chunk = values[start:start + 2000]
+        density += np.exp(-0.5 * ((x[:, None] - chunk[None, :]) / bandwidth) ** 2).sum(axis=1)
+    return x, density / (n * bandwidth * math.sqrt(2 * math.pi))
+
+
+# 値の名前と求める関数（この順に求めるので、他の値を使う値はその後に置く）
+PLOT_NEEDS = {
+    "sample": _need_sample,
+    "histogram": _need_histogram,
+    "sorted": _need_sorted,
+    "kde": _need_kde,
+}
+
+# ECDF・Q-Qプロットに描く点の最大数
+CURVE_POINTS = 2000
+
+
+def _curve_positions(n):
+    """n 個の並べた値から描く点の位置（多い場合は等間隔に CURVE_POINTS 個）"""
+    if n <= CURVE_POINTS:
+        return np.arange(n)
+    return np.linspace(0, n - 1, CURVE_POINTS).astype(np.int64)
+
+
+def _draw_hist(ax, column, context):
+    counts, edges = context.get("histogram")
+    if context.large:
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+               alpha=0.7, color='skyblue', edgecolor='black', linewidth=0.5)
+    else:
+        # 集計済みのビンを重みとして渡す（全ての値を渡した場合と同じ図になる）
+        ax.hist(edges[:-1], bins=edges, weights=counts, alpha=0.7, color='skyblue', edgecolor='black', linewidth=0.5)
+    _decorate_hist(ax, column, context.stats)
+
+
+def _draw_box(ax, column, context):
+    stats = context.stats
+    if "whislo" in stats:
+        # 近似した統計量の場合は全ての値を並べ替えずに描く（外れ値の点は描かない）
+        box_plot = ax.bxp([_box_stats(stats)], showfliers=False, patch_artist=True)
+    elif context.large:
+        # ひげの位置は全ての値から、外れ値の点は抽出した値から
+        box_plot = ax.bxp([_box_stats_from_data(context.data, context.get("sample"), stats)], patch_artist=True)
+    else:
+        box_plot = ax.boxplot(context.data, patch_artist=True)
+    _decorate_box(ax, column, stats, box_plot)
+
+
+def _draw_violin(ax, column, context):
+    violin_parts = ax.violinplot(context.get("sample"), positions=[1], showmeans=True, showmedians=True)
+    _decorate_violin(ax, column, context.stats, violin_parts)
+
+
+def _draw_ecdf(ax, column, context):
+    values = context.get("sorted")
+    positions = _curve_positions(values.size)
+    ax.plot(values[positions], (positions + 1) / values.size, drawstyle='steps-post', color='steelblue', linewidth=1.5)
+    ax.axvline(context.stats["median"], color='red', linestyle='--', linewidth=1, label=f'中央値: {context.stats["median"]:.2f}')
+    ax.set_title('累積分布 (ECDF)', fontsize=12)
+    ax.set_xlabel(column, fontsize=10)
+    ax.set_ylabel('累積割合', fontsize=10)
+    ax.set_ylim(0, 1.02)
+    ax.grid(True, alpha=0.3)
+    ax.legend(prop={'size': 9}, loc='lower right')
+
+
+def _draw_qq(ax, column, context):
+    from statistics import NormalDist
+    values = context.get("sorted")
+    positions = _curve_positions(values.size)
+    normal = NormalDist()
+    theoretical = np.array([normal.inv_cdf((i + 0.5) / values.size) for i in positions])
+    ax.scatter(theoretical, values[positions], s=6, color='steelblue', alpha=0.7)
+    
+    # 四分位点を通る直線（正規分布ならこの線に沿う）
+    z1, z3 = normal.inv_cdf(0.25), normal.inv_cdf(0.75)
+    slope = (context.stats["q3"] - context.stats["q1"]) / (z3 - z1)
+    intercept = context.stats["q1"] - slope * z1
+    ends = np.array([theoretical[0], theoretical[-1]]) if theoretical.size else np.array([z1, z3])
+    ax.plot(ends, intercept + slope * ends, color='red', linestyle='--', linewidth=1)
+    ax.set_title('Q-Qプロット（正規分布）', fontsize=12)
+    ax.set_xlabel('理論分位点', fontsize=10)
+    ax.set_ylabel(column, fontsize=10)
+    ax.grid(True, alpha=0.3)
+
+
+def _draw_kde(ax, column, context):
+    counts, edges = context.get("histogram")
+    widths = np.diff(edges)
+    ax.bar(edges[:-1], counts / max(counts.sum(), 1) / widths, width=widths, align='edge',
+           alpha=0.4, color='skyblue', edgecolor='none')
+    x, density = context.get("kde")
+    ax.plot(x, density, color='darkblue', linewidth=1.5, label='KDE')
+    ax.axvline(context.stats["mean"], color='red', linestyle='--', linewidth=1.5, label=f'平均: {context.stats["mean"]:.2f}')
+    ax.set_title('密度 (KDE)', fontsize=12)
+    ax.set_xlabel(column, fontsize=10)
+    ax.set_ylabel('密度', fontsize=10)
+    ax.grid(True, alpha=0.3)
+    ax.legend(prop={'size': 9})
+
+
+# 散布図行列に使う列の最大数
+SCATTER_MAX_COLUMNS = 8
+
+
+def render_scatter_matrix(df, numeric_columns, category_name, category_column, figsize):
+    """
+    カテゴリ内の数値列どうしの散布図行列（対角はヒストグラム）を作成して返す
+    点は欠損値の無い行から抽出した SAMPLE_SIZE 行まで
+    """
+    columns = numeric_columns[:SCATTER_MAX_COLUMNS]
+    if len(columns) < len(numeric_columns):
+        logger.warning(f"警告: 散布図行列は最初の{SCATTER_MAX_COLUMNS}列のみ描きます。")
+    rows = df[columns].dropna()
+    sample = sample_values(rows, SAMPLE_SIZE)
+    k = len(columns)
+    size = max(figsize[1], 2.0 * k)
+    fig, axes = plt.subplots(k, k, figsize=(size, size), squeeze=False)
+    title = '散布図行列' + (f' (カテゴリ: {category_name})' if category_column else '') + f'（{len(rows)}行）'
+    fig.suptitle(title, fontsize=16, fontweight='bold')
+    
+    for i, y in enumerate(columns):
+        for j, x in enumerate(columns):
+            ax = axes[i][j]
+            if i == j:
+                ax.hist(rows[x], bins=30, color='skyblue', edgecolor='black', linewidth=0.3)
             else:
-                filename = f"{safe_column_name}_{plot_types}_visualization.png"
-                
-            filepath = output_path / filename
-            plt.savefig(filepath, dpi=300, bbox_inches='tight')
-            print(f"保存しました: {filepath}")
-        
-        # メモリを節約するため図を閉じる
-        plt.close()
-            
+                ax.scatter(sample[x], sample[y], s=3, alpha=0.4, color='steelblue', rasterized=True)
+            if i == k - 1:
+                ax.set_xlabel(x, fontsize=9)
+            else:
+                ax.set_xticklabels([])
+            if j == 0:
+                ax.set_ylabel(y, fontsize=9)
+            elif i != j:
+                ax.set_yticklabels([])
+            ax.tick_params(labelsize=7)
+    
+    fig.tight_layout()
+    return fig
+
+
+class PlotType:
+    """
+    プロットの種類（register_plot_type() で PLOT_TYPES に登録する）
+    
+    Parameters:
+    -----------
+    name : str
+        --plot-type で指定する名前
+    draw : callable
+        scope="column" の場合は draw(ax, 列名, PlotContext)（1つの軸に描く）
+        scope="group" の場合は draw(df, 数値列のリスト, カテゴリ名, 分類列名, figsize) -> Figure（カテゴリごとに1枚）
+    needs : tuple
+        描画に使う値（PLOT_NEEDS のキー）。描く種類の needs をまとめて (カテゴリ, 列) ごとに1度だけ求め、
+        描画関数は PlotContext.get() で受け取る（needs に無い値は受け取れない）
+    cost : float
+        描画の相対的な重さ（ヒストグラム = 1）。並列に描く場合は重い図から割り当てる
+    scope : str
+        "column"（列ごとの図の1区画）または "group"（カテゴリごとの図）
+    """
+    def __init__(self, name, draw, needs=(), cost=1.0, scope="column"):
+        self.name = name
+        self.draw = draw
+        self.needs = tuple(needs)
+        self.cost = cost
+        self.scope = scope
+    
+    def __repr__(self):
+        return f"PlotType({self.name!r}, needs={self.needs}, cost={self.cost}, scope={self.scope!r})"
+
+
+PLOT_TYPES = {}
+
+# "all" で描く種類
+DEFAULT_PLOT_TYPES = ["hist", "box", "violin"]
+
+
+def register_plot_type(name, draw, needs=(), cost=1.0, scope="column"):
+    """
+    プロットの種類を登録する（同じ名前の種類は置き換える）
+    並列に描く場合、ワーカープロセスでも使えるようにモジュールのインポート時に登録すること
+    """
+    for need in needs:
+        if need not in PLOT_NEEDS:
+            raise ValueError(f"不明な値 '{need}'（{', '.join(PLOT_NEEDS)}）")
+    if scope not in ("column", "group"):
+        raise ValueError(f"不明な scope '{scope}'（column/group）")
+    PLOT_TYPES[name] = PlotType(name, draw, needs, cost, scope)
+    return PLOT_TYPES[name]
+
+
+register_plot_type("hist", _draw_hist, needs=("histogram",), cost=1.0)
+register_plot_type("box", _draw_box, needs=("sample",), cost=1.0)
+register_plot_type("violin", _draw_violin, needs=("sample",), cost=3.0)
+register_plot_type("ecdf", _draw_ecdf, needs=("sample", "sorted"), cost=1.0)
+register_plot_type("qq", _draw_qq, needs=("sample", "sorted"), cost=1.5)
+register_plot_type("kde", _draw_kde, needs=("histogram", "sample", "kde"), cost=3.0)
+register_plot_type("scatter", render_scatter_matrix, cost=4.0, scope="group")
+
+
+def plot_types_label(plot_types, drawn):
+    """ファイル名に使うプロットの種類（"all" の指定はそのまま、それ以外は図に実際に描く種類 drawn）"""
+    return plot_types if plot_types == "all" else ",".join(drawn)
+
+
+def column_plot_types(plot_functions):
+    """列ごとの図に描く種類"""
+    return [name for name in plot_functions if PLOT_TYPES[name].scope == "column"]
+
+
+def plot_needs(plot_functions):
+    """描く種類の needs をまとめた集合（列ごとの種類のみ）"""
+    return {need for name in column_plot_types(plot_functions) for need in PLOT_TYPES[name].needs}
+
+
+def group_plot_types(plot_functions):
+    """カテゴリごとに1枚ずつ描く種類"""
+    return [name for name in plot_functions if PLOT_TYPES[name].scope == "group"]
+
+
+def basic_plot_types(plot_functions):
+    """
+    ヒストグラム・箱ひげ図・バイオリンプロットのみ（元の値を使わない結合やグリッドの図で描ける種類）
+    他の種類しか無い場合は全て描く
+    """
+    names = [name for name in plot_functions if name in DEFAULT_PLOT_TYPES]
+    return names or list(DEFAULT_PLOT_TYPES)
+
+
+def plot_cost(plot_functions, rows, downsample_threshold=None):
+    """図を描く重さの見積もり（種類の重さの合計 × 描く値の数に応じた係数）"""
+    if downsample_threshold is not None and rows >= downsample_threshold:
+        rows = SAMPLE_SIZE
+    return sum(PLOT_TYPES[name].cost for name in plot_functions) * (1 + rows / SAMPLE_SIZE)
+
+
+def render_accumulated(accumulator, column, category_name, category_column, figsize, plot_functions, stats=None):
+    """
+    結合した要約（sketches.ColumnAccumulator）から図を作成して返す（元の値は使わない）
+    
+    ヒストグラムは集計済みのビン、箱ひげ図は分位点のスケッチ、バイオリンプロットはビンの密度から描く
+    """
+    stats = stats or accumulator.stats()
+    histogram = accumulator.histogram
+    plot_functions = basic_plot_types(plot_functions)
+    fig, axes = _new_figure(column, category_name, category_column, figsize, plot_functions)
+    
+    # 1. ヒストグラム
+    if "hist" in plot_functions:
+        ax = axes.pop(0)
+        edges = histogram.edges
+        ax.bar(edges[:-1], histogram.counts, width=np.diff(edges), align='edge',
+               alpha=0.7, color='skyblue', edgecolor='black', linewidth=0.5)
+        _decorate_hist(ax, column, stats)
+    
+    # 2. 箱ひげ図
+    if "box" in plot_functions:
+        ax = axes.pop(0)
+        box_plot = ax.bxp([_box_stats(stats)], showfliers=False, patch_artist=True)
+        _decorate_box(ax, column, stats, box_plot)
+    
+    # 3. バイオリンプロット
+    if "violin" in plot_functions:
+        ax = axes.pop(0)
+        edges = histogram.edges
+        density = histogram.counts / max(histogram.total, 1) / histogram.width
+        density = np.convolve(density, [0.25, 0.5, 0.25], mode='same')  # ビンの段差をならす
+        vpstats = {"coords": (edges[:-1] + edges[1:]) / 2, "vals": density, "mean": stats["mean"],
+                   "median": stats["median"], "min": stats["min"], "max": stats["max"]}
+        violin_parts = ax.violin([vpstats], positions=[1], showmeans=True, showmedians=True)
+        _decorate_violin(ax, column, stats, violin_parts)
+    
+    fig.tight_layout()
+    return fig
+
+
+def _common_edges(values, bins=30):
+    """全てのカテゴリで共通のヒストグラムのビンの境界（値が無い場合はNone）"""
+    values = values.dropna()
+    if len(values) == 0:
+        return None
+    return np.histogram_bin_edges(values, bins=bins)
+
+
+def _histogram_entry(data, stats, edges):
+    """共通のビンの度数と箱ひげ図のひげの位置"""
+    box = _box_stats(stats) if "whislo" in stats else _box_stats_from_data(data, data.iloc[:0], stats)
+    return {"counts": np.histogram(data, bins=edges)[0], "whislo": box["whislo"], "whishi": box["whishi"]}
+
+
+def _grid_entry(data, category_name, stats, edges):
+    """グリッドの1カテゴリ分の値（統計量・箱ひげ図の値・抽出した値・共通のビンの度数）"""
+    sample = sample_values(data, SAMPLE_SIZE)
+    box = _box_stats(stats) if "whislo" in stats else _box_stats_from_data(data, sample, stats)
+    return {"category": category_name, "stats": stats, "box": box, "sample": np.asarray(sample),
+            "counts": np.histogram(data, bins=edges)[0]}
+
+
+def render_grid(column, entries, edges, category_column, figsize, plot_functions):
+    """
+    1つの数値列について、全てのカテゴリを並べた図を作成して返す（プロットの種類ごとに1段）
+    
+    Parameters:
+    -----------
+    entries : list
+        カテゴリごとの _grid_entry() の結果
+    edges : np.ndarray
+        全てのカテゴリで共通のヒストグラムのビンの境界
+    """
+    plot_functions = basic_plot_types(plot_functions)
+    n = len(entries)
+    labels = [str(entry["category"]) for entry in entries]
+    positions = np.arange(1, n + 1)
+    # カテゴリが多い場合は横に広げる
+    width = max(figsize[0], 0.5 * n + 2)
+    fig, axes = plt.subplots(len(plot_functions), 1, figsize=(width, figsize[1] * len(plot_functions)), squeeze=False)
+    axes = list(axes[:, 0])
+    title = f'変数: {column}' + (f' (カテゴリ: {category_column}、{n}種類)' if category_column else '')
+    fig.suptitle(title, fontsize=16, fontweight='bold')
+    
+    # 1. ヒストグラム（共通のビンで重ねる）
+    if "hist" in plot_functions:
+        ax = axes.pop(0)
+        for entry, label in zip(entries, labels):
+            ax.stairs(entry["counts"], edges, label=label, linewidth=1.2)
+        ax.set_title('ヒストグラム', fontsize=12)
+        ax.set_xlabel(column, fontsize=10)
+        ax.set_ylabel('頻度', fontsize=10)
+        ax.grid(True, alpha=0.3)
+        if n <= 12:
+            ax.legend(prop={'size': 8}, ncol=max(1, n // 6))
+    
+    # 2. 箱ひげ図
+    if "box" in plot_functions:
+        ax = axes.pop(0)
+        box_plot = ax.bxp([entry["box"] for entry in entries], positions=positions, patch_artist=True)
+        for box in box_plot['boxes']:
+            box.set_facecolor('lightgreen')
+            box.set_alpha(0.7)
+        ax.set_title('箱ひげ図', fontsize=12)
+        ax.set_ylabel(column, fontsize=10)
+        ax.grid(True, alpha=0.3)
+    
+    # 3. バイオリンプロット（値が1つのカテゴリは描けないので除く）
+    if "violin" in plot_functions:
+        ax = axes.pop(0)
+        drawable = [i for i, entry in enumerate(entries) if entry["sample"].size > 1]
+        if drawable:
+            violin_parts = ax.violinplot([entries[i]["sample"] for i in drawable], positions=positions[drawable],
+                                         showmeans=True, showmedians=True)
+            for pc in violin_parts['bodies']:
+                pc.set_facecolor('lightcoral')
+                pc.set_alpha(0.7)
+        ax.set_title('バイオリンプロット', fontsize=12)
+        ax.set_ylabel(column, fontsize=10)
+        ax.grid(True, alpha=0.3)
+    
+    # 箱ひげ図とバイオリンプロットの横軸にカテゴリ名とデータ数を表示
+    for ax in fig.axes:
+        if ax.get_title() != 'ヒストグラム':
+            ax.set_xticks(positions)
+            ax.set_xticklabels([f'{label}\n(n={entry["stats"]["count"]})' for entry, label in zip(entries, labels)],
+                               fontsize=8, rotation=45 if n > 8 else 0, ha='right' if n > 8 else 'center')
+    
+    fig.tight_layout()
+    return fig
+
+
+def strongest_pairs(corr, count, max_pairs):
+    """相関係数の絶対値の大きい組 (i, j)（i < j、両方が欠損でない行が3つ以上の組のみ）を max_pairs 組まで"""
+    i, j = np.triu_indices(corr.shape[0], k=1)
+    strength = np.abs(corr[i, j])
+    valid = np.isfinite(strength) & (count[i, j] >= 3)
+    i, j, strength = i[valid], j[valid], strength[valid]
+    order = np.argsort(-strength, kind="stable")[:max_pairs]
+    return list(zip(i[order].tolist(), j[order].tolist()))
+
+
+def _bin_index(values, low, high, bins):
+    """値のビンの番号（low〜high を bins 等分、欠損値は -1）"""
+    values = values.to_numpy(dtype=float, na_value=np.nan)
+    width = (high - low) / bins if high > low else 1.0
+    index = np.clip(np.floor((values - low) / width), 0, bins - 1)
+    return np.where(np.isfinite(values), index, -1).astype(np.int64)
+
+
+def pair_counts(df, pairs, ranges, bins=PAIR_BINS):
+    """
+    組ごとの2次元の度数（六角形ビンの図用）
+    
+    Parameters:
+    -----------
+    pairs : list of tuple
+        (列x, 列y) のリスト
+    ranges : dict
+        {列名: (最小値, 最大値)}（全てのカテゴリで共通の範囲）
+    
+    Returns:
+    --------
+    dict
+        {(列x, 列y): (bins, bins) の度数の配列（[xのビン, yのビン]）}
+    """
+    index = {}
+    for column in dict.fromkeys(c for pair in pairs for c in pair):
+        index[column] = _bin_index(df[column], *ranges[column], bins)
+    counts = {}
+    for x, y in pairs:
+        valid = (index[x] >= 0) & (index[y] >= 0)
+        flat = index[x][valid] * bins + index[y][valid]
+        counts[(x, y)] = np.bincount(flat, minlength=bins * bins).reshape(bins, bins)
+    return counts
+
+
+def render_correlation(corr, columns, category_name, category_column, figsize):
+    """相関係数の行列の図を作成して返す（列が多い場合は目盛りと数値を省く）"""
+    k = len(columns)
+    size = min(12.0, max(figsize[1] * 1.5, 0.15 * k + 3))
+    fig, ax = plt.subplots(figsize=(size + 1.5, size))
+    image = ax.imshow(corr, cmap='RdBu_r', vmin=-1, vmax=1, interpolation='nearest')
+    fig.colorbar(image, ax=ax, fraction=0.046, pad=0.04, label='相関係数')
+    if k <= 60:
+        ax.set_xticks(range(k))
+        ax.set_yticks(range(k))
+        ax.set_xticklabels(columns, rotation=90, fontsize=8)
+        ax.set_yticklabels(columns, fontsize=8)
+    else:
+        ax.set_xticks([])
+        ax.set_yticks([])
+    if k <= 12:
+        for i in range(k):
+            for j in range(k):
+                if np.isfinite(corr[i, j]):
+                    ax.text(j, i, f'{corr[i, j]:.2f}', ha='center', va='center', fontsize=8,
+                            color='white' if abs(corr[i, j]) > 0.6 else 'black')
+    title = f'相関係数（{k}列）' + (f' (カテゴリ: {category_name})' if category_column else '')
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    return fig
+
+
+def render_pairs(entries, counts, ranges, category_name, category_column, figsize, bins=PAIR_BINS):
+    """
+    組ごとの2次元の度数から六角形ビンの図を並べて作成して返す（元の値は使わない）
+    
+    Parameters:
+    -----------
+    entries : list of tuple
+        (列x, 列y, 相関係数, 行数) のリスト
+    counts : dict
+        pair_counts() の結果
+    """
+    n = len(entries)
+    ncols = min(4, n)
+    nrows = math.ceil(n / ncols)
+    fig, axes = plt.subplots(nrows, ncols, figsize=(figsize[1] * ncols, figsize[1] * nrows), squeeze=False)
+    title = '相関の強い組' + (f' (カテゴリ: {category_name})' if category_column else '')
+    fig.suptitle(title, fontsize=16, fontweight='bold')
+    
+    for ax, (x, y, r, rows) in zip(axes.flat, entries):
+        # ビンの中心に度数を重みとして置き、六角形ごとに合計する
+        grid = counts[(x, y)]
+        cx = np.linspace(*ranges[x], bins + 1)
+        cy = np.linspace(*ranges[y], bins + 1)
+        xs, ys = np.meshgrid((cx[:-1] + cx[1:]) / 2, (cy[:-1] + cy[1:]) / 2, indexing='ij')
+        filled = grid > 0
+        ax.hexbin(xs[filled], ys[filled], C=grid[filled], reduce_C_function=np.sum, gridsize=bins // 2,
+                  extent=(*ranges[x], *ranges[y]), cmap='Blues', bins='log', mincnt=1)
+        ax.set_title(f'r = {r:.2f}（{rows}行）', fontsize=10)
+        ax.set_xlabel(x, fontsize=9)
+        ax.set_ylabel(y, fontsize=9)
+        ax.tick_params(labelsize=7)
+    for ax in list(axes.flat)[n:]:
+        ax.set_visible(False)
+    
+    fig.tight_layout()
+    return fig
+
+
+CALENDAR_TITLES = {"month": "月別の平均（年ごと）", "week": "曜日別の平均（週ごと）", "hour": "時間帯別の平均（日ごと）"}
+
+
+def render_timeseries(index, binned, rolling, grid, column, category_name, category_column, figsize, timeline):
+    """
+    区間ごとに集計した値から、推移（平均・最小〜最大・移動平均）とカレンダーの図を作成して返す
+    
+    Parameters:
+    -----------
+    index : pd.DatetimeIndex
+        区間の開始時刻
+    binned : dict
+        timeseries.resample() の結果
+    grid : tuple
+        timeseries.calendar() の結果
+    """
+    fig, (ax, cal) = plt.subplots(1, 2, figsize=(figsize[0] * 1.25, figsize[1] * 1.25), gridspec_kw={"width_ratios": [2, 1]})
+    title = f'変数: {column}' + (f' (カテゴリ: {category_name})' if category_column else '')
+    fig.suptitle(title, fontsize=16, fontweight='bold')
+    
+    # 1. 推移
+    x = index.to_numpy()
+    ax.fill_between(x, binned["min"], binned["max"], color='skyblue', alpha=0.4, linewidth=0, label='最小〜最大')
+    ax.plot(x, binned["mean"], color='steelblue', linewidth=0.8, label=f'平均（{frequency_label(timeline["frequency"])}ごと）')
+    ax.plot(x, rolling, color='red', linewidth=1.8, label=f'移動平均（{frequency_label(timeline["window"] * timeline["frequency"])}）')
+    ax.set_title('推移', fontsize=12)
+    ax.set_xlabel(timeline["column"], fontsize=10)
+    ax.set_ylabel(column, fontsize=10)
+    ax.tick_params(axis='x', labelrotation=30, labelsize=8)
+    ax.grid(True, alpha=0.3)
+    ax.legend(prop={'size': 9}, loc='upper left')
+    
+    # 2. カレンダー
+    matrix, row_labels, col_labels = grid
+    image = cal.imshow(matrix, aspect='auto', cmap='YlOrRd', interpolation='nearest')
+    fig.colorbar(image, ax=cal, fraction=0.05, pad=0.03)
+    row_step = 3 if len(row_labels) > 12 else 1
+    cal.set_yticks(range(0, len(row_labels), row_step))
+    cal.set_yticklabels(row_labels[::row_step], fontsize=8)
+    col_step = max(1, math.ceil(len(col_labels) / 8))
+    cal.set_xticks(range(0, len(col_labels), col_step))
+    cal.set_xticklabels(col_labels[::col_step], fontsize=8, rotation=45, ha='right')
+    cal.set_title(CALENDAR_TITLES[timeline["layout"]], fontsize=12)
+    
+    fig.tight_layout()
+    return fig
+
+
+def _new_figure(column, category_name, category_column, figsize, plot_functions):
+    """プロットの数に応じた図と軸のリストを作成"""
+    # 図のサイズを調整（プロット数に応じて）
+    plot_count = len(plot_functions)
+    if plot_count == 1:
+        adjusted_figsize = (figsize[0] // 3, figsize[1])
+    else:
+        adjusted_figsize = figsize
+    
+    # 図を作成
+    fig, axes = plt.subplots(1, plot_count, figsize=adjusted_figsize)
+    if plot_count == 1:
+        axes = [axes]  # 単一プロットの場合もリストとして扱う
+    
+    title = f'変数: {column}' + (f' (カテゴリ: {category_name})' if category_column else '')
+    fig.suptitle(title, fontsize=16, fontweight='bold')
+    return fig, list(axes)
+
+
+def _decorate_hist(ax, column, stats):
+    ax.set_title('ヒストグラム', fontsize=12)
+    ax.set_xlabel(column, fontsize=10)
+    ax.set_ylabel('頻度', fontsize=10)
+    ax.grid(True, alpha=0.3)
+    
+    # 統計情報を追加
+    mean_val = stats["mean"]
+    std_val = stats["std"]
+    ax.axvline(mean_val, color='red', linestyle='--', linewidth=2, label=f'平均: {mean_val:.2f}')
+    ax.axvline(mean_val + std_val, color='orange', linestyle='--', alpha=0.7, label=f'±1σ')
+    ax.axvline(mean_val - std_val, color='orange', linestyle='--', alpha=0.7)
+    ax.legend(prop={'size': 9})
+
+
+def _decorate_box(ax, column, stats, box_plot):
+    box_plot['boxes'][0].set_facecolor('lightgreen')
+    box_plot['boxes'][0].set_alpha(0.7)
+    ax.set_title('箱ひげ図', fontsize=12)
+    ax.set_ylabel(column, fontsize=10)
+    ax.grid(True, alpha=0.3)
+    
+    # 外れ値の数を表示（近似の場合は誤差の目安も）
+    text = f'外れ値: {stats["outliers"]}個'
+    if stats.get("quantile_error"):
+        text += f' (±{math.ceil(stats["quantile_error"] * stats["count"])})\n四分位数の順位誤差 ±{stats["quantile_error"]:.1%}'
+    ax.text(0.5, 0.95, text, 
+            transform=ax.transAxes, ha='center', va='top', fontsize=9,
+            bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+
+
+def _decorate_violin(ax, column, stats, violin_parts):
+    for pc in violin_parts['bodies']:
+        pc.set_facecolor('lightcoral')
+        pc.set_alpha(0.7)
+    ax.set_title('バイオリンプロット', fontsize=12)
+    ax.set_ylabel(column, fontsize=10)
+    ax.set_xticks([1])
+    ax.set_xticklabels([column], fontsize=9)
+    ax.grid(True, alpha=0.3)
+    
+    # 統計情報をテキストで追加
+    stats_text = f'平均: {stats["mean"]:.2f}\n中央値: {stats["median"]:.2f}\n標準偏差: {stats["std"]:.2f}\nデータ数: {stats["count"]}'
+    ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, 
+            va='top', ha='left', fontsize=8,
+            bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+
+
+def save_figure(fig, filepath):
+    """図をPNGで保存（300dpi）"""
+    fig.savefig(filepath, dpi=300, bbox_inches='tight')
+
+
+def legacy_filename(column, category_name, category_column, plot_types):
+    """vslz_1〜4 のファイル名（プロットの種類を含まない）"""
+    safe_column_name = "".join(c for c in column if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    safe_category_name = "".join(c for c in str(category_name) if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    
+    if category_column:
+        return f"{safe_column_name}_{safe_category_name}_visualization.png"
+    return f"{safe_column_name}_visualization.png"
+
+
+class Engine:
+    """
+    可視化の処理の流れ（読み込み → 分類 → 統計量 → 描画 → 保存）の各段階の関数
+    analyze() はこの流れを実行し、vslz_1〜5 は段階を差し替えた Engine と引数の組み合わせにすぎない
+    （処理の改善は全て同じ流れに入り、設定どうしの処理時間を比べられる）
+    
+    Parameters:
+    -----------
+    loader : callable
+        source -> pd.DataFrame（デフォルト: to_dataframe）
+    partitioner : callable or None
+        (df, 分類列のリスト, 組み合わせ) -> (カテゴリ名, 部分データ) の反復（デフォルト: iter_category_groups）
+        Noneの場合は分類せず、全体を1つのカテゴリとして処理
+    stats : callable
+        欠損値を除いた pd.Series -> 統計量の dict（デフォルト: column_stats）
+    renderer : callable
+        render_column() と同じ引数 -> Figure（デフォルト: render_column）
+    namer : callable
+        (列名, カテゴリ名, 分類列名, プロットの種類) -> ファイル名（デフォルト: figure_filename）
+    writer : callable
+        (Figure, 保存先のPath) -> None（デフォルト: save_figure）
+    """
+    def __init__(self, loader=to_dataframe, partitioner=iter_category_groups, stats=column_stats,
+                 renderer=render_column, namer=figure_filename, writer=save_figure):
+        self.loader = loader
+        self.partitioner = partitioner
+        self.stats = stats
+        self.renderer = renderer
+        self.namer = namer
+        self.writer = writer
+    
+    def __repr__(self):
+        stages = ("loader", "partitioner", "stats", "renderer", "namer", "writer")
+        return "Engine(" + ", ".join(f"{name}={getattr(getattr(self, name), '__name__', None)}" for name in stages) + ")"
+
+
+def process_single_column(df, column, category_name, category_column, output_path, figsize, show_only, plot_types="all", report=None, engine=None):
+    """
+    単一の数値列に対してプロットを作成
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        処理対象のデータフレーム
+    column : str
+        数値列名
+    category_name : str
+        カテゴリ名（ファイル名や表示用）
+    category_column : str or None
+        カテゴリ列名
+    output_path : Path or None
+        出力パス（Noneの場合は保存しない）
+    figsize : tuple
+        図のサイズ
+    show_only : bool
+        表示のみかどうか
+    plot_types : str
+        プロットの種類（"all" または PLOT_TYPES の名前、カンマ区切りで複数可。列ごとでない種類は無視する）
+    report : RunReport or None
+        処理時間と件数の記録先（Noneの場合は記録しない）
+    engine : Engine or None
+        統計量・描画・保存の関数（Noneの場合は Engine() の既定の関数）
+    """
+    try:
+        plot_functions = column_plot_types(resolve_plot_functions(plot_types))
+        _process_column(df, column, category_name, category_column, output_path, figsize, show_only,
+                        plot_functions, plot_types_label(plot_types, plot_functions), report or RunReport(),
+                        bool(plot_functions), engine=engine)
     except FileNotFoundError:
-        print(f"エラー: ファイル '{df}' が見つかりません。") #csv_file_path->dfに変更
+        logger.error(f"エラー: ファイル '{df}' が見つかりません。") #csv_file_path->dfに変更
     except pd.errors.EmptyDataError:
-        print(f"エラー: ファイル '{df}' が空です。") #csv_file_path->dfに変更
+        logger.error(f"エラー: ファイル '{df}' が空です。") #csv_file_path->dfに変更
     except Exception as e:
-        print(f"エラーが発生しました: {str(e)}")
\ No newline at end of file
+        _event(logging.ERROR, "error", f"エラーが発生しました: {str(e)}", column=column, category=category_name,
+               exc_info=logger.isEnabledFor(logging.DEBUG))
+
+
+def _process_column(df, column, category_name, category_column, output_path, figsize, show_only, plot_functions, plot_types, report, render=True, quantile_error=None, downsample_threshold=None, engine=None):
+    """
+    単一の数値列の統計量を求めて図を作成・保存（例外はそのまま送出）
+    
+    Returns:
+    --------
+    tuple or None
+        (統計量, 図の情報 or None)。データが無い場合はNone
+    """
+    engine = engine or Engine()
+    # 欠損値を除去
+    data = df[column].dropna()
+    
+    if len(data) == 0:
+        _event(logging.DEBUG, "column_skipped", f"列 '{column}' (カテゴリ: {category_name}) にはデータがありません。スキップします。",
+               column=column, category=category_name)
+        report.count("skipped")
+        return None
+    
+    logger.debug(f"列 '{column}' (カテゴリ: {category_name}) を処理中... データ数: {len(data)}")
+    report.count("rows_processed", len(data))
+    
+    # 統計量を求める
+    with report.stage("stats"):
+        if quantile_error and len(data) >= APPROX_MIN_ROWS:
+            stats = approximate_stats(data, quantile_error)
+            report.count("approximated")
+        else:
+            stats = engine.stats(data)
+    if not render:
+        return stats, None
+    return stats, _render_figure(data, column, category_name, category_column, stats, output_path, figsize,
+                                 show_only, plot_functions, plot_types, report, downsample_threshold, engine)
+
+
+def _render_figure(data, column, category_name, category_column, stats, output_path, figsize, show_only, plot_functions, plot_types, report, downsample_threshold=None, engine=None):
+    """
+    統計量を求めた単一の数値列の図を作成して保存・表示（例外はそのまま送出）
+    
+    Returns:
+    --------
+    dict
+        図の情報
+    """
+    engine = engine or Engine()
+    # 図を作成
+    with report.stage("render"):
+        fig = engine.renderer(data, column, category_name, category_column, stats, figsize, plot_functions, downsample_threshold)
+    if downsample_threshold and len(data) >= downsample_threshold:
+        report.count("downsampled")
+    report.count("figures")
+    figure = {"column": column, "category": category_name, "rows": len(data), "path": None}
+    
+    try:
+        if show_only:
+            # 表示のみ
+            with report.stage("show"):
+                plt.show()
+            _event(logging.DEBUG, "figure_shown", f"表示しました: {column} (カテゴリ: {category_name})",
+                   column=column, category=category_name, rows=len(data))
+        else:
+            # ファイルを保存
+            filepath = output_path / engine.namer(column, category_name, category_column, plot_types)
+            with report.stage("save"):
+                engine.writer(fig, filepath)
+            size = filepath.stat().st_size
+            report.count("bytes_written", size)
+            figure["path"] = str(filepath)
+            _event(logging.DEBUG, "figure_saved", f"保存しました: {filepath}",
+                   column=column, category=category_name, rows=len(data), path=str(filepath), bytes=size)
+    finally:
+        # メモリを節約するため図を閉じる
+        plt.close(fig)
+    
+    return figure
+
+
+def _process_group(df, numeric_columns, category_name, category_column, output_path, figsize, show_only, plot_type, report, engine=None):
+    """
+    カテゴリごとに1枚描く種類（scope="group"）の図を作成して保存・表示（例外はそのまま送出）
+    
+    Returns:
+    --------
+    dict
+        図の情報（column は None、plot はプロットの種類）
+    """
+    engine = engine or Engine()
+    with report.stage("render"):
+        fig = PLOT_TYPES[plot_type].draw(df, numeric_columns, category_name, category_column, figsize)
+    report.count("figures")
+    figure = {"column": None, "category": category_name, "plot": plot_type, "rows": len(df), "path": None}
+    
+    try:
+        if show_only:
+            with report.stage("show"):
+                plt.show()
+            _event(logging.DEBUG, "figure_shown", f"表示しました: {plot_type} (カテゴリ: {category_name})",
+                   category=category_name, rows=len(df))
+        else:
+            filepath = output_path / group_filename(plot_type, category_name, category_column)
+            with report.stage("save"):
+                engine.writer(fig, filepath)
+            size = filepath.stat().st_size
+            report.count("bytes_written", size)
+            figure["path"] = str(filepath)
+            _event(logging.DEBUG, "figure_saved", f"保存しました: {filepath}",
+                   category=category_name, rows=len(df), path=str(filepath), bytes=size)
+    finally:
+        plt.close(fig)
+    
+    return figure
+
+
+def _process_pairwise(df, numeric_columns, category_name, category_column, output_path, figsize, show_only, max_pairs, ranges, result, render=True, engine=None):
+    """
+    1つのカテゴリの全ての組の相関係数を求めて result に記録し、相関係数の図と六角形ビンの図を作成して保存・表示
+    （例外はそのまま送出）
+    
+    Returns:
+    --------
+    list of dict
+        図の情報（column は None、plot は "corr" または "pairs"）
+    """
+    engine = engine or Engine()
+    with result.report.stage("stats"):
+        moments = PairwiseMoments(numeric_columns).update(df[numeric_columns])
+        corr = moments.correlation()
+        result.correlations[category_name] = pd.DataFrame(corr, index=numeric_columns, columns=numeric_columns)
+        result.pair_counts[category_name] = pd.DataFrame(moments.count, index=numeric_columns, columns=numeric_columns)
+        pairs = strongest_pairs(corr, moments.count, max_pairs)
+        counts = pair_counts(df, [(numeric_columns[i], numeric_columns[j]) for i, j in pairs], ranges)
+    result.report.count("pairs", len(numeric_columns) * (len(numeric_columns) - 1) // 2)
+    if not render:
+        return []
+    
+    entries = [(numeric_columns[i], numeric_columns[j], corr[i, j], int(moments.count[i, j])) for i, j in pairs]
+    figures = []
+    for plot, draw in (("corr", lambda: render_correlation(corr, numeric_columns, category_name, category_column, figsize)),
+                       ("pairs", lambda: render_pairs(entries, counts, ranges, category_name, category_column, figsize))):
+        if plot == "pairs" and not entries:
+            continue
+        with result.report.stage("render"):
+            fig = draw()
+        result.report.count("figures")
+        figure = {"column": None, "category": category_name, "plot": plot, "rows": len(df), "path": None}
+        _emit_figure(fig, figure, group_filename(plot, category_name, category_column), output_path, show_only, result.report, engine)
+        figures.append(figure)
+    return figures
+
+
+def _emit_figure(fig, figure, filename, output_path, show_only, report, engine):
+    """図を表示または output_path / filename に保存し、図の情報に保存先を記録して図を閉じる"""
+    try:
+        if show_only:
+            with report.stage("show"):
+                plt.show()
+        else:
+            filepath = output_path / filename
+            with report.stage("save"):
+                engine.writer(fig, filepath)
+            size = filepath.stat().st_size
+            report.count("bytes_written", size)
+            figure["path"] = str(filepath)
+            _event(logging.DEBUG, "figure_saved", f"保存しました: {filepath}", column=figure["column"],
+                   category=figure["category"], rows=figure["rows"], path=str(filepath), bytes=size)
+    finally:
+        plt.close(fig)
+
+
+def prepare_timeline(df, time_column=None, frequency=None, window=None):
+    """
+    日時の列を決めて時刻の順に並べ、エポックからのナノ秒の列（_TIME_KEY）を追加する
+    日時として読めない行は除く。集計の区間は全てのカテゴリで共通にする
+    
+    Returns:
+    --------
+    tuple
+        (データフレーム, {"column", "origin", "frequency", "bins", "window", "layout"}（時刻・間隔はナノ秒、window は区間数）)
+    """
+    column = detect_time_column(df, time_column)
+    if column is None:
+        raise ValueError("日時の列が見つかりません（time_column で指定してください）")
+    stamps, valid = to_timestamps(df[column])
+    if not valid.all():
+        logger.warning(f"警告: 日時として読めない{int((~valid).sum())}行を除きます（列: {column}）")
+        df, stamps = df[valid], stamps[valid]
+    if stamps.size == 0:
+        raise ValueError(f"列 '{column}' に日時として読める値がありません")
+    if np.any(stamps[1:] < stamps[:-1]):
+        order = np.argsort(stamps, kind="stable")
+        df, stamps = df.take(order), stamps[order]
+    df = df.assign(**{_TIME_KEY: stamps})
+    
+    spacing = int(np.median(np.diff(stamps))) if stamps.size > 1 else 0
+    step = duration_ns(frequency) if frequency else choose_frequency(int(stamps[-1] - stamps[0]), spacing)
+    origin = int(stamps[0]) // step * step
+    bins = int((stamps[-1] - origin) // step) + 1
+    if bins > TIMESERIES_MAX_BINS:
+        raise ValueError(f"集計の区間が多すぎます（{bins}区間）。間隔を長くしてください")
+    span = max(1, round(duration_ns(window) / step)) if window else TIMESERIES_WINDOW
+    return df, {"column": column, "origin": origin, "frequency": step, "bins": bins, "window": span,
+                "layout": calendar_layout(stamps)}
+
+
+def _sorted_by_time(df):
+    """カテゴリのデータと時刻の配列（分類で順番が変わった場合は並べ直す）"""
+    stamps = df[_TIME_KEY].to_numpy()
+    if np.any(stamps[1:] < stamps[:-1]):
+        order = np.argsort(stamps, kind="stable")
+        df, stamps = df.take(order), stamps[order]
+    return df, stamps
+
+
+def _process_timeseries(df, column, stamps, category_name, category_column, output_path, figsize, show_only, timeline, result, render=True, engine=None):
+    """
+    1つの (カテゴリ, 列) の値を区間ごとに集計して result に記録し、推移とカレンダーの図を作成して保存・表示
+    （例外はそのまま送出）
+    
+    Returns:
+    --------
+    dict or None
+        図の情報（図を作らない場合はNone）
+    """
+    engine = engine or Engine()
+    values = df[column].to_numpy(dtype=float, na_value=np.nan)
+    with result.report.stage("stats"):
+        binned = resample(stamps, values, timeline["origin"], timeline["frequency"], timeline["bins"])
+        rolling = rolling_mean(binned["sum"], binned["count"], timeline["window"])
+        grid = calendar(stamps, values, timeline["layout"])
+        index = pd.DatetimeIndex((timeline["origin"] + timeline["frequency"] * np.arange(timeline["bins"])).astype("datetime64[ns]"))
+        result.timeseries[(category_name, column)] = pd.DataFrame(
+            {"count": binned["count"], "mean": binned["mean"], "min": binned["min"], "max": binned["max"], "rolling": rolling},
+            index=index)
+    if not render:
+        return None
+    
+    with result.report.stage("render"):
+        fig = render_timeseries(index, binned, rolling, grid, column, category_name, category_column, figsize, timeline)
+    result.report.count("figures")
+    figure = {"column": column, "category": category_name, "plot": "timeseries", "rows": int(np.isfinite(values).sum()), "path": None}
+    _emit_figure(fig, figure, engine.namer(column, category_name, category_column, "timeseries"),
+                 output_path, show_only, result.report, engine)
+    return figure
+
+
+def _render_column_task(data, column, category_name, category_column, stats, output_path, figsize, plot_functions, plot_types, downsample_threshold, engine):
+    """ワーカープロセスで1枚描いて (図の情報, RunReport) を返す"""
+    report = RunReport()
+    figure = _render_figure(data, column, category_name, category_column, stats, output_path, figsize,
+                            False, plot_functions, plot_types, report, downsample_threshold, engine)
+    return figure, report
+
+
+def _render_group_task(df, numeric_columns, category_name, category_column, output_path, figsize, plot_type, engine):
+    """ワーカープロセスでカテゴリごとの図を1枚描いて (図の情報, RunReport) を返す"""
+    report = RunReport()
+    figure = _process_group(df, numeric_columns, category_name, category_column, output_path, figsize, False, plot_type, report, engine)
+    return figure, report
+
+
+class RenderQueue:
+    """
+    描画のタスクをワーカープロセスへ順に割り当て、図の情報と処理時間を result にまとめる
+    
+    待っているタスクは重いもの（plot_cost）から割り当てる（最後に重いタスクが残って待つことが少なくなる）。
+    待っている・実行中のタスクはそれぞれワーカー数の2倍までとし、超える場合は1つ終わるまで待つ
+    （タスクは値の Series を持つので、全てを溜めるとデータ全体の大きさだけメモリを使う）。
+    終わったタスクは引数ごと手放し、図は add() した順に並べる
+    """
+    def __init__(self, workers, result):
+        self.result = result
+        self.limit = 2 * workers
+        self._waiting = []  # (-重さ, 順番, 関数, 引数) のヒープ
+        self._running = {}  # Future → (順番, 関数, 引数)
+        self._figures = {}
+        self._count = 0
+        # 並列に描いても同じ図になるように、フォントの設定を引き継ぐ
+        rc = {k: v for k, v in plt.rcParams.items() if k.startswith("font.") or k == "axes.unicode_minus"}
+        self._pool = ProcessPoolExecutor(workers, initializer=_init_render_worker, initargs=(*_console_settings, rc))
+    
+    def add(self, cost, func, args):
+        """タスクを加え、空いているワーカーへ割り当てる"""
+        heapq.heappush(self._waiting, (-cost, self._count, func, args))
+        self._count += 1
+        self._collect(block=False)
+        self._submit()
+        while len(self._waiting) > self.limit:
+            self._collect(block=True)
+            self._submit()
+    
+    def close(self):
+        """残りのタスクが全て終わるまで待ち、図の情報を result に加える"""
+        try:
+            while self._waiting or self._running:
+                self._submit()
+                self._collect(block=True)
+        finally:
+            self._pool.shutdown(cancel_futures=True)
+        self.result.figures.extend(self._figures[index] for index in sorted(self._figures))
+        self._figures = {}
+    
+    def _submit(self):
+        while self._waiting and len(self._running) < self.limit:
+            _, index, func, args = heapq.heappop(self._waiting)
+            self._running[self._pool.submit(func, *args)] = (index, func, args)
+    
+    def _collect(self, block):
+        if not self._running:
+            return
+        done, _ = wait(self._running, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            index, func, args = self._running.pop(future)
+            try:
+                figure, report = future.result()
+            except Exception as e:
+                column = args[1] if func is _render_column_task else None
+                self.result.errors.append({"column": column, "category": args[2], "error": str(e)})
+                _event(logging.ERROR, "error", f"エラーが発生しました: {str(e)}", column=column, category=args[2])
+                continue
+            self.result.report.merge(report)
+            self._figures[index] = figure
+
+
+def _process_grid(column, entries, edges, category_column, output_path, figsize, show_only, plot_functions, plot_types, report):
+    """
+    1つの数値列のグリッドの図を作成して保存・表示（例外はそのまま送出）
+    
+    Returns:
+    --------
+    dict
+        図の情報（category は None）
+    """
+    rows = sum(entry["stats"]["count"] for entry in entries)
+    with report.stage("render"):
+        fig = render_grid(column, entries, edges, category_column, figsize, plot_functions)
+    report.count("figures")
+    figure = {"column": column, "category": None, "rows": rows, "path": None}
+    
+    try:
+        if show_only:
+            with report.stage("show"):
+                plt.show()
+            _event(logging.DEBUG, "figure_shown", f"表示しました: {column}（{len(entries)}カテゴリ）", column=column, rows=rows)
+        else:
+            filepath = output_path / grid_filename(column, plot_types)
+            with report.stage("save"):
+                fig.savefig(filepath, dpi=300, bbox_inches='tight')
+            size = filepath.stat().st_size
+            report.count("bytes_written", size)
+            figure["path"] = str(filepath)
+            _event(logging.DEBUG, "figure_saved", f"保存しました: {filepath}",
+                   column=column, rows=rows, path=str(filepath), bytes=size)
+    finally:
+        plt.close(fig)
+    
+    return figure
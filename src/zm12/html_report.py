@@ -0,0 +1,283 @@
+import html
+import json
+import math
+from datetime import datetime
+from pathlib import Path
+
+# 統計量の表の列（キー, 見出し）。HTMLには値の配列としてこの順に埋め込む
+STAT_FIELDS = [
+    ("count", "データ数"),
+    ("mean", "平均"),
+    ("std", "標準偏差"),
+    ("median", "中央値"),
+    ("q1", "第1四分位"),
+    ("q3", "第3四分位"),
+    ("outliers", "外れ値"),
+    ("whislo", "下ひげ"),
+    ("whishi", "上ひげ"),
+]
+
+# 埋め込む数値の有効数字（ファイルを小さくするため）
+SIGNIFICANT_DIGITS = 5
+
+
+def _compact(value):
+    """JSONに埋め込む値（有効数字を丸め、NaNや無限大はnull）"""
+    if value is None:
+        return None
+    value = float(value)
+    if not math.isfinite(value):
+        return None
+    if value.is_integer() and abs(value) < 2 ** 53:
+        return int(value)
+    return float(f"{value:.{SIGNIFICANT_DIGITS}g}")
+
+
+def report_data(result, title=None):
+    """
+    AnalysisResult から、HTMLに埋め込むデータを作成
+
+    Returns:
+    --------
+    dict
+        {"title", "source", "generated", "fields", "columns": {列名: {"edges", "groups": [[カテゴリ名, 統計量..., [度数...]], ...]}}}
+    """
+    columns = {}
+    for (category, column), stats in result.stats.items():
+        entry = columns.setdefault(column, {"edges": [_compact(e) for e in result.bin_edges.get(column, [])], "groups": []})
+        histogram = result.histograms.get((category, column), {})
+        values = {**stats, **{k: v for k, v in histogram.items() if k != "counts"}}
+        entry["groups"].append([str(category)] + [_compact(values.get(key)) for key, _ in STAT_FIELDS]
+                               + [[int(c) for c in histogram.get("counts", [])]])
+
+    return {
+        "title": title or f"{result.source} の分析",
+        "source": result.source,
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "category_columns": result.category_columns,
+        "fields": [{"key": key, "label": label} for key, label in STAT_FIELDS],
+        "columns": {column: columns[column] for column in result.numeric_columns if column in columns},
+    }
+
+
+def write_html_report(result, path, title=None):
+    """
+    統計量とヒストグラムの度数から、グラフをブラウザで描く単一のHTMLファイルを保存
+    （元のデータの行は含めないので、カテゴリが多くても小さなファイルになる）
+
+    Parameters:
+    -----------
+    result : AnalysisResult
+        analyze(..., histograms=True) の結果
+    path : str or Path
+        保存先
+
+    Returns:
+    --------
+    Path
+        保存したファイル
+    """
+    data = report_data(result, title)
+    # </script> で埋め込みが終わらないようにする
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+    page = HTML_TEMPLATE.replace("{{TITLE}}", html.escape(data["title"])).replace("{{DATA}}", payload)
+    path = Path(path)
+    path.write_text(page, encoding="utf-8")
+    return path
+
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="utf-8">
+<title>{{TITLE}}</title>
+<style>
+body { font-family: "Noto Sans CJK JP", "Hiragino Sans", "Yu Gothic", Meiryo, sans-serif; margin: 1.5em; color: #222; }
+h1 { font-size: 1.4em; margin-bottom: 0.2em; }
+.meta { color: #666; font-size: 0.85em; margin-bottom: 1em; }
+.controls { display: flex; gap: 1em; flex-wrap: wrap; align-items: center; margin-bottom: 0.8em; }
+table { border-collapse: collapse; font-size: 0.85em; }
+th, td { border-bottom: 1px solid #ddd; padding: 3px 8px; text-align: right; white-space: nowrap; }
+th { background: #f4f4f4; cursor: pointer; position: sticky; top: 0; }
+td.name { text-align: left; }
+tr:hover td { background: #f8f8ff; }
+tr.selected td { background: #eef; }
+#detail { margin: 1em 0; min-height: 1em; }
+svg text { font-size: 11px; fill: #333; }
+button { margin: 0.8em 0; }
+</style>
+</head>
+<body>
+<h1 id="title"></h1>
+<div class="meta" id="meta"></div>
+<div class="controls">
+  <label>列: <select id="column"></select></label>
+  <label>カテゴリの絞り込み: <input id="filter" type="search" placeholder="カテゴリ名の一部"></label>
+  <span id="shown"></span>
+</div>
+<div id="detail"></div>
+<table>
+  <thead id="head"></thead>
+  <tbody id="body"></tbody>
+</table>
+<button id="more">さらに表示</button>
+<script id="data" type="application/json">{{DATA}}</script>
+<script>
+"use strict";
+const DATA = JSON.parse(document.getElementById("data").textContent);
+const FIELDS = DATA.fields;
+const PAGE = 200;
+const SVG = "http://www.w3.org/2000/svg";
+let state = { column: null, sortIndex: -1, ascending: true, limit: PAGE, selected: null };
+
+function fmt(v) {
+  if (v === null || v === undefined) return "";
+  if (Number.isInteger(v)) return v.toLocaleString();
+  return Math.abs(v) >= 1e5 || (v !== 0 && Math.abs(v) < 1e-3) ? v.toExponential(3) : v.toFixed(3);
+}
+
+function el(tag, attrs, parent) {
+  const node = document.createElementNS(SVG, tag);
+  for (const [k, v] of Object.entries(attrs)) node.setAttribute(k, v);
+  if (parent) parent.appendChild(node);
+  return node;
+}
+
+function value(group, key) {
+  return group[1 + FIELDS.findIndex(f => f.key === key)];
+}
+
+// ヒストグラム（共通のビン）と、その下に箱ひげ図を描く
+function chart(group, edges, width, height, axes) {
+  const counts = group[group.length - 1];
+  const pad = axes ? { l: 48, r: 10, t: 10, b: 40 } : { l: 1, r: 1, t: 1, b: 10 };
+  const svg = el("svg", { width, height });
+  if (!counts.length || edges.length < 2) return svg;
+  const lo = edges[0], hi = edges[edges.length - 1];
+  const boxH = axes ? 18 : 8;
+  const w = width - pad.l - pad.r, h = height - pad.t - pad.b - boxH;
+  const max = Math.max(1, ...counts);
+  const x = v => pad.l + (hi > lo ? (v - lo) / (hi - lo) : 0.5) * w;
+  counts.forEach((c, i) => {
+    const bh = c / max * h;
+    el("rect", { x: x(edges[i]), y: pad.t + h - bh, width: Math.max(0.5, x(edges[i + 1]) - x(edges[i]) - 0.5), height: bh,
+                 fill: "skyblue", stroke: axes ? "#333" : "none", "stroke-width": 0.5 }, svg);
+  });
+  const y = pad.t + h + boxH / 2 + 2;
+  const q1 = value(group, "q1"), q3 = value(group, "q3"), med = value(group, "median");
+  const lo2 = value(group, "whislo"), hi2 = value(group, "whishi"), mean = value(group, "mean");
+  if (q1 !== null && q3 !== null) {
+    if (lo2 !== null && hi2 !== null) el("line", { x1: x(lo2), x2: x(hi2), y1: y, y2: y, stroke: "#333" }, svg);
+    el("rect", { x: x(q1), y: y - boxH / 2 + 1, width: Math.max(1, x(q3) - x(q1)), height: boxH - 2,
+                 fill: "lightgreen", stroke: "#333" }, svg);
+    el("line", { x1: x(med), x2: x(med), y1: y - boxH / 2 + 1, y2: y + boxH / 2 - 1, stroke: "orange", "stroke-width": 2 }, svg);
+  }
+  if (axes) {
+    if (mean !== null) el("line", { x1: x(mean), x2: x(mean), y1: pad.t, y2: pad.t + h, stroke: "red", "stroke-dasharray": "5,3", "stroke-width": 2 }, svg);
+    el("line", { x1: pad.l, x2: pad.l + w, y1: pad.t + h, y2: pad.t + h, stroke: "#333" }, svg);
+    for (let i = 0; i <= 4; i++) {
+      const v = lo + (hi - lo) * i / 4;
+      el("text", { x: x(v), y: height - 8, "text-anchor": "middle" }, svg).textContent = fmt(v);
+      const c = Math.round(max * i / 4);
+      el("text", { x: pad.l - 4, y: pad.t + h - h * i / 4 + 4, "text-anchor": "end" }, svg).textContent = fmt(c);
+    }
+  }
+  return svg;
+}
+
+function groups() {
+  const column = DATA.columns[state.column];
+  const query = document.getElementById("filter").value.trim().toLowerCase();
+  let rows = column.groups.filter(g => !query || g[0].toLowerCase().includes(query));
+  if (state.sortIndex >= 0) {
+    const i = state.sortIndex, sign = state.ascending ? 1 : -1;
+    rows = rows.slice().sort((a, b) => {
+      const va = a[i], vb = b[i];
+      if (va === vb) return 0;
+      if (va === null) return 1;
+      if (vb === null) return -1;
+      return (va < vb ? -1 : 1) * sign;
+    });
+  }
+  return rows;
+}
+
+function showDetail(group) {
+  const detail = document.getElementById("detail");
+  detail.replaceChildren();
+  if (!group) return;
+  const heading = document.createElement("h2");
+  heading.style.fontSize = "1.1em";
+  heading.textContent = `${state.column}（カテゴリ: ${group[0]}）`;
+  detail.appendChild(heading);
+  detail.appendChild(chart(group, DATA.columns[state.column].edges, 640, 260, true));
+  const stats = document.createElement("div");
+  stats.className = "meta";
+  stats.textContent = FIELDS.map((f, i) => `${f.label}: ${fmt(group[1 + i])}`).join("　");
+  detail.appendChild(stats);
+}
+
+function render() {
+  const column = DATA.columns[state.column];
+  const head = document.getElementById("head");
+  const body = document.getElementById("body");
+  const labels = ["カテゴリ"].concat(FIELDS.map(f => f.label));
+  const tr = document.createElement("tr");
+  labels.forEach((label, i) => {
+    const th = document.createElement("th");
+    th.textContent = label + (state.sortIndex === i ? (state.ascending ? " ▲" : " ▼") : "");
+    th.onclick = () => {
+      state.ascending = state.sortIndex === i ? !state.ascending : true;
+      state.sortIndex = i;
+      render();
+    };
+    tr.appendChild(th);
+  });
+  const chartHead = document.createElement("th");
+  chartHead.textContent = "分布";
+  tr.appendChild(chartHead);
+  head.replaceChildren(tr);
+
+  const rows = groups();
+  body.replaceChildren();
+  for (const group of rows.slice(0, state.limit)) {
+    const row = document.createElement("tr");
+    if (group === state.selected) row.className = "selected";
+    group.slice(0, -1).forEach((v, i) => {
+      const td = document.createElement("td");
+      td.textContent = i === 0 ? v : fmt(v);
+      if (i === 0) td.className = "name";
+      row.appendChild(td);
+    });
+    const td = document.createElement("td");
+    td.appendChild(chart(group, column.edges, 160, 46, false));
+    row.appendChild(td);
+    row.onclick = () => { state.selected = group; showDetail(group); render(); };
+    body.appendChild(row);
+  }
+  document.getElementById("shown").textContent = `${Math.min(state.limit, rows.length)} / ${rows.length} カテゴリを表示`;
+  document.getElementById("more").style.display = rows.length > state.limit ? "" : "none";
+}
+
+function init() {
+  document.getElementById("title").textContent = DATA.title;
+  document.getElementById("meta").textContent =
+    `データ: ${DATA.source}　分類: ${DATA.category_columns.join(", ") || "なし"}　作成: ${DATA.generated}`;
+  const select = document.getElementById("column");
+  for (const name of Object.keys(DATA.columns)) {
+    const option = document.createElement("option");
+    option.value = option.textContent = name;
+    select.appendChild(option);
+  }
+  const reset = () => { state.limit = PAGE; state.selected = null; showDetail(null); render(); };
+  select.onchange = () => { state.column = select.value; reset(); };
+  document.getElementById("filter").oninput = reset;
+  document.getElementById("more").onclick = () => { state.limit += PAGE; render(); };
+  state.column = select.value;
+  if (state.column) render();
+}
+init();
+</script>
+</body>
+</html>
+"""
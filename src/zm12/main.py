@@ -1,10 +1,13 @@
 import datetime
+import logging #for anlz_csv
 import typer
 from pathlib import Path #for anlz_csv
 from typing import Optional #for anlz_csv
 from typing import Tuple #for anlz_csv
-#from zm12 import mathtools
-#from zm12 import vegetable
+from typing import List #for gcd, lcm
+import pandas as pd #for reduce_csv
+from zm12 import mathtools
+from zm12 import vegetable
 #from . import demo
 #from . import gtrends
 from zm12 import csv_vslz #for anlz_csv csv_vslz.pyの最初の関数が勝手に実行されるのでget_tableのために沈黙させる
@@ -25,17 +28,74 @@ def anlz_csv(
     figsize: str = typer.Option("12,4", help="図のサイズ (幅,高さ)"),
     show_only: bool = typer.Option(False, "--show", "--s", help="ファイル保存せずに表示のみ"),
     category: str = typer.Option(None, "--category", "--c", help="分類に使用する列名を指定（複数の場合はカンマ区切り）"),
-    plot_type: str = typer.Option("all", "--plot-type", "--t", help="プロットの種類 (all/hist/box/violin)"),
+    plot_type: str = typer.Option("all", "--plot-type", "--t", help="プロットの種類 (all/hist/box/violin/ecdf/qq/kde/scatter、カンマ区切りで複数可)"),
     exclude: str = typer.Option(None, "--exclude", "--e", help="除外する列名（複数の場合はカンマ区切り）"),
-    initialize: bool = typer.Option(False, "--initialize", "--i", help="出力ディレクトリを事前に初期化（既存ファイルを削除）")
+    initialize: bool = typer.Option(False, "--initialize", "--i", help="出力ディレクトリを事前に初期化（既存ファイルを削除）"),
+    profile: bool = typer.Option(False, "--profile", help="cProfileで計測し、profile.pstats に保存"),
+    quiet: bool = typer.Option(False, "--quiet", "--q", help="警告とエラーのみ表示"),
+    verbose: bool = typer.Option(False, "--verbose", "--v", help="図ごとの処理状況も表示"),
+    events: Path = typer.Option(None, "--events", help="全てのイベントをJSON Lines形式で保存するファイル"),
+    quantile_error: float = typer.Option(None, "--approx", help="大きな列の四分位数と外れ値の数を近似する場合の誤差（正規化順位、例: 0.01）"),
+    downsample: int = typer.Option(csv_vslz.DOWNSAMPLE_THRESHOLD, "--downsample", help="集計済みのビンと抽出した値で描く列のデータ数（0の場合は常に全ての値を描く）"),
+    grid: bool = typer.Option(False, "--grid", "--g", help="列ごとに全てのカテゴリを並べた1枚の図を作成"),
+    html: bool = typer.Option(False, "--html", help="図の画像の代わりに、ブラウザでグラフを表示する report.html を作成"),
+    workers: int = typer.Option(1, "--workers", "--w", help="図の作成と保存を並列に行うプロセスの数"),
+    pairwise: bool = typer.Option(False, "--pairwise", help="列ごとの図の代わりに、カテゴリごとの相関係数と相関の強い組の六角形ビンの図を作成"),
+    max_pairs: int = typer.Option(csv_vslz.PAIRWISE_MAX_PAIRS, "--pairs", help="六角形ビンの図を描く組の数（--pairwise の場合）"),
+    timeseries: bool = typer.Option(False, "--timeseries", "--ts", help="列ごとの分布の図の代わりに、日時の列で集計した推移とカレンダーの図を作成"),
+    time_column: str = typer.Option(None, "--time-column", help="日時の列（省略時は自動で検出）"),
+    frequency: str = typer.Option(None, "--freq", help="集計の間隔（例: 1h, 1D、省略時は自動）"),
+    window: str = typer.Option(None, "--window", help="移動平均の期間（例: 7D、省略時は7区間）")
 ):
     """CSVファイルの数値変数を可視化"""
     try:
         w, h = map(int, figsize.split(','))
-        typer.echo(csv_vslz.visualize_csv_data(str(csv_file), output_dir, (w, h), show_only, category, plot_type, exclude, initialize))
+        csv_vslz.setup_logging(logging.WARNING if quiet else logging.DEBUG if verbose else logging.INFO, events)
+        result = csv_vslz.visualize_csv_data(str(csv_file), output_dir, (w, h), show_only, category, plot_type, exclude, initialize, profile,
+                                              quantile_error, downsample or None, grid, html, render_workers=workers,
+                                              pairwise=pairwise, max_pairs=max_pairs, timeseries=timeseries,
+                                              time_column=time_column, frequency=frequency, window=window)
     except ValueError:
         typer.echo("エラー: figsizeは '幅,高さ' の形式で指定してください（例: '12,4'）", err=True)
         raise typer.Exit(1)
+
+    # 読み込みに失敗した場合や、処理できなかった列がある場合
+    if result is None or not result.ok:
+        raise typer.Exit(1)
+
+@app.command()
+def anlz_batch(
+    inputs: List[str] = typer.Argument(..., help="CSVファイル・ディレクトリ・globパターン（複数可）"),
+    output_dir: str = typer.Option("plots", "--p", help="出力ディレクトリ（ファイルごとにサブディレクトリを作成）"),
+    figsize: str = typer.Option("12,4", help="図のサイズ (幅,高さ)"),
+    category: str = typer.Option(None, "--category", "--c", help="分類に使用する列名を指定（複数の場合はカンマ区切り）"),
+    plot_type: str = typer.Option("all", "--plot-type", "--t", help="プロットの種類 (all/hist/box/violin/ecdf/qq/kde/scatter、カンマ区切りで複数可)"),
+    exclude: str = typer.Option(None, "--exclude", "--e", help="除外する列名（複数の場合はカンマ区切り）"),
+    initialize: bool = typer.Option(False, "--initialize", "--i", help="出力ディレクトリを事前に初期化（既存ファイルを削除）"),
+    workers: int = typer.Option(1, "--workers", "--w", help="ワーカープロセスの数"),
+    combine: bool = typer.Option(False, "--combine", help="全ファイルを結合した統計量と図を作成（ファイルごとの図は作らない）"),
+    quantile_error: float = typer.Option(None, "--approx", "--error", help="四分位数と外れ値の数を近似する場合の誤差（正規化順位、--combine では既定 0.01）"),
+    downsample: int = typer.Option(csv_vslz.DOWNSAMPLE_THRESHOLD, "--downsample", help="集計済みのビンと抽出した値で描く列のデータ数（0の場合は常に全ての値を描く）"),
+    grid: bool = typer.Option(False, "--grid", "--g", help="列ごとに全てのカテゴリを並べた1枚の図を作成"),
+    quiet: bool = typer.Option(False, "--quiet", "--q", help="警告とエラーのみ表示"),
+    verbose: bool = typer.Option(False, "--verbose", "--v", help="ファイルごとの処理状況も表示"),
+    events: Path = typer.Option(None, "--events", help="全てのイベントをJSON Lines形式で保存するファイル")
+):
+    """複数のCSVファイルの数値変数をまとめて可視化"""
+    try:
+        w, h = map(int, figsize.split(','))
+    except ValueError:
+        typer.echo("エラー: figsizeは '幅,高さ' の形式で指定してください（例: '12,4'）", err=True)
+        raise typer.Exit(1)
+    
+    csv_vslz.setup_logging(logging.WARNING if quiet else logging.DEBUG if verbose else logging.INFO, events, details=verbose)
+    batch = csv_vslz.analyze_batch(inputs, output_dir, workers, initialize, combine, quantile_error, figsize=(w, h), category_columns=category,
+                                   plot_types=plot_type, exclude_columns=exclude, downsample_threshold=downsample or None, grid=grid)
+    if not batch.output_dirs:
+        typer.echo("エラー: 処理するCSVファイルが見つかりません。", err=True)
+        raise typer.Exit(1)
+    if not batch.ok:
+        raise typer.Exit(1)
 """
 用例：
 # 単一列での分類
@@ -74,26 +134,70 @@ def now():
 
 
 @app.command()
-def gcd(x: int, y: int):
+def gcd(numbers: List[int]):
     """
     Greatest Common Divisor
     """
-    typer.echo(mathtools.gcd(x, y))
+    typer.echo(mathtools.gcd_reduce(numbers))
 
 @app.command()
-def lcm(x: int, y: int):
+def lcm(numbers: List[int]):
     '''
     最小公倍数を求める
     '''
-    typer.echo(mathtools.lcm(x, y))
+    typer.echo(mathtools.lcm_reduce(numbers))
 
 @app.command()
-def main(x: str):
+def reduce_csv(
+    csv_file: Path = typer.Argument(..., help="CSVファイルのパス", exists=True),
+    column: str = typer.Argument(..., help="対象の整数列名"),
+    op: str = typer.Option("gcd", "--op", "-o", help="集約の種類 (gcd/lcm)")
+):
+    '''
+    CSVファイルの整数列全体の最大公約数・最小公倍数を求める
+    '''
+    reducers = {"gcd": mathtools.gcd_reduce, "lcm": mathtools.lcm_reduce}
+    if op not in reducers:
+        typer.echo(f"エラー: 不正な集約の種類 '{op}'（gcd/lcm）", err=True)
+        raise typer.Exit(1)
+    try:
+        # 対象列だけを読み込む
+        values = pd.read_csv(csv_file, usecols=[column])[column]
+        typer.echo(reducers[op](values))
+    except ValueError as e:
+        typer.echo(f"エラー: {e}", err=True)
+        raise typer.Exit(1)
+
+@app.command()
+def is_prime(x: int):
+    '''
+    素数判定（64bit整数はMiller–Rabin法で決定的に判定）
+    '''
+    typer.echo(mathtools.is_prime(x))
+
+@app.command()
+def factor(x: int):
+    '''
+    素因数分解（Pollardのρ法）
+    '''
+    if x < 1:
+        typer.echo("エラー: 1以上の整数を指定してください", err=True)
+        raise typer.Exit(1)
+    primes = [str(p) for p, e in mathtools.factorize(x).items() for _ in range(e)]
+    typer.echo(f"{x}: {' '.join(primes)}")
+
+@app.command()
+def main(
+    names: List[str] = typer.Argument(None, help="野菜の名前（複数可、ひらがな・カタカナ・漢字のどれでも可）"),
+    list_all: bool = typer.Option(False, "--list", "-l", help="登録されている全ての野菜の一覧を表示")
+):
     '''
     野菜の名前を引数にその栄養価を出力する
-    ＊現在使用不能
     '''
-    typer.echo(vegetable.main(x))
+    if list_all or not names:
+        typer.echo(vegetable.list_vegetables())
+        return
+    typer.echo(vegetable.describe(names))
 
 @app.command()
 def hello(name: str= "Masaya"):
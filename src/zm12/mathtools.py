@@ -1,5 +1,32 @@
+import math
+import random
+
+import numpy as np
+
+# 試し割り・Miller–Rabin法の底に使う小さな素数
+_SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+# 64bit整数（2**64未満）はこの7つの底で決定的に判定できる（Sinclairの底。素数を底にするより少ない）
+_BASES_64 = (2, 325, 9375, 28178, 450775, 9780504, 1795265022)
+
+# この値未満なら41以下の素数を底とするMiller–Rabin法は決定的
+_DETERMINISTIC_LIMIT = 3317044064679887385961981
+
+# 素因数分解で最初に試し割りする素数（これより大きな素因数はρ法で見つける）
+_TRIAL_LIMIT = 256
+_TRIAL_PRIMES = tuple(p for p in range(2, _TRIAL_LIMIT) if all(p % d for d in range(2, math.isqrt(p) + 1)))
+
+# ρ法で gcd をまとめて求める間隔（この回数分の差の積をとってから gcd を1回求める）
+_RHO_BATCH = 256
+
+# int64で扱える最大値（これを超える場合はPythonの多倍長整数に切り替える）
+_INT64_MAX = np.iinfo(np.int64).max
+
+
 def gcd(m, n):
-    """最大公約数 http://bit.ly/3ZIFTuM"""
+    """最大公約数 http://bit.ly/3ZIFTuM（配列を渡した場合は要素ごと）"""
+    if _is_array_like(m) or _is_array_like(n):
+        return np.gcd(_as_pair_array(m), _as_pair_array(n))
     
     if m < n:
         # m >= n となるように入れ替え
@@ -12,32 +39,237 @@ def gcd(m, n):
 
 
 def lcm(m, n):
-    """最小公倍数"""
+    """最小公倍数（配列を渡した場合は要素ごと）"""
+    if _is_array_like(m) or _is_array_like(n):
+        return _lcm_pairs(np.abs(_as_pair_array(m)), np.abs(_as_pair_array(n)))
     return m * n // gcd(m, n)
 
 
+def gcd_reduce(values):
+    """配列・シーケンス全体の最大公約数"""
+    arr = _as_int_array(values)
+    if arr.size == 0:
+        return 0
+
+    if arr.dtype == object:
+        return math.gcd(*arr.tolist())
+
+    # abs(int64の最小値) はあふれるので多倍長整数で計算する
+    if arr.min() == np.iinfo(np.int64).min:
+        return math.gcd(*(int(v) for v in arr))
+
+    return int(np.gcd.reduce(np.abs(arr)))
+
+
+def lcm_reduce(values):
+    """配列・シーケンス全体の最小公倍数（隣り合う要素同士をまとめるトーナメント方式）"""
+    arr = _as_int_array(values)
+    if arr.size == 0:
+        return 1
+
+    if arr.dtype != object and arr.min() == np.iinfo(np.int64).min:
+        arr = arr.astype(object)
+    arr = np.abs(arr)
+
+    if (arr == 0).any():
+        return 0
+
+    # 値の大きさがそろったまま増えるよう、ペアごとに畳み込む
+    while arr.size > 1:
+        if arr.size % 2:
+            arr = np.append(arr, np.ones(1, dtype=arr.dtype))
+        arr = _lcm_pairs(arr[0::2], arr[1::2])
+
+    return int(arr[0])
+
+
+def _lcm_pairs(a, b):
+    """要素ごとの最小公倍数（int64であふれる場合は多倍長整数で計算。一方が1要素の場合は np.gcd と同じく揃える）"""
+    a, b = np.broadcast_arrays(a, b)
+    if a.dtype != object and b.dtype != object:
+        g = np.gcd(a, b)
+        q = np.floor_divide(a, g, out=np.zeros_like(a), where=g != 0)
+        if not (q > _INT64_MAX // np.maximum(b, 1)).any():
+            return q * b
+    return np.lcm(a.astype(object), b.astype(object))
+
+
+def _is_array_like(x):
+    return isinstance(x, (list, tuple, np.ndarray)) or hasattr(x, "to_numpy")
+
+
+def _as_pair_array(values):
+    """
+    要素ごとの gcd/lcm の引数を整数の1次元配列に変換
+    欠損値を除くと相手の配列と位置がずれ、abs(int64の最小値) はあふれるので、どちらもエラーにする
+    """
+    arr = _as_int_array(values, dropna=False)
+    if arr.dtype != object and arr.size and arr.min() == np.iinfo(np.int64).min:
+        raise ValueError("int64の最小値は要素ごとの計算では扱えません")
+    return arr
+
+
+def _as_int_array(values, dropna=True):
+    """整数の1次元配列に変換（dropna=True なら欠損値は除外、False なら欠損値があればエラー、int64に収まらない値はobject型）"""
+    if hasattr(values, "to_numpy"):
+        values = values.to_numpy()
+    arr = np.asarray(values)
+    if arr.ndim == 0:
+        arr = arr.reshape(1)
+
+    if arr.dtype.kind == "f":
+        missing = np.isnan(arr)
+        if missing.any() and not dropna:
+            raise ValueError("欠損値が含まれています（要素ごとの計算では位置がずれるため除外できません）")
+        arr = arr[~missing]
+        if not np.all(arr == np.floor(arr)):
+            raise ValueError("整数以外の値が含まれています")
+        if arr.size and np.abs(arr).max() > _INT64_MAX:
+            return np.array([int(v) for v in arr], dtype=object)
+        return arr.astype(np.int64)
+
+    if arr.dtype.kind == "u":
+        if arr.size and arr.max() > _INT64_MAX:
+            return arr.astype(object)
+        return arr.astype(np.int64)
+
+    if arr.dtype.kind in ("O", "U", "S"):
+        present = [v is not None and v == v for v in arr.ravel()]
+        if not dropna and not all(present):
+            raise ValueError("欠損値が含まれています（要素ごとの計算では位置がずれるため除外できません）")
+        ints = [int(v) for v, p in zip(arr.ravel(), present) if p]
+        if all(-_INT64_MAX <= v <= _INT64_MAX for v in ints):
+            return np.array(ints, dtype=np.int64)
+        return np.array(ints, dtype=object)
+
+    if arr.dtype.kind == "b":
+        return arr.astype(np.int64)
+
+    return arr.astype(np.int64, copy=False)
+
+
 def divisors(x):
-    divs = []
+    """約数を昇順のリストで返す（素因数分解から生成）"""
+    if x < 1:
+        return []
 
-    i = 1
-    while i <= x:
-        if x % i == 0:
-            divs.append(i)
-        i += 1
-        
-    return divs
+    divs = [1]
+    for p, e in factorize(x).items():
+        divs = [d * p ** k for d in divs for k in range(e + 1)]
 
+    return sorted(divs)
 
-def is_prime(x):
-    """素数判定"""
-    if x == 1:
-        return False
-    
-    i = 2
-    while i * i <= x:
-        if x % i == 0:
+
+def _miller_rabin(n, bases):
+    """Miller–Rabin法（nは5以上の奇数）"""
+    d = n - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    for a in bases:
+        a %= n
+        if a == 0:
+            continue
+        y = pow(a, d, n)
+        if y == 1 or y == n - 1:
+            continue
+        for _ in range(s - 1):
+            y = y * y % n
+            if y == n - 1:
+                break
+        else:
             return False
-        i += 1
-        
+
     return True
 
+
+def is_prime(x, rounds=20):
+    """
+    素数判定（3.3e24未満は決定的、それ以上は rounds 回の確率的判定を追加）
+
+    >>> is_prime(318665857834031151167461)  # 399165290221 × 798330580441（底が37以下では素数と誤る強擬素数）
+    False
+    """
+    if x < 2:
+        return False
+
+    for p in _SMALL_PRIMES:
+        if x % p == 0:
+            return x == p
+
+    # 43*43未満の合成数は41以下の素因数を持つ
+    if x < 43 * 43:
+        return True
+
+    if x < 2 ** 64:
+        return _miller_rabin(x, _BASES_64)
+
+    if x < _DETERMINISTIC_LIMIT:
+        return _miller_rabin(x, _SMALL_PRIMES)
+
+    bases = _SMALL_PRIMES + tuple(random.randrange(2, x - 1) for _ in range(rounds))
+    return _miller_rabin(x, bases)
+
+
+def _pollard_brent(n):
+    """Pollardのρ法（Brentの改良版）でnの非自明な約数を1つ返す（nは奇数の合成数）"""
+    gcd = math.gcd
+    while True:
+        y = random.randrange(1, n)
+        c = random.randrange(1, n)
+        g = r = q = 1
+
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                # 差の積を n で割った余りに溜める（負の差でも gcd は変わらないので abs は取らない）
+                for _ in range(min(_RHO_BATCH, r - k)):
+                    y = (y * y + c) % n
+                    q = q * (x - y) % n
+                g = gcd(q, n)
+                k += _RHO_BATCH
+            r *= 2
+
+        if g == n:
+            # まとめて掛けた積で約数を取り逃がした場合は1ステップずつやり直す
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = gcd(x - ys, n)
+
+        if g != n:
+            return g
+
+
+def factorize(x):
+    """素因数分解（{素数: 指数} の辞書を素数の昇順で返す）"""
+    if x < 1:
+        raise ValueError("1以上の整数を指定してください")
+
+    factors = {}
+
+    # 小さな素因数は素数の表で試し割りして取り除く
+    for p in _TRIAL_PRIMES:
+        if p * p > x:
+            break
+        while x % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            x //= p
+
+    # 残りはMiller–Rabin法とρ法で分解
+    stack = [x] if x > 1 else []
+    while stack:
+        n = stack.pop()
+        if is_prime(n):
+            factors[n] = factors.get(n, 0) + 1
+        else:
+            d = _pollard_brent(n)
+            stack.extend((d, n // d))
+
+    return dict(sorted(factors.items()))
@@ -0,0 +1,424 @@
+import math
+
+import numpy as np
+
+# KLLスケッチの正規化順位誤差（99%信頼）の近似式 ε ≈ _KLL_ERROR_COEF / k ** _KLL_ERROR_EXP
+_KLL_ERROR_COEF = 2.296
+_KLL_ERROR_EXP = 0.9723
+
+# 上位のレベルに対する容量の比
+_KLL_CAPACITY_RATIO = 2 / 3
+
+# update() で一度に追加する値の数（大きな配列をまとめて並べ替えないように分割する）
+_UPDATE_CHUNK = 1 << 16
+
+# PairwiseMoments.update() で一度に処理する要素数（行数 × 列数、作業用の配列の大きさを抑える）
+_BLOCK_ELEMENTS = 1 << 22
+
+
+def _finite(values):
+    """有限の値だけのfloat64の1次元配列にする"""
+    if hasattr(values, "to_numpy"):
+        values = values.to_numpy(dtype=float, na_value=np.nan)
+    arr = np.asarray(values, dtype=float).ravel()
+    return arr[np.isfinite(arr)]
+
+
+class Moments:
+    """件数・平均・偏差平方和・最小・最大（Chanの方法で結合するので、分割して計算しても結果は同じ）"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        values = _finite(values)
+        if values.size == 0:
+            return self
+        other = Moments()
+        other.count = values.size
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        return self.merge(other)
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def std(self):
+        """標準偏差（pandasと同じ不偏推定、2件未満はNaN）"""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else math.nan
+
+
+class QuantileSketch:
+    """
+    KLL法による分位点のスケッチ（結合可能）
+    値を k 程度ずつ間引きながら保持し、分位点の順位の誤差はおよそ error（正規化順位）に収まる
+    一度も間引いていない間は正確な値を返す
+    """
+
+    def __init__(self, k=200, seed=None):
+        self.k = max(8, int(k))
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_error(cls, error, seed=None):
+        """正規化順位の誤差 error（例: 0.01）に必要な大きさのスケッチ"""
+        return cls(math.ceil((_KLL_ERROR_COEF / error) ** (1 / _KLL_ERROR_EXP)), seed)
+
+    @property
+    def exact(self):
+        """間引いていない（全ての値を保持している）かどうか"""
+        return len(self.levels) == 1
+
+    @property
+    def error(self):
+        """分位点の正規化順位の誤差の上限の目安（正確な場合は0）"""
+        return 0.0 if self.exact else _KLL_ERROR_COEF / self.k ** _KLL_ERROR_EXP
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, math.ceil(self.k * _KLL_CAPACITY_RATIO ** depth))
+
+    def _compress(self):
+        """容量を超えたレベルを整列して1つおきに上のレベルへ送る"""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size > self._capacity(level):
+                items = np.sort(items)
+                # 奇数個の場合は1つ残す
+                keep = items[:1] if items.size % 2 else items[:0]
+                items = items[keep.size:]
+                promoted = items[self._rng.integers(2)::2]
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                # レベルが増えると下のレベルの容量が変わるので最初から確認し直す
+                level = 0
+                continue
+            level += 1
+
+    def update(self, values):
+        values = _finite(values)
+        for start in range(0, values.size, _UPDATE_CHUNK):
+            chunk = values[start:start + _UPDATE_CHUNK]
+            self.count += chunk.size
+            self.levels[0] = np.concatenate([self.levels[0], chunk])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        self.k = min(self.k, other.k)
+        self.count += other.count
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+        return self
+
+    def _weighted(self):
+        """保持している値（昇順）と累積の重み"""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.size, 2 ** i, dtype=np.int64) for i, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        """分位点（正確な場合はpandasと同じ線形補間）"""
+        qs = np.asarray(qs, dtype=float)
+        if self.count == 0:
+            return np.full(qs.shape, np.nan)
+        if self.exact:
+            return np.quantile(self.levels[0], qs)
+        items, cumulative = self._weighted()
+        ranks = qs * cumulative[-1]
+        return items[np.minimum(np.searchsorted(cumulative, ranks, side="left"), items.size - 1)]
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    def count_outside(self, low, high):
+        """low 未満または high を超える値の数（推定）"""
+        if self.count == 0:
+            return 0
+        if self.exact:
+            items = self.levels[0]
+            return int(((items < low) | (items > high)).sum())
+        items, cumulative = self._weighted()
+        below = np.searchsorted(items, low, side="left")
+        above = np.searchsorted(items, high, side="right")
+        below_weight = cumulative[below - 1] if below else 0
+        above_weight = cumulative[-1] - (cumulative[above - 1] if above else 0)
+        # 保持している重みの合計は件数とわずかに異なるので件数に合わせる
+        return int(round((below_weight + above_weight) * self.count / cumulative[-1]))
+
+    def within(self, low, high):
+        """保持している値のうち low 以上 high 以下の最小値と最大値（箱ひげ図のひげの位置）"""
+        items = np.concatenate(self.levels)
+        inside = items[(items >= low) & (items <= high)]
+        if inside.size == 0:
+            return low, high
+        return float(inside.min()), float(inside.max())
+
+
+class Histogram:
+    """
+    ビン幅が2のべき乗で、ビンの境界が0を基準にそろったヒストグラム（結合してもビンがずれない）
+    ビンの数が max_bins を超えると、隣り合うビンをまとめて幅を2倍にする
+    """
+
+    def __init__(self, max_bins=64):
+        self.max_bins = max_bins
+        self.exponent = None
+        self.start = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    @property
+    def width(self):
+        return 2.0 ** self.exponent
+
+    @property
+    def edges(self):
+        return (self.start + np.arange(self.counts.size + 1)) * self.width
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def _coarsen(self):
+        """ビン幅を2倍にする"""
+        if self.counts.size:
+            start = self.start // 2
+            index = (self.start + np.arange(self.counts.size)) // 2 - start
+            counts = np.zeros(index[-1] + 1, dtype=np.int64)
+            np.add.at(counts, index, self.counts)
+            self.start, self.counts = start, counts
+        self.exponent += 1
+
+    def _cover(self, first, last):
+        """ビン番号 first〜last（現在の幅）が収まるまで幅を広げ、配列を拡張する"""
+        while True:
+            new_start = min(self.start, first) if self.counts.size else first
+            new_end = max(self.start + self.counts.size - 1, last) if self.counts.size else last
+            if new_end - new_start + 1 <= self.max_bins:
+                break
+            self._coarsen()
+            first, last = first // 2, last // 2
+
+        if not self.counts.size:
+            self.start, self.counts = first, np.zeros(last - first + 1, dtype=np.int64)
+        elif new_start < self.start or new_end >= self.start + self.counts.size:
+            counts = np.zeros(new_end - new_start + 1, dtype=np.int64)
+            counts[self.start - new_start:self.start - new_start + self.counts.size] = self.counts
+            self.start, self.counts = new_start, counts
+
+    def _index(self, value):
+        return math.floor(value / self.width)
+
+    def update(self, values):
+        values = _finite(values)
+        if values.size == 0:
+            return self
+
+        low, high = float(values.min()), float(values.max())
+        if self.exponent is None:
+            span = high - low
+            if span > 0:
+                self.exponent = math.ceil(math.log2(span / self.max_bins))
+            else:
+                self.exponent = math.floor(math.log2(abs(low))) - 6 if low else 0
+        self._cover(self._index(low), self._index(high))
+
+        index = np.floor(values / self.width).astype(np.int64) - self.start
+        self.counts += np.bincount(index, minlength=self.counts.size)
+        return self
+
+    def merge(self, other):
+        if other.exponent is None:
+            return self
+        other = other.copy()
+        if self.exponent is None:
+            self.exponent, self.start, self.counts = other.exponent, other.start, other.counts
+            return self
+
+        while self.exponent < other.exponent:
+            self._coarsen()
+        while other.exponent < self.exponent:
+            other._coarsen()
+        self._cover(other.start, other.start + other.counts.size - 1)
+        while other.exponent < self.exponent:
+            other._coarsen()
+        offset = other.start - self.start
+        self.counts[offset:offset + other.counts.size] += other.counts
+        return self
+
+    def copy(self):
+        histogram = Histogram(self.max_bins)
+        histogram.exponent, histogram.start, histogram.counts = self.exponent, self.start, self.counts.copy()
+        return histogram
+
+
+class ColumnAccumulator:
+    """
+    1つの数値列の結合可能な要約（Moments・QuantileSketch・Histogram）
+    ファイルやプロセスごとに update() し、merge() でまとめる
+    """
+
+    def __init__(self, error=0.01, max_bins=64, seed=None):
+        self.moments = Moments()
+        self.sketch = QuantileSketch.from_error(error, seed)
+        self.histogram = Histogram(max_bins)
+
+    def update(self, values):
+        values = _finite(values)
+        self.moments.update(values)
+        self.sketch.update(values)
+        self.histogram.update(values)
+        return self
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        self.histogram.merge(other.histogram)
+        return self
+
+    @property
+    def count(self):
+        return self.moments.count
+
+    def stats(self):
+        """
+        統計量（csv_vslz.column_stats と同じ項目に加えて min, max, whislo, whishi, quantile_error）
+        quantile_error は四分位数と外れ値の数の正規化順位の誤差の目安（正確な場合は0）
+        """
+        q1, median, q3 = self.sketch.quantiles([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        low, high = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        whislo, whishi = self.sketch.within(low, high)
+        return {
+            "count": self.moments.count,
+            "mean": self.moments.mean,
+            "std": self.moments.std,
+            "median": float(median),
+            "q1": float(q1),
+            "q3": float(q3),
+            "outliers": self.sketch.count_outside(low, high),
+            "min": self.moments.min,
+            "max": self.moments.max,
+            "whislo": whislo,
+            "whishi": whishi,
+            "quantile_error": self.sketch.error,
+        }
+
+
+class PairwiseMoments:
+    """
+    複数の数値列の全ての組について、両方が欠損でない行の件数・和・平方和・積和（結合可能）
+    行をブロックに分け、欠損の有無の行列との積で全ての組をまとめて集計する
+    値は列ごとの基準値（最初のブロックの平均）を引いて保持し、桁落ちを抑える
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        p = len(self.columns)
+        self.shift = None
+        self.n = np.zeros((p, p))
+        self.sx = np.zeros((p, p))    # [i, j]: 組 (i, j) の行の列 i の和
+        self.sxx = np.zeros((p, p))   # [i, j]: 組 (i, j) の行の列 i の平方和
+        self.sxy = np.zeros((p, p))   # [i, j]: 組 (i, j) の行の積和
+
+    @property
+    def count(self):
+        """組ごとの両方が欠損でない行の数"""
+        return self.n.astype(np.int64)
+
+    def update(self, values):
+        """
+        values : 2次元配列またはデータフレーム（行 × columns の順の列、欠損値はNaN）
+        データフレームはブロックごとに配列にする（全体を一度にコピーしない）
+        """
+        if len(values.shape) != 2 or values.shape[1] != len(self.columns):
+            raise ValueError(f"列の数が異なります（{values.shape} / {len(self.columns)}列）")
+        frame = hasattr(values, "iloc")
+        if not frame:
+            values = np.asarray(values, dtype=float)
+
+        rows = max(1, _BLOCK_ELEMENTS // max(1, values.shape[1]))
+        for start in range(0, values.shape[0], rows):
+            block = values.iloc[start:start + rows] if frame else values[start:start + rows]
+            if frame:
+                block = block.to_numpy(dtype=float, na_value=np.nan)
+            present = np.isfinite(block)
+            if self.shift is None:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    shift = np.where(present, block, 0).sum(axis=0) / present.sum(axis=0)
+                self.shift = np.nan_to_num(shift)
+            centered = np.where(present, block - self.shift, 0.0)
+            mask = present.astype(float)
+            self.n += mask.T @ mask
+            self.sx += centered.T @ mask
+            self.sxx += (centered * centered).T @ mask
+            self.sxy += centered.T @ centered
+        return self
+
+    def _shifted(self, shift):
+        """基準値を shift に変えた (sx, sxx, sxy)"""
+        if self.shift is None:
+            return self.sx, self.sxx, self.sxy
+        d = (self.shift - shift)[:, None]   # 列 i の基準値の差（行方向）
+        sx = self.sx + self.n * d
+        sxx = self.sxx + 2 * d * self.sx + self.n * d * d
+        sxy = self.sxy + d * self.sx.T + d.T * self.sx + self.n * d * d.T
+        return sx, sxx, sxy
+
+    def merge(self, other):
+        if other.columns != self.columns:
+            raise ValueError("列が異なる PairwiseMoments は結合できません")
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift.copy()
+        sx, sxx, sxy = other._shifted(self.shift)
+        self.n += other.n
+        self.sx += sx
+        self.sxx += sxx
+        self.sxy += sxy
+        return self
+
+    def correlation(self):
+        """
+        ピアソンの相関係数の行列（組ごとに両方が欠損でない行から求める、pandasの corr() と同じ）
+        行が2つ未満または分散が0の組はNaN
+        """
+        n = self.n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = self.sxy - self.sx * self.sx.T / n
+            var_x = self.sxx - self.sx * self.sx / n
+            var_y = var_x.T
+            r = cov / np.sqrt(var_x * var_y)
+        r[(n < 2) | ~(var_x > 0) | ~(var_y > 0)] = np.nan
+        return np.clip(r, -1.0, 1.0)
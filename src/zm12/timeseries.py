@@ -0,0 +1,216 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# 1日・1時間のナノ秒
+DAY_NS = 86_400 * 10 ** 9
+HOUR_NS = 3_600 * 10 ** 9
+
+# 自動で決める集計の間隔の候補（短い順）
+FREQUENCIES = ["1s", "10s", "1min", "5min", "15min", "1h", "3h", "6h", "1D", "7D", "14D", "28D", "91D", "364D"]
+
+# 日時の列とみなす列名（自動検出で優先する）
+TIME_COLUMN_NAMES = ("date", "datetime", "time", "timestamp", "created_at", "日付", "日時", "年月日", "時刻")
+
+# 文字列の列を日時の列とみなす、先頭の値のうち日時として読める割合
+_PARSE_RATIO = 0.9
+_PARSE_SAMPLE = 200
+
+
+def _parse(values):
+    """
+    日時の Series として読む（読めない値はNaT、タイムゾーン付きはUTCの時刻にそろえる）
+    最初の値から推定した書式でまとめて読み、読めなかった値だけ値ごとに書式を推定して読み直す
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        parsed = pd.to_datetime(values, errors="coerce", utc=True)
+        failed = parsed.isna() & values.notna()
+        if failed.any():
+            parsed[failed] = pd.to_datetime(values[failed], errors="coerce", utc=True, format="mixed")
+    return parsed.dt.tz_convert(None)
+
+
+def detect_time_column(df, time_column=None):
+    """
+    日時の列を決める
+    time_column を指定した場合はその列、指定しない場合は日時型の列、
+    次に先頭の値の9割以上が日時として読める文字列の列（TIME_COLUMN_NAMES の列名を優先）
+
+    Returns:
+    --------
+    str or None
+        列名（見つからない場合はNone）
+    """
+    if time_column:
+        if time_column not in df.columns:
+            raise ValueError(f"日時の列 '{time_column}' がありません")
+        return time_column
+
+    datetime_columns = df.select_dtypes(include=["datetime", "datetimetz"]).columns.tolist()
+    if datetime_columns:
+        return datetime_columns[0]
+
+    candidates = df.select_dtypes(include=["object", "string"]).columns.tolist()
+    candidates.sort(key=lambda c: str(c).lower() not in TIME_COLUMN_NAMES)
+    for column in candidates:
+        sample = df[column].dropna().head(_PARSE_SAMPLE)
+        if len(sample) and _parse(sample).notna().mean() >= _PARSE_RATIO:
+            return column
+    return None
+
+
+def to_timestamps(values):
+    """
+    日時の列をエポックからのナノ秒（int64）の配列にする
+
+    Returns:
+    --------
+    tuple
+        (int64の配列, 日時として読めた値のマスク)
+    """
+    if not (pd.api.types.is_datetime64_any_dtype(values) and getattr(values.dtype, "tz", None) is None):
+        values = _parse(values)
+    values = values.astype("datetime64[ns]")
+    valid = values.notna().to_numpy()
+    return values.to_numpy().view(np.int64), valid
+
+
+def duration_ns(text):
+    """'1h'、'7D' などの間隔をナノ秒にする（pd.Timedelta の書式）"""
+    value = pd.Timedelta(text).value
+    if value <= 0:
+        raise ValueError(f"間隔は正の値を指定してください: {text}")
+    return value
+
+
+def choose_frequency(span_ns, spacing_ns=0, max_points=2000):
+    """
+    期間 span_ns を max_points 区間以下に分け、値の間隔 spacing_ns（中央値など）以上の最も短い間隔
+    （FREQUENCIES から、ナノ秒。週ごとのデータを日ごとに分けて空の区間ばかりにしない）
+    """
+    for text in FREQUENCIES:
+        frequency = duration_ns(text)
+        if span_ns // frequency < max_points and frequency >= spacing_ns:
+            return frequency
+    return duration_ns(FREQUENCIES[-1])
+
+
+def frequency_label(frequency):
+    """間隔の表示名（"7日"、"15分" など）"""
+    for unit, size in (("日", DAY_NS), ("時間", HOUR_NS), ("分", 60 * 10 ** 9), ("秒", 10 ** 9)):
+        if frequency % size == 0:
+            return f"{frequency // size}{unit}"
+    return str(pd.Timedelta(frequency))
+
+
+def resample(timestamps, values, origin, frequency, bins):
+    """
+    時刻の昇順に並んだ値を、origin から frequency ごとの bins 区間に集計する
+
+    Parameters:
+    -----------
+    timestamps : np.ndarray
+        昇順のint64の時刻（ナノ秒）
+    values : np.ndarray
+        時刻に対応する値（欠損値はNaN）
+
+    Returns:
+    --------
+    dict
+        {"count", "sum", "mean", "min", "max"}（各 bins 個、値の無い区間の mean/min/max はNaN）
+    """
+    values = np.asarray(values, dtype=float)
+    present = np.isfinite(values)
+    index = (timestamps[present] - origin) // frequency
+    values = values[present]
+
+    count = np.bincount(index, minlength=bins)[:bins]
+    total = np.bincount(index, weights=values, minlength=bins)[:bins]
+    low = np.full(bins, np.nan)
+    high = np.full(bins, np.nan)
+    if values.size:
+        # 並んでいるので区間の先頭の位置で区切って最小・最大を求める
+        starts = np.flatnonzero(np.r_[True, np.diff(index) != 0])
+        low[index[starts]] = np.minimum.reduceat(values, starts)
+        high[index[starts]] = np.maximum.reduceat(values, starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+    return {"count": count, "sum": total, "mean": mean, "min": low, "max": high}
+
+
+def rolling_mean(total, count, window):
+    """
+    区間ごとの和と件数から、直近 window 区間の移動平均（値の無い区間は除いて平均する）
+    累積和の差で求めるので、区間の数に比例する時間で済む
+    """
+    window = max(1, int(window))
+    cumulative_total = np.r_[0.0, np.cumsum(total)]
+    cumulative_count = np.r_[0, np.cumsum(count)]
+    end = np.arange(1, total.size + 1)
+    start = np.maximum(end - window, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (cumulative_total[end] - cumulative_total[start]) / (cumulative_count[end] - cumulative_count[start])
+
+
+def calendar_layout(timestamps):
+    """
+    カレンダーの図の形
+    "month"（月 × 年、1日以上の間隔のデータ）、"week"（曜日 × 週、14日以上の期間）、"hour"（時 × 日）
+    """
+    if timestamps.size < 2:
+        return "hour"
+    spacing = np.median(np.diff(timestamps))
+    span = timestamps[-1] - timestamps[0]
+    if spacing >= DAY_NS:
+        return "month"
+    if span >= 14 * DAY_NS:
+        return "week"
+    return "hour"
+
+
+def calendar(timestamps, values, layout):
+    """
+    カレンダーの図に描く平均値の行列
+
+    Returns:
+    --------
+    tuple
+        (行列（行 × 列、値の無いところはNaN）, 行の見出し, 列の見出し)
+    """
+    values = np.asarray(values, dtype=float)
+    present = np.isfinite(values)
+    timestamps, values = timestamps[present], values[present]
+    if timestamps.size == 0:
+        return np.full((1, 1), np.nan), [""], [""]
+
+    if layout == "month":
+        months = timestamps.astype("datetime64[ns]").astype("datetime64[M]").astype(np.int64)
+        year, row = np.divmod(months, 12)
+        first = year.min()
+        col = year - first
+        rows, row_labels = 12, [f"{m}月" for m in range(1, 13)]
+        col_labels = [str(1970 + first + i) for i in range(col.max() + 1)]
+    elif layout == "week":
+        days = timestamps // DAY_NS
+        row = (days + 3) % 7  # 1970-01-01 は木曜日（月曜日を0とする）
+        monday = days - row
+        col = (monday - monday.min()) // 7
+        rows, row_labels = 7, list("月火水木金土日")
+        starts = (monday.min() + 7 * np.arange(col.max() + 1)) * DAY_NS
+        col_labels = [str(d) for d in starts.astype("datetime64[ns]").astype("datetime64[D]")]
+    else:
+        days = timestamps // DAY_NS
+        row = (timestamps - days * DAY_NS) // HOUR_NS
+        col = days - days.min()
+        rows, row_labels = 24, [f"{h}時" for h in range(24)]
+        col_labels = [str(d) for d in ((days.min() + np.arange(col.max() + 1)) * DAY_NS).astype("datetime64[ns]").astype("datetime64[D]")]
+
+    cols = int(col.max()) + 1
+    flat = row * cols + col
+    count = np.bincount(flat, minlength=rows * cols)
+    total = np.bincount(flat, weights=values, minlength=rows * cols)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        matrix = (total / count).reshape(rows, cols)
+    return matrix, row_labels, col_labels
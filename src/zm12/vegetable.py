@@ -1,108 +1,203 @@
 #!/usr/bin/env python3
 import argparse
+import bisect
+import csv
+import difflib
+import re
 import sys
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+# 野菜の栄養価データ（可食部100gあたり）
+# 1行1食品のCSVで、列名の括弧内が単位。別名は "|" 区切り
+DATA_PATH = Path(__file__).with_name("vegetable_nutrition.csv")
+
+# カタカナ→ひらがな変換表（ァ〜ヶ）
+_KATA_TO_HIRA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+_UNIT_PATTERN = re.compile(r"^(.+)\((.+)\)$")
+
+
+def normalize(text):
+    """表記ゆれを吸収した検索キー（全角・半角、カタカナ・ひらがな、空白の違いを無視）"""
+    text = unicodedata.normalize("NFKC", text).strip().lower()
+    text = text.translate(_KATA_TO_HIRA)
+    return "".join(text.split())
+
+
+class NutritionTable:
+    def __init__(self, foods, units):
+        """
+        栄養価テーブルと検索用インデックスを作成
+
+        Args:
+            foods (dict): {食品名: {"読み": str, "別名": list, "栄養素": {栄養素名: 数値}, "特徴": str}}
+            units (dict): {栄養素名: 単位}
+        """
+        self.foods = foods
+        self.units = units
+
+        # 完全一致用のインデックス（正規化したキー → 食品名）
+        self._index = {}
+        for name, food in foods.items():
+            for key in (name, food["読み"], *food["別名"]):
+                if key:
+                    self._index.setdefault(normalize(key), name)
+
+        # 前方一致用にキーを整列しておく
+        self._keys = sorted(self._index)
+
+    @classmethod
+    def from_csv(cls, path=DATA_PATH):
+        """CSVファイルから栄養価テーブルを読み込む"""
+        with open(path, encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+
+            nutrient_columns = []
+            units = {}
+            for i, column in enumerate(header[3:-1], start=3):
+                match = _UNIT_PATTERN.match(column)
+                nutrient, unit = match.groups() if match else (column, "")
+                nutrient_columns.append((i, nutrient))
+                units[nutrient] = unit
+
+            foods = {}
+            for row in reader:
+                if not row:
+                    continue
+                nutrients = {}
+                for i, nutrient in nutrient_columns:
+                    if row[i]:
+                        nutrients[nutrient] = float(row[i])
+                foods[row[0]] = {
+                    "読み": row[1],
+                    "別名": [alias for alias in row[2].split("|") if alias],
+                    "栄養素": nutrients,
+                    "特徴": row[-1],
+                }
+
+        return cls(foods, units)
+
+    def __len__(self):
+        return len(self.foods)
+
+    def get(self, query):
+        """完全一致（表記ゆれは吸収）で食品名を返す。見つからなければNone"""
+        return self._index.get(normalize(query))
+
+    def prefix(self, query):
+        """前方一致する食品名を返す"""
+        key = normalize(query)
+        start = bisect.bisect_left(self._keys, key)
+
+        names = []
+        for k in self._keys[start:]:
+            if not k.startswith(key):
+                break
+            name = self._index[k]
+            if name not in names:
+                names.append(name)
+        return names
+
+    def fuzzy(self, query, n=3, cutoff=0.6):
+        """あいまい検索で近い食品名を返す"""
+        names = []
+        for k in difflib.get_close_matches(normalize(query), self._keys, n=n * 2, cutoff=cutoff):
+            name = self._index[k]
+            if name not in names:
+                names.append(name)
+        return names[:n]
+
+    def lookup(self, query):
+        """完全一致 → 前方一致（候補が1つの場合）→ あいまい検索の順に食品名を探す"""
+        name = self.get(query)
+        if name is not None:
+            return name
+
+        candidates = self.prefix(query)
+        if len(candidates) == 1:
+            return candidates[0]
+
+        candidates = self.fuzzy(query, n=1)
+        return candidates[0] if candidates else None
+
+    def lookup_many(self, queries):
+        """複数の名前をまとめて検索（[(検索語, 食品名 or None)]、検索語の順・重複はそのまま）"""
+        return [(query, self.lookup(query)) for query in queries]
+
+    def format(self, name):
+        """栄養価を表示用の文字列にする"""
+        food = self.foods[name]
+        lines = [f"===== {name}の栄養価（100gあたり） ====="]
+        for nutrient, value in food["栄養素"].items():
+            lines.append(f"{nutrient}: {value:g} {self.units[nutrient]}")
+        if food["特徴"]:
+            lines.append(f"特徴: {food['特徴']}")
+        return "\n".join(lines)
+
+
+@lru_cache(maxsize=None)
+def get_table(path=DATA_PATH):
+    """栄養価テーブルを読み込む（一度読み込んだものを使い回す）"""
+    return NutritionTable.from_csv(path)
+
+
+def describe(vegetables):
+    """野菜の名前（複数可）から栄養価の表示用文字列を作成"""
+    return describe_matches(get_table().lookup_many(vegetables))
+
+
+def describe_matches(matches):
+    """lookup_many の検索結果から栄養価の表示用文字列を作成"""
+    table = get_table()
+    blocks = []
+    for query, name in matches:
+        if name is None:
+            message = f"エラー: '{query}'の栄養価データが見つかりません。"
+            candidates = table.prefix(query) or table.fuzzy(query)
+            if candidates:
+                message += f"\n候補: {', '.join(candidates)}"
+            blocks.append(message)
+            continue
+
+        text = table.format(name)
+        if normalize(query) not in (normalize(name), normalize(table.foods[name]["読み"])):
+            text = f"'{query}' → {name}\n" + text
+        blocks.append(text)
+
+    return "\n\n".join(blocks)
+
+
+def list_vegetables():
+    """登録されている野菜の一覧"""
+    table = get_table()
+    lines = ["登録されている野菜一覧:"]
+    for name in sorted(table.foods, key=lambda name: table.foods[name]["読み"]):
+        lines.append(f"- {name}")
+    return "\n".join(lines)
 
-# 野菜の栄養価データ
-# 実際のアプリケーションではより詳細なデータベースや外部APIを使用するとよいでしょう
-VEGETABLE_NUTRITION = {
-    "にんじん": {
-        "カロリー": "41 kcal/100g",
-        "ビタミンA": "高い（β-カロテン）",
-        "ビタミンC": "中程度",
-        "カリウム": "高い",
-        "食物繊維": "多い"
-    },
-    "ほうれん草": {
-        "カロリー": "23 kcal/100g",
-        "ビタミンA": "高い",
-        "ビタミンC": "高い",
-        "鉄分": "高い",
-        "葉酸": "高い",
-        "マグネシウム": "多い"
-    },
-    "トマト": {
-        "カロリー": "18 kcal/100g",
-        "ビタミンC": "高い",
-        "カリウム": "中程度",
-        "リコピン": "多い",
-        "抗酸化物質": "多い"
-    },
-    "じゃがいも": {
-        "カロリー": "76 kcal/100g",
-        "炭水化物": "高い",
-        "ビタミンC": "中程度",
-        "カリウム": "高い",
-        "ビタミンB6": "中程度"
-    },
-    "キャベツ": {
-        "カロリー": "23 kcal/100g",
-        "ビタミンC": "高い",
-        "ビタミンK": "高い",
-        "食物繊維": "中程度",
-        "葉酸": "中程度"
-    },
-    "ブロッコリー": {
-        "カロリー": "34 kcal/100g",
-        "ビタミンC": "非常に高い",
-        "ビタミンK": "高い",
-        "葉酸": "高い",
-        "食物繊維": "多い"
-    },
-    "たまねぎ": {
-        "カロリー": "40 kcal/100g",
-        "ビタミンC": "中程度",
-        "食物繊維": "中程度",
-        "フラボノイド": "多い",
-        "カリウム": "中程度"
-    },
-    "なす": {
-        "カロリー": "25 kcal/100g",
-        "食物繊維": "中程度",
-        "ナスニン": "多い",
-        "ポリフェノール": "中程度",
-        "カリウム": "中程度"
-    },
-    "きゅうり": {
-        "カロリー": "15 kcal/100g",
-        "水分": "非常に高い",
-        "ビタミンK": "中程度",
-        "カリウム": "低い",
-        "食物繊維": "低い"
-    },
-    "大根": {
-        "カロリー": "18 kcal/100g",
-        "ビタミンC": "中程度",
-        "葉酸": "低い",
-        "カリウム": "中程度",
-        "消化酵素": "多い"
-    }
-}
 
 def main():
     parser = argparse.ArgumentParser(description='野菜の栄養価を表示するプログラム')
-    parser.add_argument('vegetable', help='栄養価を知りたい野菜の名前')
+    parser.add_argument('vegetable', nargs='*', help='栄養価を知りたい野菜の名前（複数可）')
     parser.add_argument('-l', '--list', action='store_true', help='登録されている全ての野菜の一覧を表示')
     args = parser.parse_args()
-    
+
     # 一覧表示オプションが指定された場合
-    if args.list:
-        print("登録されている野菜一覧:")
-        for veg in sorted(VEGETABLE_NUTRITION.keys()):
-            print(f"- {veg}")
-        return
-    
-    # 指定された野菜の栄養価を表示
-    vegetable = args.vegetable
-    
-    if vegetable in VEGETABLE_NUTRITION:
-        print(f"===== {vegetable}の栄養価 =====")
-        for nutrient, value in VEGETABLE_NUTRITION[vegetable].items():
-            print(f"{nutrient}: {value}")
-    else:
-        print(f"エラー: '{vegetable}'の栄養価データが見つかりません。")
+    if args.list or not args.vegetable:
+        print(list_vegetables())
+        return 0
+
+    # 指定された野菜の栄養価を表示（検索は1回だけ行い、表示と終了コードの両方に使う）
+    matches = get_table().lookup_many(args.vegetable)
+    print(describe_matches(matches))
+
+    if any(name is None for _, name in matches):
         print("登録されている野菜を確認するには '-l' または '--list' オプションを使用してください。")
         return 1
-    
+
     return 0
 
 if __name__ == "__main__":